@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.categories'
-    verbose_name = '分類管理'
\ No newline at end of file
+    verbose_name = '分類管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
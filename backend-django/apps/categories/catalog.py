@@ -0,0 +1,78 @@
+"""
+分類目錄快取
+
+分類很少變動，但每個支出表單都會讀取。完整的分類清單保存在行程內，
+並以共用快取中的版本號判斷是否過期：分類新增、修改或刪除時遞增版本號，
+各行程在下次讀取時重新載入。版本號以時間戳記初始化，快取被清空後
+也不會與舊版本重複。
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+
+
+CATALOG_VERSION_CACHE_KEY = 'category_catalog_version'
+
+_lock = threading.Lock()
+_catalog = {'version': None, 'payload': None, 'ids': frozenset()}
+
+
+def get_catalog_version():
+    """取得目前的目錄版本號"""
+    version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_CACHE_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """分類變更後遞增版本號"""
+    get_catalog_version()
+    try:
+        cache.incr(CATALOG_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_CACHE_KEY, int(time.time() * 1000), None)
+    with _lock:
+        _catalog['version'] = None
+
+
+def _load_catalog(version):
+    from .models import Category, CategoryType
+    from .serializers import CategorySerializer
+
+    categories = list(Category.objects.order_by('type', '-is_default', 'name', 'id'))
+    grouped = {choice: [] for choice in CategoryType.values}
+    for item in CategorySerializer(categories, many=True).data:
+        grouped.setdefault(item['type'], []).append(item)
+
+    payload = {'version': version, 'categories': grouped}
+    return payload, frozenset(category.id for category in categories)
+
+
+def _current():
+    version = get_catalog_version()
+    with _lock:
+        if _catalog['version'] == version:
+            return dict(_catalog)
+
+    payload, ids = _load_catalog(version)
+    with _lock:
+        _catalog.update(version=version, payload=payload, ids=ids)
+        return dict(_catalog)
+
+
+def get_category_catalog():
+    """取得分類目錄（依類型分組，預設分類在前）"""
+    return _current()['payload']
+
+
+def get_category_ids():
+    """取得所有分類 ID 的集合"""
+    return _current()['ids']
+
+
+def catalog_etag(version):
+    return f'"categories-{version}"'
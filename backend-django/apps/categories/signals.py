@@ -0,0 +1,18 @@
+"""
+分類相關信號處理器
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .models import Category
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def refresh_category_catalog(sender, raw=False, **kwargs):
+    """分類變更時使目錄快取失效"""
+    if raw:
+        return
+    transaction.on_commit(bump_catalog_version)
@@ -2,7 +2,10 @@
 分類視圖
 """
 
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .catalog import catalog_etag, get_category_catalog
 from .models import Category
 from .serializers import CategorySerializer
 
@@ -11,4 +14,26 @@ class CategoryViewSet(viewsets.ModelViewSet):
     """分類管理視圖集"""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
-    permission_classes = [permissions.AllowAny]  # 暫時允許匿名訪問用於測試
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]  # 暫時允許匿名訪問用於測試
+    
+    @action(detail=False, methods=['get'])
+    def catalog(self, request):
+        """
+        完整分類目錄（依類型分組，預設分類在前）
+        
+        支援 ETag / If-None-Match；帶上目前版本號 ?v=<version> 時可長期快取。
+        """
+        payload = get_category_catalog()
+        etag = catalog_etag(payload['version'])
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(payload)
+        
+        response['ETag'] = etag
+        if request.query_params.get('v') == str(payload['version']):
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=300, must-revalidate'
+        return response
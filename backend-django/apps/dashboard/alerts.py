@@ -0,0 +1,228 @@
+"""
+支出限額警報
+
+依 DashboardConfig 的每日／每月支出限額，在支出提交時以增量方式檢查。
+累計金額存放在快取計數器（以「分」為單位的整數），每筆支出只需一次
+incr，不需重新彙總歷史資料；同一期間的警報最多發出一次。
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from .utils import on_commit_batch, send_notification
+
+
+DAILY = 'daily'
+MONTHLY = 'monthly'
+
+PERIOD_LABELS = {
+    DAILY: '每日',
+    MONTHLY: '每月',
+}
+
+
+def _to_cents(amount):
+    return int((Decimal(amount) * 100).to_integral_value())
+
+
+def _local_date(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+class SpendingLimitEvaluator:
+    """支出限額檢查器"""
+
+    limits_cache_prefix = 'spending_limits'
+    limits_cache_timeout = 60 * 60
+    total_cache_prefix = 'spending_total'
+    alert_cache_prefix = 'spending_alert'
+
+    # 計數器保留時間：需涵蓋整個期間
+    period_timeouts = {
+        DAILY: 60 * 60 * 48,
+        MONTHLY: 60 * 60 * 24 * 32,
+    }
+
+    # ---- 用戶限額設定 ----
+
+    def _limits_key(self, user_id):
+        return f'{self.limits_cache_prefix}:{user_id}'
+
+    def get_limits(self, user_id):
+        """取得用戶限額設定（快取），未啟用時回傳空 dict"""
+        from .models import DashboardConfig
+
+        limits = cache.get(self._limits_key(user_id))
+        if limits is None:
+            config = DashboardConfig.objects.filter(user_id=user_id).values(
+                'enable_expense_alerts', 'expense_limit_daily', 'expense_limit_monthly'
+            ).first()
+            limits = {}
+            if config and config['enable_expense_alerts']:
+                if config['expense_limit_daily']:
+                    limits[DAILY] = config['expense_limit_daily']
+                if config['expense_limit_monthly']:
+                    limits[MONTHLY] = config['expense_limit_monthly']
+            cache.set(self._limits_key(user_id), limits, self.limits_cache_timeout)
+        return limits
+
+    def invalidate_user(self, user_id):
+        """限額設定變更時清除設定與當期計數器"""
+        today = timezone.localdate()
+        cache.delete_many([
+            self._limits_key(user_id),
+            self._total_key(user_id, DAILY, self._period_key(DAILY, today)),
+            self._total_key(user_id, MONTHLY, self._period_key(MONTHLY, today)),
+        ])
+
+    # ---- 期間累計計數器 ----
+
+    @staticmethod
+    def _period_key(period, day):
+        return day.isoformat() if period == DAILY else day.strftime('%Y-%m')
+
+    def _total_key(self, user_id, period, period_key):
+        return f'{self.total_cache_prefix}:{user_id}:{period}:{period_key}'
+
+    def _seed_total(self, user_id, period, day):
+        """計數器不存在時，從資料庫彙總一次作為初始值"""
+        from apps.expenses.models import Expense, ExpenseType
+
+        # 以時間範圍篩選（而非 date__date / date__month），可使用索引與分區裁剪
+        if period == DAILY:
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            end = start + timedelta(days=1)
+        else:
+            start = timezone.make_aware(datetime.combine(day.replace(day=1), time.min))
+            end = timezone.make_aware(datetime.combine(
+                (day.replace(day=28) + timedelta(days=4)).replace(day=1), time.min
+            ))
+        expenses = Expense.objects.filter(
+            user_id=user_id, type=ExpenseType.EXPENSE, date__gte=start, date__lt=end
+        )
+
+        total = expenses.aggregate(total=Sum('amount'))['total'] or Decimal('0')
+        key = self._total_key(user_id, period, self._period_key(period, day))
+        cache.add(key, _to_cents(total), self.period_timeouts[period])
+        return cache.get(key, _to_cents(total))
+
+    def _add_to_total(self, user_id, period, day, cents):
+        """
+        累加期間總額並回傳最新值（分）
+
+        計數器不存在時以資料庫彙總初始化，彙總結果已包含已提交的變更，
+        因此不再累加。
+        """
+        key = self._total_key(user_id, period, self._period_key(period, day))
+        if cache.get(key) is None:
+            return self._seed_total(user_id, period, day)
+        try:
+            return cache.incr(key, cents)
+        except ValueError:
+            # 計數器在讀取後過期
+            return self._seed_total(user_id, period, day)
+
+    # ---- 評估 ----
+
+    def apply_changes(self, changes):
+        """
+        套用一批支出變更並檢查限額
+
+        changes 為 (user_id, amount, date, type, sign) 的序列。
+        同一用戶、同一期間的變更會先合併，批次匯入時每個期間只更新一次計數器。
+        """
+        from apps.expenses.models import ExpenseType
+
+        today = timezone.localdate()
+        grouped = defaultdict(int)
+        for user_id, amount, date, expense_type, sign in changes:
+            if expense_type != ExpenseType.EXPENSE:
+                continue
+            day = _local_date(date)
+            cents = _to_cents(amount) * sign
+            if day == today:
+                grouped[(user_id, DAILY, day)] += cents
+            if (day.year, day.month) == (today.year, today.month):
+                grouped[(user_id, MONTHLY, today)] += cents
+
+        increased = defaultdict(list)
+        for (user_id, period, day), cents in grouped.items():
+            limits = self.get_limits(user_id)
+            if period not in limits:
+                continue
+            total = self._add_to_total(user_id, period, day, cents)
+            if cents > 0:
+                increased[user_id].append((period, day, total))
+
+        for user_id, totals in increased.items():
+            limits = self.get_limits(user_id)
+            for period, day, total_cents in totals:
+                total = Decimal(total_cents) / 100
+                if total >= limits[period]:
+                    self._emit_alert(user_id, period, day, total, limits[period])
+
+    def record_expenses(self, expenses):
+        """
+        批次匯入後套用一批新支出（bulk_create 不會觸發信號）
+
+        交易提交後才套用，同一交易內的多批支出合併為一次檢查。
+        """
+        on_commit_batch(
+            'spending_limits',
+            self.apply_changes,
+            [(e.user_id, e.amount, e.date, e.type, 1) for e in expenses]
+        )
+
+    def _emit_alert(self, user_id, period, day, total, limit):
+        """發出限額警報，每個期間最多一次"""
+        from .models import AlertNotification
+
+        period_key = self._period_key(period, day)
+        guard_key = f'{self.alert_cache_prefix}:{user_id}:{period}:{period_key}'
+        if not cache.add(guard_key, 1, self.period_timeouts[period]):
+            return
+
+        # 快取可能被清除，以資料庫再確認一次（只在跨越限額時執行）
+        already_sent = AlertNotification.objects.filter(
+            user_id=user_id,
+            alert_type='expense_limit',
+            data__period=period,
+            data__period_key=period_key
+        ).exists()
+        if already_sent:
+            return
+
+        label = PERIOD_LABELS[period]
+        title = f'已超過{label}支出限額'
+        message = f'您的{label}支出已達 NT${total:,.0f}，超過設定的限額 NT${limit:,.0f}'
+
+        AlertNotification.objects.create(
+            user_id=user_id,
+            alert_type='expense_limit',
+            severity='warning',
+            title=title,
+            message=message,
+            data={
+                'period': period,
+                'period_key': period_key,
+                'total': float(total),
+                'limit': float(limit),
+            }
+        )
+        send_notification(user_id, title, message, 'warning')
+
+
+# 全域服務實例
+spending_limit_evaluator = SpendingLimitEvaluator()
+
+
+def evaluate_spending_limits(expenses):
+    """批次檢查支出限額（便捷函數）"""
+    spending_limit_evaluator.record_expenses(expenses)
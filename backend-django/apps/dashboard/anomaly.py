@@ -0,0 +1,143 @@
+"""
+異常支出偵測
+
+為每位用戶的每個分類維護 EWMA 平均與變異數（SpendingStatistic），
+新支出提交時以 O(1) 更新統計，並在金額高於平均數個標準差時發出警報，
+不需在每次新增時掃描支出表。完整重建由 rebuild_spending_statistics 指令負責。
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .utils import send_notification
+
+
+# EWMA 平滑係數，越大越重視近期支出
+EWMA_ALPHA = 0.1
+
+# 至少累積多少筆樣本才開始偵測
+MIN_SAMPLES = 5
+
+# 高於平均多少個標準差視為異常
+DEVIATION_THRESHOLD = 3.0
+
+
+def ewma_update(mean, variance, value, alpha=EWMA_ALPHA):
+    """以新樣本更新 EWMA 平均與變異數"""
+    diff = value - mean
+    increment = alpha * diff
+    mean = mean + increment
+    variance = (1 - alpha) * (variance + diff * increment)
+    return mean, variance
+
+
+class UnusualSpendingDetector:
+    """異常支出偵測器"""
+
+    settings_cache_prefix = 'unusual_spending_enabled'
+    settings_cache_timeout = 60 * 60
+
+    def __init__(self, alpha=EWMA_ALPHA, min_samples=MIN_SAMPLES,
+                 threshold=DEVIATION_THRESHOLD):
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.threshold = threshold
+
+    def _settings_key(self, user_id):
+        return f'{self.settings_cache_prefix}:{user_id}'
+
+    def is_enabled(self, user_id):
+        """用戶是否啟用異常支出警報（快取，預設啟用）"""
+        from .models import DashboardConfig
+
+        enabled = cache.get(self._settings_key(user_id))
+        if enabled is None:
+            enabled = DashboardConfig.objects.filter(user_id=user_id).values_list(
+                'enable_unusual_spending_alerts', flat=True
+            ).first()
+            enabled = True if enabled is None else enabled
+            cache.set(self._settings_key(user_id), enabled, self.settings_cache_timeout)
+        return enabled
+
+    def invalidate_user(self, user_id):
+        """設定變更時清除快取"""
+        cache.delete(self._settings_key(user_id))
+
+    def z_score(self, statistic, amount):
+        """計算金額相對於統計的標準分數，樣本不足時回傳 None"""
+        std = statistic.std_deviation
+        if statistic.sample_count < self.min_samples or std <= 0:
+            return None
+        return (amount - statistic.ewma_mean) / std
+
+    def observe(self, expense_id, user_id, category_id, amount, date):
+        """
+        觀察一筆新支出：先以舊統計判斷是否異常，再更新統計
+
+        只處理新增的支出；EWMA 無法精確扣除，更新與刪除交由夜間重建修正。
+        """
+        from .models import SpendingStatistic
+
+        amount = float(amount)
+        with transaction.atomic():
+            statistic, created = SpendingStatistic.objects.select_for_update().get_or_create(
+                user_id=user_id,
+                category_id=category_id,
+                defaults={'ewma_mean': amount, 'sample_count': 1, 'last_expense_at': date}
+            )
+            if created:
+                return None
+
+            z_score = self.z_score(statistic, amount)
+            previous_mean = statistic.ewma_mean
+            previous_std = statistic.std_deviation
+
+            statistic.ewma_mean, statistic.ewma_variance = ewma_update(
+                statistic.ewma_mean, statistic.ewma_variance, amount, self.alpha
+            )
+            statistic.sample_count += 1
+            statistic.last_expense_at = date
+            statistic.save(update_fields=[
+                'ewma_mean', 'ewma_variance', 'sample_count', 'last_expense_at', 'updated_at'
+            ])
+
+        if z_score is not None and z_score >= self.threshold and self.is_enabled(user_id):
+            self._emit_alert(expense_id, user_id, category_id, amount,
+                             previous_mean, previous_std, z_score)
+        return z_score
+
+    def _emit_alert(self, expense_id, user_id, category_id, amount, mean, std, z_score):
+        """發出異常支出警報"""
+        from apps.categories.models import Category
+        from .models import AlertNotification
+
+        category_name = Category.objects.filter(id=category_id).values_list(
+            'name', flat=True
+        ).first() or '未分類'
+
+        title = f'{category_name}支出異常'
+        message = (
+            f'這筆 NT${amount:,.0f} 的{category_name}支出明顯高於您平常的金額'
+            f'（平均約 NT${mean:,.0f}）'
+        )
+
+        AlertNotification.objects.create(
+            user_id=user_id,
+            alert_type='unusual_spending',
+            severity='warning',
+            title=title,
+            message=message,
+            data={
+                'expense_id': expense_id,
+                'category_id': category_id,
+                'amount': amount,
+                'mean': round(mean, 2),
+                'std_deviation': round(std, 2),
+                'z_score': round(z_score, 2),
+            }
+        )
+        send_notification(user_id, title, message, 'warning')
+
+
+# 全域服務實例
+unusual_spending_detector = UnusualSpendingDetector()
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dashboard'
-    verbose_name = '儀表板配置管理'
\ No newline at end of file
+    verbose_name = '儀表板配置管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -4,16 +4,23 @@ Dashboard WebSocket Consumers
 
 import json
 import asyncio
-from datetime import datetime, timedelta
+import weakref
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.conf import settings
 
+from .metrics import dashboard_metrics_service
+from .utils import WebSocketManager, presence, recycle_stale_connections
+
 User = get_user_model()
 
 
+# 每位用戶一把鎖，讓同時訂閱的多個分頁只觸發一次快照計算；
+# 只在使用中時保留，不會隨用戶數無限增長
+_snapshot_locks = weakref.WeakValueDictionary()
+
+
 class DashboardConsumer(AsyncWebsocketConsumer):
     """儀表板即時更新 Consumer"""
     
@@ -38,6 +45,11 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
+        # 記錄在線狀態
+        await presence(WebSocketManager.register_connection)(
+            self.user.id, self.channel_name
+        )
+        
         # 發送歡迎訊息
         await self.send(text_data=json.dumps({
             'type': 'connection_established',
@@ -48,7 +60,7 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         
         # 開始心跳檢測
         if hasattr(settings, 'WEBSOCKET_HEARTBEAT_INTERVAL'):
-            asyncio.create_task(self.heartbeat())
+            self.heartbeat_task = asyncio.create_task(self.heartbeat())
 
     async def disconnect(self, close_code):
         """WebSocket 斷線"""
@@ -57,6 +69,15 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             self.dashboard_group_name,
             self.channel_name
         )
+        
+        # 停止心跳，避免斷線後重新寫入在線狀態
+        if getattr(self, 'heartbeat_task', None):
+            self.heartbeat_task.cancel()
+        
+        if hasattr(self, 'user'):
+            await presence(WebSocketManager.unregister_connection)(
+                self.user.id, self.channel_name
+            )
 
     async def receive(self, text_data):
         """接收訊息"""
@@ -65,7 +86,10 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             message_type = data.get('type')
             
             if message_type == 'ping':
-                # 回應 ping
+                # 回應 ping 並更新在線狀態
+                await presence(WebSocketManager.heartbeat)(
+                    self.user.id, self.channel_name
+                )
                 await self.send(text_data=json.dumps({
                     'type': 'pong',
                     'timestamp': timezone.now().isoformat()
@@ -115,6 +139,9 @@ class DashboardConsumer(AsyncWebsocketConsumer):
         while True:
             try:
                 await asyncio.sleep(settings.WEBSOCKET_HEARTBEAT_INTERVAL)
+                await presence(WebSocketManager.heartbeat)(
+                    self.user.id, self.channel_name
+                )
                 await self.send(text_data=json.dumps({
                     'type': 'heartbeat',
                     'timestamp': timezone.now().isoformat()
@@ -147,61 +174,37 @@ class DashboardConsumer(AsyncWebsocketConsumer):
             'timestamp': event.get('timestamp', timezone.now().isoformat())
         }))
 
-    # 資料庫查詢方法
-    @database_sync_to_async
-    def get_user(self, user_id):
+    # 資料庫查詢方法（async ORM）
+    async def get_user(self, user_id):
         """取得用戶"""
+        await recycle_stale_connections()
         try:
-            return User.objects.get(id=user_id)
+            return await User.objects.aget(id=user_id)
         except User.DoesNotExist:
             return None
 
-    @database_sync_to_async
-    def get_dashboard_metrics(self):
+    async def get_snapshot(self):
+        """取得指標快照，同一用戶的多個連線共用一次查詢"""
+        lock = _snapshot_locks.get(str(self.user.id))
+        if lock is None:
+            lock = _snapshot_locks[str(self.user.id)] = asyncio.Lock()
+        async with lock:
+            return await self.load_snapshot()
+
+    async def load_snapshot(self):
+        """從快取或資料庫載入指標快照"""
+        await recycle_stale_connections()
+        return await dashboard_metrics_service.aget_snapshot(self.user.id)
+
+    async def get_dashboard_metrics(self):
         """取得儀表板指標"""
-        from apps.expenses.models import Expense
-        from django.db.models import Sum, Count
-        
-        # 本月支出統計
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        monthly_expenses = Expense.objects.filter(
-            user=self.user,
-            date__gte=month_start.date()
-        )
-        
-        total_amount = monthly_expenses.aggregate(Sum('amount'))['amount__sum'] or 0
-        expense_count = monthly_expenses.count()
-        
-        return {
-            'monthly_total': float(total_amount),
-            'expense_count': expense_count,
-            'last_updated': timezone.now().isoformat()
-        }
-
-    @database_sync_to_async
-    def get_expense_summary(self):
+        snapshot = await self.get_snapshot()
+        return dashboard_metrics_service.dashboard_metrics(snapshot)
+
+    async def get_expense_summary(self):
         """取得支出摘要"""
-        from apps.expenses.models import Expense
-        from django.db.models import Sum
-        
-        # 最近7天的支出
-        week_ago = timezone.now() - timedelta(days=7)
-        
-        recent_expenses = Expense.objects.filter(
-            user=self.user,
-            created_at__gte=week_ago
-        ).aggregate(
-            total=Sum('amount'),
-            count=Count('id')
-        )
-        
-        return {
-            'recent_total': float(recent_expenses['total'] or 0),
-            'recent_count': recent_expenses['count'],
-            'period': '最近7天'
-        }
+        snapshot = await self.get_snapshot()
+        return dashboard_metrics_service.expense_summary(snapshot)
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -228,8 +231,17 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
+        # 記錄在線狀態
+        await presence(WebSocketManager.register_connection)(
+            self.user.id, self.channel_name
+        )
+        
         # 發送未讀通知
         await self.send_unread_notifications()
+        
+        # 伺服器端定期更新在線狀態，客戶端不必送 ping
+        if hasattr(settings, 'WEBSOCKET_HEARTBEAT_INTERVAL'):
+            self.heartbeat_task = asyncio.create_task(self.heartbeat())
 
     async def disconnect(self, close_code):
         """WebSocket 斷線"""
@@ -237,6 +249,15 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             self.notification_group_name,
             self.channel_name
         )
+        
+        # 停止心跳，避免斷線後重新寫入在線狀態
+        if getattr(self, 'heartbeat_task', None):
+            self.heartbeat_task.cancel()
+        
+        if hasattr(self, 'user'):
+            await presence(WebSocketManager.unregister_connection)(
+                self.user.id, self.channel_name
+            )
 
     async def receive(self, text_data):
         """接收訊息"""
@@ -252,6 +273,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             elif message_type == 'get_notifications':
                 # 取得通知列表
                 await self.send_unread_notifications()
+            
+            elif message_type == 'ping':
+                # 更新在線狀態
+                await presence(WebSocketManager.heartbeat)(
+                    self.user.id, self.channel_name
+                )
                 
         except json.JSONDecodeError:
             await self.send(text_data=json.dumps({
@@ -259,6 +286,17 @@ class NotificationConsumer(AsyncWebsocketConsumer):
                 'message': '無效的 JSON 格式'
             }))
 
+    async def heartbeat(self):
+        """心跳：定期更新在線狀態"""
+        while True:
+            try:
+                await asyncio.sleep(settings.WEBSOCKET_HEARTBEAT_INTERVAL)
+                await presence(WebSocketManager.heartbeat)(
+                    self.user.id, self.channel_name
+                )
+            except:
+                break
+
     async def send_unread_notifications(self):
         """發送未讀通知"""
         notifications = await self.get_unread_notifications()
@@ -285,17 +323,16 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             'timestamp': event.get('timestamp', timezone.now().isoformat())
         }))
 
-    # 資料庫查詢方法
-    @database_sync_to_async
-    def get_user(self, user_id):
+    # 資料庫查詢方法（async ORM）
+    async def get_user(self, user_id):
         """取得用戶"""
+        await recycle_stale_connections()
         try:
-            return User.objects.get(id=user_id)
+            return await User.objects.aget(id=user_id)
         except User.DoesNotExist:
             return None
 
-    @database_sync_to_async
-    def get_unread_notifications(self):
+    async def get_unread_notifications(self):
         """取得未讀通知"""
         # 這裡應該從通知系統取得資料
         # 目前返回模擬資料
@@ -310,8 +347,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             }
         ]
 
-    @database_sync_to_async
-    def mark_notification_read(self, notification_id):
+    async def mark_notification_read(self, notification_id):
         """標記通知為已讀"""
         # 實際實作中應該更新資料庫
         pass
@@ -0,0 +1,241 @@
+"""
+財務目標進度計算
+
+以一次依 (用戶, 日期, 類型, 分類) 分組的支出彙總查詢，重新計算所有
+啟用中目標的 current_amount，並以 bulk_update 寫回；里程碑通知以
+GoalMilestone 的唯一索引判斷是否已發送，整批建立。
+
+current_amount = 自動計算值 + progress_adjustment；以 update_progress 手動
+設定的金額會記為差額，之後新增支出重新計算時仍保留。支出異動以
+schedule_recompute 排程，同一交易內的多筆支出只重算一次。
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AlertNotification, FinancialGoal, GoalMilestone
+from .utils import on_commit_batch
+
+
+class GoalProgressEngine:
+    """財務目標進度計算引擎"""
+
+    def active_goals(self, user_ids=None):
+        """取得啟用中的目標"""
+        goals = FinancialGoal.objects.filter(is_active=True)
+        if user_ids is not None:
+            goals = goals.filter(user_id__in=user_ids)
+        return list(goals)
+
+    def _daily_totals(self, goals):
+        """
+        一次查詢取得目標期間內的每日支出彙總
+
+        回傳 {user_id: [(day, type, category_id, total), ...]}
+        """
+        from apps.expenses.models import Expense
+
+        window_start = min(goal.start_date for goal in goals)
+        window_end = max(goal.end_date for goal in goals)
+        user_ids = {goal.user_id for goal in goals}
+
+        rows = Expense.objects.filter(
+            user_id__in=user_ids,
+            date__gte=timezone.make_aware(datetime.combine(window_start, time.min)),
+            date__lt=timezone.make_aware(datetime.combine(window_end + timedelta(days=1), time.min))
+        ).annotate(
+            day=TruncDate('date')
+        ).values('user_id', 'day', 'type', 'category_id').annotate(
+            total=Sum('amount')
+        ).order_by()
+
+        totals = defaultdict(list)
+        for row in rows:
+            totals[row['user_id']].append(
+                (row['day'], row['type'], row['category_id'], row['total'])
+            )
+        return totals
+
+    @staticmethod
+    def _goal_amount(goal, rows):
+        """依目標類型計算期間內的累計金額"""
+        from apps.expenses.models import ExpenseType
+
+        income = Decimal('0')
+        expense = Decimal('0')
+        for day, expense_type, category_id, total in rows:
+            if not goal.start_date <= day <= goal.end_date:
+                continue
+            if goal.goal_type == 'category_limit' and category_id != goal.category_id:
+                continue
+            if expense_type == ExpenseType.INCOME:
+                income += total
+            else:
+                expense += total
+
+        if goal.goal_type == 'income':
+            return income
+        if goal.goal_type == 'saving':
+            return max(Decimal('0'), income - expense)
+        return expense
+
+    def recompute(self, user_ids=None):
+        """重新計算目標進度並發送里程碑通知，回傳有變更的目標數"""
+        goals = self.active_goals(user_ids)
+        if not goals:
+            return 0
+
+        totals = self._daily_totals(goals)
+        now = timezone.now()
+        changed = []
+        for goal in goals:
+            amount = self._goal_amount(goal, totals.get(goal.user_id, [])) + goal.progress_adjustment
+            if amount != goal.current_amount:
+                goal.current_amount = amount
+                goal.updated_at = now
+                changed.append(goal)
+
+        if changed:
+            FinancialGoal.objects.bulk_update(changed, ['current_amount', 'updated_at'])
+
+        self.check_milestones(goals)
+        return len(changed)
+
+    def schedule_recompute(self, user_ids):
+        """
+        交易提交後重算指定用戶的目標進度
+
+        同一交易內多次呼叫（例如匯入大量支出）只在提交時重算一次；
+        不在交易中時立即重算。重算失敗只記錄，不影響已提交的支出。
+        """
+        on_commit_batch(
+            'goal_recompute',
+            lambda batched: self.recompute(user_ids=list(set(batched))),
+            user_ids
+        )
+
+    def set_progress(self, goal, amount):
+        """手動設定目標進度，記錄與自動計算值的差額並檢查里程碑"""
+        computed = self._goal_amount(goal, self._daily_totals([goal]).get(goal.user_id, []))
+        goal.progress_adjustment = amount - computed
+        goal.current_amount = amount
+        goal.save(update_fields=['current_amount', 'progress_adjustment', 'updated_at'])
+        self.check_milestones([goal])
+        return goal
+
+    def check_milestones(self, goals):
+        """整批檢查並建立尚未發送的里程碑通知"""
+        candidates = {
+            goal.id: goal for goal in goals
+            if goal.notify_on_progress and goal.notify_milestones
+        }
+        if not candidates:
+            return []
+
+        with transaction.atomic():
+            # 鎖定目標列，避免同時執行時重複通知
+            list(FinancialGoal.objects.select_for_update().filter(
+                id__in=candidates
+            ).values_list('id', flat=True))
+
+            reached = set(GoalMilestone.objects.filter(
+                goal_id__in=candidates
+            ).values_list('goal_id', 'milestone'))
+
+            pending = []
+            for goal in candidates.values():
+                progress = goal.progress_percentage
+                for milestone in goal.notify_milestones:
+                    milestone = int(milestone)
+                    if progress >= milestone and (goal.id, milestone) not in reached:
+                        pending.append((goal, milestone))
+
+            if pending:
+                # 舊版只以 AlertNotification 記錄已發送的里程碑，補建後不再重複通知
+                if backfill_legacy_milestones({goal.id for goal, _ in pending}):
+                    reached = set(GoalMilestone.objects.filter(
+                        goal_id__in=candidates
+                    ).values_list('goal_id', 'milestone'))
+                    pending = [(goal, milestone) for goal, milestone in pending
+                               if (goal.id, milestone) not in reached]
+
+            if not pending:
+                return []
+
+            notifications = AlertNotification.objects.bulk_create([
+                AlertNotification(
+                    user_id=goal.user_id,
+                    alert_type='income_goal',
+                    severity='success' if milestone == 100 else 'info',
+                    title=f'目標進度達成 {milestone}%',
+                    message=f'恭喜！您的目標「{goal.title}」已達成 {milestone}%',
+                    data={
+                        'goal_id': goal.id,
+                        'milestone': milestone,
+                        'current_amount': float(goal.current_amount),
+                        'target_amount': float(goal.target_amount)
+                    }
+                )
+                for goal, milestone in pending
+            ])
+
+            GoalMilestone.objects.bulk_create([
+                GoalMilestone(goal=goal, milestone=milestone, notification=notification)
+                for (goal, milestone), notification in zip(pending, notifications)
+            ])
+
+        return notifications
+
+
+def backfill_legacy_milestones(goal_ids=None):
+    """
+    由舊版里程碑通知建立 GoalMilestone，回傳補建筆數
+
+    舊版以 AlertNotification(alert_type='income_goal') 的 data.goal_id /
+    data.milestone 判斷是否已通知；可重複執行。
+    """
+    notifications = AlertNotification.objects.filter(
+        alert_type='income_goal', data__has_key='goal_id'
+    )
+    if goal_ids is not None:
+        notifications = notifications.filter(data__goal_id__in=list(goal_ids))
+
+    legacy = {}
+    for notification_id, data in notifications.order_by('created_at').values_list('id', 'data').iterator():
+        try:
+            key = (int(data['goal_id']), int(data['milestone']))
+        except (KeyError, TypeError, ValueError):
+            continue
+        legacy.setdefault(key, notification_id)
+    if not legacy:
+        return 0
+
+    existing_goals = set(FinancialGoal.objects.filter(
+        id__in={goal_id for goal_id, _ in legacy}
+    ).values_list('id', flat=True))
+    reached = set(GoalMilestone.objects.filter(
+        goal_id__in=existing_goals
+    ).values_list('goal_id', 'milestone'))
+
+    missing = [
+        GoalMilestone(goal_id=goal_id, milestone=milestone, notification_id=notification_id)
+        for (goal_id, milestone), notification_id in legacy.items()
+        if goal_id in existing_goals and (goal_id, milestone) not in reached
+    ]
+    GoalMilestone.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing)
+
+
+# 全域服務實例
+goal_progress_engine = GoalProgressEngine()
+
+
+def recompute_goal_progress(user_ids=None):
+    """重新計算財務目標進度（便捷函數）"""
+    return goal_progress_engine.recompute(user_ids)
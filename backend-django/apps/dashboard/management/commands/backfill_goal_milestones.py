@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.goals import backfill_legacy_milestones
+
+
+class Command(BaseCommand):
+    help = '由舊版里程碑通知補建 GoalMilestone，避免已發送的里程碑重複通知（可重複執行）'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🎯 補建目標里程碑紀錄...')
+        created = backfill_legacy_milestones()
+        self.stdout.write(self.style.SUCCESS(f'✅ 已補建 {created} 筆里程碑'))
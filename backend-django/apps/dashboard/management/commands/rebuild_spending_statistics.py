@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+from apps.expenses.models import Expense, ExpenseType
+from apps.dashboard.anomaly import EWMA_ALPHA
+from apps.dashboard.models import SpendingStatistic
+
+
+class Command(BaseCommand):
+    help = '從支出歷史批次重建各用戶分類的 EWMA 支出統計（建議每晚執行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='納入統計的歷史天數（預設 365 天）'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='每次寫入資料庫的筆數'
+        )
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        self.stdout.write(f'📊 讀取 {since.date()} 之後的支出記錄...')
+
+        rows = Expense.objects.filter(
+            type=ExpenseType.EXPENSE,
+            date__gte=since
+        ).order_by('date', 'id').values_list('user_id', 'category_id', 'amount', 'date')
+
+        df = pd.DataFrame.from_records(
+            rows.iterator(chunk_size=10000),
+            columns=['user_id', 'category_id', 'amount', 'date']
+        )
+        if df.empty:
+            self.stdout.write(self.style.WARNING('⚠️  沒有可用的支出記錄'))
+            return
+
+        df['amount'] = df['amount'].astype(np.float64)
+        self.stdout.write(f'📋 共 {len(df)} 筆支出，開始計算統計...')
+
+        # 以向量化方式計算每組的 EWMA 平均與變異數（與即時更新使用相同遞迴式）
+        grouped = df.groupby(['user_id', 'category_id'], sort=False)['amount']
+        df['ewma_mean'] = grouped.transform(
+            lambda s: s.ewm(alpha=EWMA_ALPHA, adjust=False).mean()
+        )
+        df['ewma_variance'] = grouped.transform(
+            lambda s: s.ewm(alpha=EWMA_ALPHA, adjust=False).var(bias=True)
+        ).fillna(0.0)
+
+        summary = df.groupby(['user_id', 'category_id'], sort=False).agg(
+            ewma_mean=('ewma_mean', 'last'),
+            ewma_variance=('ewma_variance', 'last'),
+            sample_count=('amount', 'size'),
+            last_expense_at=('date', 'max'),
+        ).reset_index()
+
+        statistics = [
+            SpendingStatistic(
+                user_id=int(row.user_id),
+                category_id=int(row.category_id),
+                ewma_mean=float(row.ewma_mean),
+                ewma_variance=float(row.ewma_variance),
+                sample_count=int(row.sample_count),
+                last_expense_at=row.last_expense_at.to_pydatetime(),
+            )
+            for row in summary.itertuples(index=False)
+        ]
+
+        SpendingStatistic.objects.bulk_create(
+            statistics,
+            batch_size=options['batch_size'],
+            update_conflicts=True,
+            unique_fields=['user', 'category'],
+            update_fields=['ewma_mean', 'ewma_variance', 'sample_count', 'last_expense_at', 'updated_at'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'✅ 已重建 {len(statistics)} 組分類支出統計'))
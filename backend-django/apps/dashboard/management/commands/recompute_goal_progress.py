@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.dashboard.goals import goal_progress_engine
+
+
+class Command(BaseCommand):
+    help = '依支出記錄批次重算財務目標進度並發送里程碑通知（建議定期執行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='只重算指定用戶 ID（可重複指定）'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('🎯 重新計算財務目標進度...')
+        changed = goal_progress_engine.recompute(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'✅ 已更新 {changed} 個目標的進度'))
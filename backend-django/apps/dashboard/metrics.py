@@ -0,0 +1,295 @@
+"""
+儀表板指標快照
+
+每位用戶的儀表板指標以快照形式存放在 Django cache（本地記憶體或 Redis），
+支出寫入時以增量方式更新快照並透過 dashboard_update 推送差異，
+避免每個分頁訂閱時都重新執行彙總查詢。
+
+每位用戶另有一個世代號（generation），快照記錄建立時的世代號；
+清除快照或無法套用增量時遞增世代號，之前開始計算或讀取的快照
+即使之後才寫回快取，也會因世代號不符而視為失效，不會遺漏增量。
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .utils import send_dashboard_update
+
+
+# 最近支出摘要的統計天數
+RECENT_DAYS = 7
+
+
+class DashboardMetricsService:
+    """儀表板指標快照服務"""
+
+    cache_prefix = 'dashboard_metrics'
+    cache_timeout = 60 * 60  # 快照保留 1 小時，逾時後重新計算
+    lock_timeout = 5
+    lock_wait = 0.2  # 等待其他寫入者釋放鎖的秒數
+
+    def _cache_key(self, user_id):
+        return f'{self.cache_prefix}:{user_id}'
+
+    def _lock_key(self, user_id):
+        return f'{self.cache_prefix}:{user_id}:lock'
+
+    def _generation_key(self, user_id):
+        return f'{self.cache_prefix}:{user_id}:generation'
+
+    @staticmethod
+    def _initial_generation():
+        # 以時間戳記初始化，快取被清空後也不會與舊快照的世代號重複
+        return int(time.time() * 1000)
+
+    def _generation(self, user_id):
+        """目前的世代號"""
+        key = self._generation_key(user_id)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, self._initial_generation(), None)
+            generation = cache.get(key)
+        return generation
+
+    async def _ageneration(self, user_id):
+        key = self._generation_key(user_id)
+        generation = await cache.aget(key)
+        if generation is None:
+            await cache.aadd(key, self._initial_generation(), None)
+            generation = await cache.aget(key)
+        return generation
+
+    def _bump_generation(self, user_id):
+        """使目前與計算中的快照全部失效"""
+        self._generation(user_id)
+        try:
+            cache.incr(self._generation_key(user_id))
+        except ValueError:
+            cache.set(self._generation_key(user_id), self._initial_generation(), None)
+
+    def _acquire_lock(self, user_id):
+        """取得快照寫入鎖，短暫等待其他寫入者"""
+        deadline = time.monotonic() + self.lock_wait
+        while not cache.add(self._lock_key(user_id), 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @staticmethod
+    def _month_key(value):
+        return value.strftime('%Y-%m')
+
+    @staticmethod
+    def _local_date(value):
+        """將日期時間轉為本地日期"""
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+
+    def _recent_start(self, today):
+        return today - timedelta(days=RECENT_DAYS - 1)
+
+    def _snapshot_querysets(self, user_id):
+        """快照所需的月度彙總與每日彙總查詢"""
+        from apps.expenses.models import Expense
+
+        now = timezone.localtime()
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        recent_start = self._recent_start(now.date())
+
+        user_expenses = Expense.objects.filter(user_id=user_id)
+
+        monthly = user_expenses.filter(date__gte=month_start)
+
+        daily_rows = user_expenses.filter(
+            created_at__date__gte=recent_start
+        ).annotate(
+            day=TruncDate('created_at')
+        ).values('day').annotate(total=Sum('amount'), count=Count('id'))
+
+        return now, monthly, daily_rows
+
+    def _build_snapshot(self, now, monthly, daily_rows):
+        return {
+            'month': self._month_key(now),
+            'monthly_total': monthly['total'] or Decimal('0'),
+            'expense_count': monthly['count'] or 0,
+            'daily': {
+                row['day'].isoformat(): {'total': row['total'], 'count': row['count']}
+                for row in daily_rows
+            },
+            'last_updated': timezone.now().isoformat(),
+        }
+
+    def compute_snapshot(self, user_id):
+        """從資料庫重新計算指標快照"""
+        now, monthly, daily_rows = self._snapshot_querysets(user_id)
+        return self._build_snapshot(
+            now,
+            monthly.aggregate(total=Sum('amount'), count=Count('id')),
+            list(daily_rows)
+        )
+
+    async def acompute_snapshot(self, user_id):
+        """compute_snapshot 的非同步版本（WebSocket consumer 使用）"""
+        now, monthly, daily_rows = self._snapshot_querysets(user_id)
+        return self._build_snapshot(
+            now,
+            await monthly.aaggregate(total=Sum('amount'), count=Count('id')),
+            [row async for row in daily_rows]
+        )
+
+    def _is_stale(self, snapshot):
+        """跨月後快照的月度統計失效"""
+        return snapshot.get('month') != self._month_key(timezone.localtime())
+
+    def _is_valid(self, snapshot, generation):
+        return (
+            snapshot is not None
+            and snapshot.get('generation') == generation
+            and not self._is_stale(snapshot)
+        )
+
+    def get_snapshot(self, user_id):
+        """取得指標快照，快取未命中時才查詢資料庫"""
+        generation = self._generation(user_id)
+        snapshot = cache.get(self._cache_key(user_id))
+        if not self._is_valid(snapshot, generation):
+            snapshot = self.compute_snapshot(user_id)
+            snapshot['generation'] = generation
+            cache.set(self._cache_key(user_id), snapshot, self.cache_timeout)
+        return snapshot
+
+    async def aget_snapshot(self, user_id):
+        """get_snapshot 的非同步版本"""
+        generation = await self._ageneration(user_id)
+        snapshot = await cache.aget(self._cache_key(user_id))
+        if not self._is_valid(snapshot, generation):
+            snapshot = await self.acompute_snapshot(user_id)
+            snapshot['generation'] = generation
+            await cache.aset(self._cache_key(user_id), snapshot, self.cache_timeout)
+        return snapshot
+
+    def invalidate(self, user_id):
+        """清除快照，下次讀取時重新計算"""
+        self._bump_generation(user_id)
+        cache.delete(self._cache_key(user_id))
+
+    def dashboard_metrics(self, snapshot):
+        """轉換為 dashboard_metrics 訊息格式"""
+        return {
+            'monthly_total': float(snapshot['monthly_total']),
+            'expense_count': snapshot['expense_count'],
+            'last_updated': snapshot['last_updated'],
+        }
+
+    def expense_summary(self, snapshot):
+        """轉換為 expense_summary 訊息格式（以日為統計單位）"""
+        recent_start = self._recent_start(timezone.localdate()).isoformat()
+        recent = [
+            bucket for day, bucket in snapshot['daily'].items()
+            if day >= recent_start
+        ]
+        return {
+            'recent_total': float(sum((b['total'] for b in recent), Decimal('0'))),
+            'recent_count': sum(b['count'] for b in recent),
+            'period': f'最近{RECENT_DAYS}天'
+        }
+
+    def _expense_delta(self, amount, date, created_at, sign):
+        """計算單筆支出對快照造成的差異"""
+        now = timezone.localtime()
+        amount = Decimal(amount) * sign
+        delta = {
+            'monthly_total': Decimal('0'),
+            'expense_count': 0,
+            'recent_total': Decimal('0'),
+            'recent_count': 0,
+            'day': None,
+        }
+
+        if self._month_key(self._local_date(date)) == self._month_key(now):
+            delta['monthly_total'] = amount
+            delta['expense_count'] = sign
+
+        created_day = self._local_date(created_at or timezone.now())
+        if created_day >= self._recent_start(now.date()):
+            delta['recent_total'] = amount
+            delta['recent_count'] = sign
+            delta['day'] = created_day.isoformat()
+
+        return delta
+
+    def apply_expense_change(self, user_id, amount, date, created_at, sign=1):
+        """
+        將支出增減套用到快照
+
+        只在快照有效時更新；快照不存在、等待鎖逾時或寫回前世代號已變更時
+        遞增世代號，讓計算中或已讀取的舊快照失效，由下一次讀取重新計算，
+        確保不會寫入遺漏增量的累計值。回傳本次差異。
+        """
+        delta = self._expense_delta(amount, date, created_at, sign)
+        key = self._cache_key(user_id)
+
+        if not self._acquire_lock(user_id):
+            self.invalidate(user_id)
+            return delta
+
+        try:
+            generation = self._generation(user_id)
+            snapshot = cache.get(key)
+            if not self._is_valid(snapshot, generation):
+                # 可能有尚未寫回的計算結果，使其失效
+                self.invalidate(user_id)
+                return delta
+
+            snapshot['monthly_total'] += delta['monthly_total']
+            snapshot['expense_count'] += delta['expense_count']
+            if delta['day']:
+                bucket = snapshot['daily'].setdefault(
+                    delta['day'], {'total': Decimal('0'), 'count': 0}
+                )
+                bucket['total'] += delta['recent_total']
+                bucket['count'] += delta['recent_count']
+            snapshot['last_updated'] = timezone.now().isoformat()
+
+            if cache.get(self._generation_key(user_id)) != generation:
+                cache.delete(key)
+                return delta
+            cache.set(key, snapshot, self.cache_timeout)
+            return delta
+        finally:
+            cache.delete(self._lock_key(user_id))
+
+    def push_delta(self, user_id, delta):
+        """透過 dashboard_update 推送增量與最新指標"""
+        snapshot = cache.get(self._cache_key(user_id))
+        data = {
+            'delta': {
+                'monthly_total': float(delta['monthly_total']),
+                'expense_count': delta['expense_count'],
+                'recent_total': float(delta['recent_total']),
+                'recent_count': delta['recent_count'],
+            }
+        }
+        if snapshot is not None:
+            data['dashboard_metrics'] = self.dashboard_metrics(snapshot)
+            data['expense_summary'] = self.expense_summary(snapshot)
+
+        send_dashboard_update(user_id, data)
+
+
+# 全域服務實例
+dashboard_metrics_service = DashboardMetricsService()
+
+
+def get_dashboard_snapshot(user_id):
+    """取得儀表板指標快照（便捷函數）"""
+    return dashboard_metrics_service.get_snapshot(user_id)
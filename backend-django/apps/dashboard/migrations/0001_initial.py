@@ -0,0 +1,371 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "alert_type",
+                    models.CharField(
+                        choices=[
+                            ("expense_limit", "支出限額警報"),
+                            ("income_goal", "收入目標警報"),
+                            ("unusual_spending", "異常支出警報"),
+                            ("budget_exceeded", "預算超支警報"),
+                            ("system", "系統通知"),
+                        ],
+                        max_length=20,
+                        verbose_name="警報類型",
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("info", "資訊"),
+                            ("warning", "警告"),
+                            ("error", "錯誤"),
+                            ("success", "成功"),
+                        ],
+                        default="info",
+                        max_length=10,
+                        verbose_name="嚴重程度",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100, verbose_name="標題")),
+                ("message", models.TextField(verbose_name="訊息內容")),
+                (
+                    "data",
+                    models.JSONField(
+                        default=dict, help_text="警報相關的額外資料", verbose_name="相關資料"
+                    ),
+                ),
+                ("is_read", models.BooleanField(default=False, verbose_name="已讀狀態")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="創建時間"),
+                ),
+                (
+                    "read_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="閱讀時間"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alert_notifications",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="用戶",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "警報通知",
+                "verbose_name_plural": "警報通知",
+                "db_table": "alert_notifications",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DashboardConfig",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "theme",
+                    models.CharField(
+                        choices=[("light", "淺色主題"), ("dark", "深色主題"), ("auto", "自動主題")],
+                        default="light",
+                        max_length=10,
+                        verbose_name="主題",
+                    ),
+                ),
+                (
+                    "primary_color",
+                    models.CharField(
+                        default="#4F46E5",
+                        help_text="十六進制顏色碼",
+                        max_length=7,
+                        verbose_name="主要顏色",
+                    ),
+                ),
+                (
+                    "secondary_color",
+                    models.CharField(
+                        default="#10B981",
+                        help_text="十六進制顏色碼",
+                        max_length=7,
+                        verbose_name="次要顏色",
+                    ),
+                ),
+                (
+                    "show_income_expense_trend",
+                    models.BooleanField(default=True, verbose_name="顯示收支趨勢圖"),
+                ),
+                (
+                    "show_category_pie",
+                    models.BooleanField(default=True, verbose_name="顯示分類圓餅圖"),
+                ),
+                (
+                    "show_group_comparison",
+                    models.BooleanField(default=True, verbose_name="顯示群組對比圖"),
+                ),
+                (
+                    "show_monthly_comparison",
+                    models.BooleanField(default=True, verbose_name="顯示月度對比圖"),
+                ),
+                (
+                    "enable_expense_alerts",
+                    models.BooleanField(default=True, verbose_name="啟用支出警報"),
+                ),
+                (
+                    "expense_limit_daily",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="每日支出限額",
+                    ),
+                ),
+                (
+                    "expense_limit_monthly",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="每月支出限額",
+                    ),
+                ),
+                (
+                    "enable_income_goals",
+                    models.BooleanField(default=False, verbose_name="啟用收入目標"),
+                ),
+                (
+                    "income_goal_monthly",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="每月收入目標",
+                    ),
+                ),
+                (
+                    "enable_unusual_spending_alerts",
+                    models.BooleanField(default=True, verbose_name="啟用異常支出警報"),
+                ),
+                (
+                    "custom_settings",
+                    models.JSONField(
+                        default=dict, help_text="其他客製化設定的 JSON 資料", verbose_name="自定義設定"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="創建時間"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="dashboard_config",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="用戶",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "儀表板配置",
+                "verbose_name_plural": "儀表板配置",
+                "db_table": "dashboard_configs",
+            },
+        ),
+        migrations.CreateModel(
+            name="FinancialGoal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "goal_type",
+                    models.CharField(
+                        choices=[
+                            ("saving", "儲蓄目標"),
+                            ("income", "收入目標"),
+                            ("expense_limit", "支出限制"),
+                            ("category_limit", "分類支出限制"),
+                        ],
+                        max_length=20,
+                        verbose_name="目標類型",
+                    ),
+                ),
+                ("title", models.CharField(max_length=100, verbose_name="目標標題")),
+                ("description", models.TextField(blank=True, verbose_name="目標描述")),
+                (
+                    "target_amount",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="目標金額"
+                    ),
+                ),
+                (
+                    "current_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=12, verbose_name="當前金額"
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[
+                            ("daily", "每日"),
+                            ("weekly", "每週"),
+                            ("monthly", "每月"),
+                            ("quarterly", "每季"),
+                            ("yearly", "每年"),
+                        ],
+                        default="monthly",
+                        max_length=10,
+                        verbose_name="週期",
+                    ),
+                ),
+                ("start_date", models.DateField(verbose_name="開始日期")),
+                ("end_date", models.DateField(verbose_name="結束日期")),
+                ("is_active", models.BooleanField(default=True, verbose_name="是否啟用")),
+                (
+                    "notify_on_progress",
+                    models.BooleanField(default=True, verbose_name="進度通知"),
+                ),
+                (
+                    "notify_milestones",
+                    models.JSONField(
+                        default=list,
+                        help_text="百分比清單，例如 [25, 50, 75, 100]",
+                        verbose_name="里程碑通知",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="創建時間"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="categories.category",
+                        verbose_name="相關分類",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="financial_goals",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="用戶",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "財務目標",
+                "verbose_name_plural": "財務目標",
+                "db_table": "financial_goals",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SpendingStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("ewma_mean", models.FloatField(default=0, verbose_name="加權平均")),
+                ("ewma_variance", models.FloatField(default=0, verbose_name="加權變異數")),
+                ("sample_count", models.IntegerField(default=0, verbose_name="樣本數量")),
+                (
+                    "last_expense_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="最後支出時間"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spending_statistics",
+                        to="categories.category",
+                        verbose_name="分類",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spending_statistics",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="用戶",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "分類支出統計",
+                "verbose_name_plural": "分類支出統計",
+                "db_table": "spending_statistics",
+                "unique_together": {("user", "category")},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("dashboard", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="financialgoal",
+            name="progress_adjustment",
+            field=models.DecimalField(
+                decimal_places=2, default=0, max_digits=12, verbose_name="手動調整金額"
+            ),
+        ),
+        migrations.CreateModel(
+            name="GoalMilestone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("milestone", models.PositiveSmallIntegerField(verbose_name="里程碑百分比")),
+                (
+                    "reached_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="達成時間"),
+                ),
+                (
+                    "goal",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reached_milestones",
+                        to="dashboard.financialgoal",
+                        verbose_name="財務目標",
+                    ),
+                ),
+                (
+                    "notification",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="dashboard.alertnotification",
+                        verbose_name="通知",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "目標里程碑",
+                "verbose_name_plural": "目標里程碑",
+                "db_table": "goal_milestones",
+                "unique_together": {("goal", "milestone")},
+            },
+        ),
+    ]
@@ -291,6 +291,14 @@ class FinancialGoal(models.Model):
         verbose_name='當前金額'
     )
     
+    # 手動設定進度時與自動計算值的差額，重新計算時保留
+    progress_adjustment = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        verbose_name='手動調整金額'
+    )
+    
     period = models.CharField(
         max_length=10,
         choices=PERIODS,
@@ -356,4 +364,84 @@ class FinancialGoal(models.Model):
     @property
     def remaining_amount(self):
         """剩餘金額"""
-        return max(0, self.target_amount - self.current_amount)
\ No newline at end of file
+        return max(0, self.target_amount - self.current_amount)
+
+
+class SpendingStatistic(models.Model):
+    """
+    用戶分類支出統計
+
+    以指數加權移動平均 (EWMA) 記錄每位用戶在各分類的支出平均與變異數，
+    每筆新支出以 O(1) 更新，供異常支出偵測使用。
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='spending_statistics',
+        verbose_name='用戶'
+    )
+    
+    category = models.ForeignKey(
+        'categories.Category',
+        on_delete=models.CASCADE,
+        related_name='spending_statistics',
+        verbose_name='分類'
+    )
+    
+    ewma_mean = models.FloatField(default=0, verbose_name='加權平均')
+    ewma_variance = models.FloatField(default=0, verbose_name='加權變異數')
+    sample_count = models.IntegerField(default=0, verbose_name='樣本數量')
+    
+    last_expense_at = models.DateTimeField(null=True, blank=True, verbose_name='最後支出時間')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
+    
+    class Meta:
+        verbose_name = '分類支出統計'
+        verbose_name_plural = '分類支出統計'
+        db_table = 'spending_statistics'
+        unique_together = ['user', 'category']
+    
+    def __str__(self):
+        return f"{self.user.name} - {self.category.name} (平均 {self.ewma_mean:.0f})"
+    
+    @property
+    def std_deviation(self):
+        """加權標準差"""
+        return max(self.ewma_variance, 0) ** 0.5
+
+
+class GoalMilestone(models.Model):
+    """
+    財務目標已通知的里程碑
+
+    以 (goal, milestone) 唯一索引記錄已發送的里程碑通知，
+    取代以 AlertNotification.data 的 JSON 欄位查詢是否已通知。
+    """
+    goal = models.ForeignKey(
+        FinancialGoal,
+        on_delete=models.CASCADE,
+        related_name='reached_milestones',
+        verbose_name='財務目標'
+    )
+    
+    milestone = models.PositiveSmallIntegerField(verbose_name='里程碑百分比')
+    
+    notification = models.ForeignKey(
+        AlertNotification,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='通知'
+    )
+    
+    reached_at = models.DateTimeField(auto_now_add=True, verbose_name='達成時間')
+    
+    class Meta:
+        verbose_name = '目標里程碑'
+        verbose_name_plural = '目標里程碑'
+        db_table = 'goal_milestones'
+        unique_together = ['goal', 'milestone']
+    
+    def __str__(self):
+        return f"{self.goal.title} - {self.milestone}%"
@@ -68,13 +68,13 @@ class FinancialGoalSerializer(serializers.ModelSerializer):
         model = FinancialGoal
         fields = [
             'id', 'goal_type', 'title', 'description',
-            'target_amount', 'current_amount', 'period',
+            'target_amount', 'current_amount', 'progress_adjustment', 'period',
             'start_date', 'end_date', 'category', 'is_active',
             'notify_on_progress', 'notify_milestones',
             'progress_percentage', 'is_completed', 'remaining_amount',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'progress_adjustment', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         # 自動設定當前用戶
@@ -91,6 +91,15 @@ class FinancialGoalUpdateSerializer(serializers.ModelSerializer):
             'title', 'description', 'target_amount', 'current_amount',
             'end_date', 'is_active', 'notify_on_progress', 'notify_milestones'
         ]
+    
+    def update(self, instance, validated_data):
+        # 手動修改進度時記錄與自動計算值的差額，避免被下次重新計算覆蓋
+        current_amount = validated_data.pop('current_amount', None)
+        instance = super().update(instance, validated_data)
+        if current_amount is not None and current_amount != instance.current_amount:
+            from .goals import goal_progress_engine
+            goal_progress_engine.set_progress(instance, current_amount)
+        return instance
 
 
 class DashboardStatsSerializer(serializers.Serializer):
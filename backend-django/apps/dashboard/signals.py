@@ -0,0 +1,120 @@
+"""
+儀表板相關信號處理器
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.expenses.models import Expense, ExpenseType
+from .alerts import spending_limit_evaluator
+from .anomaly import unusual_spending_detector
+from .goals import goal_progress_engine
+from .metrics import dashboard_metrics_service
+from .models import DashboardConfig
+from .utils import on_commit_batch
+
+
+# 單筆支出對統計造成的變更，sign 為 1（加入）或 -1（移除）
+ExpenseChange = namedtuple(
+    'ExpenseChange', ['user_id', 'amount', 'date', 'created_at', 'type', 'sign']
+)
+
+
+def _merge_deltas(deltas):
+    """合併同一用戶的多個差異"""
+    merged = None
+    for delta in deltas:
+        if merged is None:
+            merged = dict(delta)
+            continue
+        for field in ('monthly_total', 'expense_count', 'recent_total', 'recent_count'):
+            merged[field] += delta[field]
+    return merged
+
+
+def _apply_changes(changes):
+    """更新儀表板快照、推送差異並檢查支出限額"""
+    by_user = {}
+    for change in changes:
+        delta = dashboard_metrics_service.apply_expense_change(
+            change.user_id, change.amount, change.date, change.created_at, change.sign
+        )
+        by_user.setdefault(change.user_id, []).append(delta)
+
+    for user_id, deltas in by_user.items():
+        dashboard_metrics_service.push_delta(user_id, _merge_deltas(deltas))
+
+    spending_limit_evaluator.apply_changes(
+        (c.user_id, c.amount, c.date, c.type, c.sign) for c in changes
+    )
+
+
+def _schedule_changes(changes):
+    """
+    交易提交後才套用，避免回滾時快照與計數器失準
+
+    同一交易內多筆支出的變更合併為一次套用（快照、推送與限額檢查）。
+    """
+    on_commit_batch('expense_changes', _apply_changes, changes)
+    # 目標進度需整段期間彙總，同一交易內的支出合併為一次重算
+    goal_progress_engine.schedule_recompute({change.user_id for change in changes})
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense(sender, instance, raw=False, **kwargs):
+    """記錄更新前的金額與日期，供增量計算使用"""
+    if raw or not instance.pk:
+        return
+    instance._dashboard_previous = Expense.objects.filter(pk=instance.pk).values(
+        'user_id', 'amount', 'date', 'created_at', 'type'
+    ).first()
+
+
+@receiver(post_save, sender=Expense)
+def update_dashboard_metrics_on_save(sender, instance, created, raw=False, **kwargs):
+    """支出新增或更新時增量更新儀表板快照"""
+    if raw:
+        return
+
+    changes = []
+    previous = getattr(instance, '_dashboard_previous', None)
+    if not created and previous:
+        changes.append(ExpenseChange(sign=-1, **previous))
+    changes.append(ExpenseChange(
+        instance.user_id, instance.amount, instance.date, instance.created_at,
+        instance.type, 1
+    ))
+    instance._dashboard_previous = None
+
+    _schedule_changes(changes)
+
+    # 新增支出時更新分類統計並偵測異常；偵測失敗只記錄，不影響已提交的支出
+    if created and instance.type == ExpenseType.EXPENSE:
+        transaction.on_commit(lambda: unusual_spending_detector.observe(
+            instance.id, instance.user_id, instance.category_id,
+            instance.amount, instance.date
+        ), robust=True)
+
+
+@receiver(post_delete, sender=Expense)
+def update_dashboard_metrics_on_delete(sender, instance, **kwargs):
+    """支出刪除時扣除快照中的金額"""
+    _schedule_changes([ExpenseChange(
+        instance.user_id, instance.amount, instance.date, instance.created_at,
+        instance.type, -1
+    )])
+
+
+@receiver(post_save, sender=DashboardConfig)
+def refresh_spending_limits(sender, instance, raw=False, **kwargs):
+    """警報設定變更時清除快取"""
+    if raw:
+        return
+
+    def invalidate():
+        spending_limit_evaluator.invalidate_user(instance.user_id)
+        unusual_spending_detector.invalidate_user(instance.user_id)
+
+    transaction.on_commit(invalidate)
@@ -3,12 +3,19 @@ Dashboard 工具函數
 """
 
 import json
+import logging
+import threading
+import time
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import close_old_connections, transaction
 from django.utils import timezone
 from django.conf import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class RealtimeNotificationService:
     """即時通知服務"""
     
@@ -19,6 +26,8 @@ class RealtimeNotificationService:
         """發送儀表板更新通知"""
         if not settings.REALTIME_NOTIFICATIONS.get('DASHBOARD_METRICS', True):
             return
+        if not WebSocketManager.is_user_online(user_id):
+            return
         
         async_to_sync(self.channel_layer.group_send)(
             f'dashboard_{user_id}',
@@ -33,6 +42,8 @@ class RealtimeNotificationService:
         """發送支出相關通知"""
         if not settings.REALTIME_NOTIFICATIONS.get('EXPENSE_UPDATES', True):
             return
+        if not WebSocketManager.is_user_online(user_id):
+            return
         
         async_to_sync(self.channel_layer.group_send)(
             f'dashboard_{user_id}',
@@ -45,6 +56,9 @@ class RealtimeNotificationService:
     
     def send_notification(self, user_id, notification_data):
         """發送通用通知"""
+        if not WebSocketManager.is_user_online(user_id):
+            return
+        
         async_to_sync(self.channel_layer.group_send)(
             f'notifications_{user_id}',
             {
@@ -58,6 +72,8 @@ class RealtimeNotificationService:
         """發送系統告警通知"""
         if not settings.REALTIME_NOTIFICATIONS.get('SYSTEM_ALERTS', True):
             return
+        if not WebSocketManager.is_user_online(user_id):
+            return
         
         async_to_sync(self.channel_layer.group_send)(
             f'notifications_{user_id}',
@@ -80,32 +96,239 @@ class RealtimeNotificationService:
         )
 
 
+class RedisPresenceStore:
+    """
+    以 Redis sorted set 記錄 WebSocket 在線狀態
+
+    presence:user:<user_id>  成員為 channel_name，分數為最後心跳時間
+    presence:online          成員為 user_id，分數為最後心跳時間
+    超過 TTL 未心跳的連線視為離線。
+    """
+
+    key_prefix = 'presence'
+    shared = True  # 所有行程共用，可據以略過離線用戶的推送
+
+    def __init__(self, url, ttl):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def _user_key(self, user_id):
+        return f'{self.key_prefix}:user:{user_id}'
+
+    @property
+    def _online_key(self):
+        return f'{self.key_prefix}:online'
+
+    def touch(self, user_id, channel_name):
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zadd(self._user_key(user_id), {channel_name: now})
+        pipe.expire(self._user_key(user_id), self.ttl)
+        pipe.zadd(self._online_key, {str(user_id): now})
+        pipe.execute()
+
+    def remove(self, user_id, channel_name):
+        user_key = self._user_key(user_id)
+        pipe = self.client.pipeline()
+        pipe.zrem(user_key, channel_name)
+        pipe.zremrangebyscore(user_key, '-inf', time.time() - self.ttl)
+        pipe.zcard(user_key)
+        remaining = pipe.execute()[-1]
+        if remaining == 0:
+            self.client.zrem(self._online_key, str(user_id))
+
+    def count(self, user_id):
+        user_key = self._user_key(user_id)
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(user_key, '-inf', time.time() - self.ttl)
+        pipe.zcard(user_key)
+        return pipe.execute()[-1]
+
+    def online_users(self):
+        self.client.zremrangebyscore(self._online_key, '-inf', time.time() - self.ttl)
+        return [
+            member.decode() if isinstance(member, bytes) else member
+            for member in self.client.zrange(self._online_key, 0, -1)
+        ]
+
+
+class LocalPresenceStore:
+    """未設定 Redis 時使用的行程內在線狀態（僅適用單一行程）"""
+
+    shared = False  # 看不到其他行程的連線，不可據以判定離線
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, user_id):
+        channels = self._connections.get(user_id, {})
+        expire_before = time.time() - self.ttl
+        for channel_name in [c for c, seen in channels.items() if seen < expire_before]:
+            del channels[channel_name]
+        if not channels:
+            self._connections.pop(user_id, None)
+        return channels
+
+    def touch(self, user_id, channel_name):
+        with self._lock:
+            self._connections.setdefault(str(user_id), {})[channel_name] = time.time()
+
+    def remove(self, user_id, channel_name):
+        with self._lock:
+            self._connections.get(str(user_id), {}).pop(channel_name, None)
+            self._prune(str(user_id))
+
+    def count(self, user_id):
+        with self._lock:
+            return len(self._prune(str(user_id)))
+
+    def online_users(self):
+        with self._lock:
+            return [user_id for user_id in list(self._connections) if self._prune(user_id)]
+
+
+_presence_store = None
+_presence_store_lock = threading.Lock()
+
+
+def get_presence_store():
+    """取得在線狀態儲存（有 REDIS_URL 時使用 Redis）"""
+    global _presence_store
+    if _presence_store is None:
+        # consumer 從多個執行緒呼叫，只建立一個實例
+        with _presence_store_lock:
+            if _presence_store is None:
+                ttl = settings.WEBSOCKET_HEARTBEAT_INTERVAL * 3
+                redis_url = getattr(settings, 'REDIS_URL', None)
+                if redis_url:
+                    _presence_store = RedisPresenceStore(redis_url, ttl)
+                else:
+                    _presence_store = LocalPresenceStore(ttl)
+    return _presence_store
+
+
+def presence(method):
+    """
+    包裝在線狀態操作供 consumer 呼叫
+
+    在線狀態寫入同步 Redis 客戶端，與 ORM 無關；不使用 thread_sensitive，
+    避免所有連線的心跳排隊在共用的 sync 執行緒上。
+    """
+    return sync_to_async(method, thread_sensitive=False)
+
+
 class WebSocketManager:
     """WebSocket 連線管理器"""
     
+    @staticmethod
+    def register_connection(user_id, channel_name):
+        """記錄連線建立或心跳"""
+        try:
+            get_presence_store().touch(user_id, channel_name)
+        except Exception:
+            logger.warning('無法更新 WebSocket 在線狀態', exc_info=True)
+    
+    @staticmethod
+    def heartbeat(user_id, channel_name):
+        """更新連線的最後心跳時間"""
+        WebSocketManager.register_connection(user_id, channel_name)
+    
+    @staticmethod
+    def unregister_connection(user_id, channel_name):
+        """記錄連線中斷"""
+        try:
+            get_presence_store().remove(user_id, channel_name)
+        except Exception:
+            logger.warning('無法移除 WebSocket 在線狀態', exc_info=True)
+    
     @staticmethod
     def get_user_connections(user_id):
         """取得用戶的 WebSocket 連線數量"""
-        # 實際實作中可能需要使用 Redis 來追蹤連線
-        # 這裡返回模擬資料
-        return 1
+        return get_presence_store().count(user_id)
     
     @staticmethod
     def is_user_online(user_id):
-        """檢查用戶是否在線"""
-        return WebSocketManager.get_user_connections(user_id) > 0
+        """
+        檢查用戶是否在線，無法取得狀態時視為在線
+
+        在線狀態只存在本行程時，連線可能在其他 worker 上，一律視為在線。
+        """
+        try:
+            store = get_presence_store()
+            if not store.shared:
+                return True
+            return store.count(user_id) > 0
+        except Exception:
+            logger.warning('無法取得 WebSocket 在線狀態', exc_info=True)
+            return True
     
     @staticmethod
     def get_all_online_users():
         """取得所有在線用戶"""
-        # 實際實作中應該從 channel layer 或 Redis 取得
-        return []
+        return get_presence_store().online_users()
 
 
 # 全域服務實例
 notification_service = RealtimeNotificationService()
 
 
+# WebSocket consumer 以 async ORM 查詢時，連線不會在每次查詢前後檢查；
+# 改為每隔一段時間回收一次逾時或失效的連線
+CONNECTION_RECYCLE_INTERVAL = 30
+_last_connection_recycle = {'at': 0.0}
+
+
+async def recycle_stale_connections():
+    """回收 async ORM 執行緒中逾時或失效的資料庫連線（節流）"""
+    now = time.monotonic()
+    if now - _last_connection_recycle['at'] < CONNECTION_RECYCLE_INTERVAL:
+        return
+    _last_connection_recycle['at'] = now
+    # thread_sensitive 與 async ORM 使用同一個執行緒，才會作用在同一條連線
+    await sync_to_async(close_old_connections)()
+
+
+class _CommitBatch:
+    """交易提交時以累積的項目呼叫一次 callback"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.items = []
+        # robust 的 on_commit 記錄錯誤時會讀取 __qualname__
+        self.__qualname__ = getattr(callback, '__qualname__', type(self).__qualname__)
+
+    def __call__(self):
+        self.callback(self.items)
+
+
+def on_commit_batch(key, callback, items):
+    """
+    交易提交後以同一交易內累積的 items 呼叫一次 callback(items)
+
+    批次匯入時每筆 save() 觸發的信號合併為一次處理；不在交易中時立即呼叫。
+    交易或 savepoint 回滾後舊批次已不在 on_commit 佇列中，會重新登記。
+    以 robust 登記，callback 的錯誤只記錄，不會讓已提交的寫入回應失敗。
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        items = list(items)
+        transaction.on_commit(lambda: callback(items), robust=True)
+        return
+
+    batches = getattr(connection, '_dashboard_commit_batches', None)
+    if batches is None:
+        batches = connection._dashboard_commit_batches = {}
+    batch = batches.get(key)
+    if batch is None or not any(func is batch for _, func, _ in connection.run_on_commit):
+        batch = batches[key] = _CommitBatch(callback)
+        transaction.on_commit(batch, robust=True)
+    batch.items.extend(items)
+
+
 def send_dashboard_update(user_id, data):
     """發送儀表板更新（便捷函數）"""
     notification_service.send_dashboard_update(user_id, data)
@@ -12,6 +12,7 @@ from datetime import timedelta, datetime
 from decimal import Decimal
 
 from .models import DashboardConfig, AlertNotification, FinancialGoal
+from .goals import goal_progress_engine
 from .serializers import (
     DashboardConfigSerializer, AlertNotificationSerializer,
     AlertNotificationUpdateSerializer, FinancialGoalSerializer,
@@ -20,6 +21,7 @@ from .serializers import (
 )
 from apps.expenses.models import Expense
 from apps.categories.models import Category
+from pangcah_accounting.db_router import ReplicaReadMixin
 
 
 class DashboardConfigViewSet(viewsets.ModelViewSet):
@@ -149,11 +151,8 @@ class FinancialGoalViewSet(viewsets.ModelViewSet):
         
         try:
             amount = Decimal(str(amount))
-            goal.current_amount = amount
-            goal.save(update_fields=['current_amount', 'updated_at'])
-            
-            # 檢查是否達到里程碑
-            self._check_milestones(goal)
+            # 記錄與自動計算值的差額，之後重新計算時保留手動設定；並檢查里程碑
+            goal_progress_engine.set_progress(goal, amount)
             
             serializer = self.get_serializer(goal)
             return Response(serializer.data)
@@ -163,44 +162,13 @@ class FinancialGoalViewSet(viewsets.ModelViewSet):
                 {'error': '無效的金額格式'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-    
-    def _check_milestones(self, goal):
-        """檢查並發送里程碑通知"""
-        if not goal.notify_on_progress or not goal.notify_milestones:
-            return
-        
-        progress = goal.progress_percentage
-        
-        for milestone in goal.notify_milestones:
-            if progress >= milestone:
-                # 檢查是否已經發送過此里程碑通知
-                existing_notification = AlertNotification.objects.filter(
-                    user=goal.user,
-                    alert_type='income_goal',
-                    data__goal_id=goal.id,
-                    data__milestone=milestone
-                ).exists()
-                
-                if not existing_notification:
-                    AlertNotification.objects.create(
-                        user=goal.user,
-                        alert_type='income_goal',
-                        severity='success' if milestone == 100 else 'info',
-                        title=f'目標進度達成 {milestone}%',
-                        message=f'恭喜！您的目標「{goal.title}」已達成 {milestone}%',
-                        data={
-                            'goal_id': goal.id,
-                            'milestone': milestone,
-                            'current_amount': float(goal.current_amount),
-                            'target_amount': float(goal.target_amount)
-                        }
-                    )
 
 
-class DashboardAPIView(viewsets.ViewSet):
+class DashboardAPIView(ReplicaReadMixin, viewsets.ViewSet):
     """儀表板統合 API"""
     
     permission_classes = [IsAuthenticated]
+    replica_actions = {'stats', 'chart_data'}
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -0,0 +1,24 @@
+# 仍在活動中的參與者部分索引（audit_indexes 建議）
+# 建立前後的執行計畫以 audit_indexes --benchmark --save / --compare 比較
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("events", "0004_alter_activitylog_action_type"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="activityparticipant",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["activity", "user"],
+                name="act_participant_active_idx",
+            ),
+        ),
+    ]
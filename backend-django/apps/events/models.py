@@ -359,6 +359,12 @@ class ActivityParticipant(models.Model):
         indexes = [
             models.Index(fields=['activity', 'user']),
             models.Index(fields=['is_active']),
+            # 權限檢查只查詢仍在活動中的參與者
+            models.Index(
+                fields=['activity', 'user'],
+                condition=models.Q(is_active=True),
+                name='act_participant_active_idx'
+            ),
         ]
         
     def __str__(self) -> str:
@@ -0,0 +1,116 @@
+# 支出全文搜尋：tsvector 欄位（由觸發器維護）與 pg_trgm 索引
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION expenses_build_search_vector(
+    p_description text, p_category_id bigint, p_event_id bigint
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('simple', coalesce(p_description, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT name FROM categories WHERE id = p_category_id), '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(
+            (SELECT name FROM events WHERE id = p_event_id), '')), 'C')
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION expenses_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := expenses_build_search_vector(
+        NEW.description, NEW.category_id, NEW.event_id
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER expenses_search_vector_update
+    BEFORE INSERT OR UPDATE OF description, category_id, event_id ON expenses
+    FOR EACH ROW EXECUTE FUNCTION expenses_search_vector_trigger();
+
+-- 分類或活動改名時更新相關支出
+CREATE OR REPLACE FUNCTION categories_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE expenses
+    SET search_vector = expenses_build_search_vector(description, category_id, event_id)
+    WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER categories_search_vector_update
+    AFTER UPDATE OF name ON categories
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION categories_search_vector_trigger();
+
+CREATE OR REPLACE FUNCTION events_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    UPDATE expenses
+    SET search_vector = expenses_build_search_vector(description, category_id, event_id)
+    WHERE event_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER events_search_vector_update
+    AFTER UPDATE OF name ON events
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION events_search_vector_trigger();
+
+-- 既有資料
+UPDATE expenses
+SET search_vector = expenses_build_search_vector(description, category_id, event_id);
+"""
+
+REVERSE_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS events_search_vector_update ON events;
+DROP TRIGGER IF EXISTS categories_search_vector_update ON categories;
+DROP TRIGGER IF EXISTS expenses_search_vector_update ON expenses;
+DROP FUNCTION IF EXISTS events_search_vector_trigger();
+DROP FUNCTION IF EXISTS categories_search_vector_trigger();
+DROP FUNCTION IF EXISTS expenses_search_vector_trigger();
+DROP FUNCTION IF EXISTS expenses_build_search_vector(text, bigint, bigint);
+"""
+
+
+class Migration(migrations.Migration):
+    # 索引以 CONCURRENTLY 建立，大表上不鎖定寫入
+    atomic = False
+
+    dependencies = [
+        ("categories", "0001_initial"),
+        ("events", "0004_alter_activitylog_action_type"),
+        ("expenses", "0002_expensesplit"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="expense",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="搜尋向量"
+            ),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, REVERSE_SEARCH_VECTOR_SQL),
+        AddIndexConcurrently(
+            model_name="expense",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="expenses_search_vector_gin"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="expense",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("description"),
+                    name="gin_trgm_ops",
+                ),
+                name="expenses_description_trgm",
+            ),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# 依實際查詢結構新增的覆蓋索引（audit_indexes 建議）
+# 建立前後的執行計畫以 audit_indexes --benchmark --save / --compare 比較
+
+from django.db import migrations, models
+
+
+INDEXES = [
+    models.Index(fields=['user', 'date'], include=['amount'], name='expenses_user_date_cov'),
+    models.Index(fields=['event', 'type'], include=['amount'], name='expenses_event_type_cov'),
+]
+
+
+def _is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row and row[0] == 'p')
+
+
+def create_indexes(apps, schema_editor):
+    # 分區表不支援 CREATE INDEX CONCURRENTLY（見 manage_partitions）
+    concurrently = not _is_partitioned(schema_editor.connection, 'expenses')
+    model = apps.get_model('expenses', 'Expense')
+    for index in INDEXES:
+        schema_editor.add_index(model, index, concurrently=concurrently)
+
+
+def drop_indexes(apps, schema_editor):
+    model = apps.get_model('expenses', 'Expense')
+    for index in INDEXES:
+        schema_editor.remove_index(model, index)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("expenses", "0003_expense_search_vector"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='expense', index=index) for index in INDEXES
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
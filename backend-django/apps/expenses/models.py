@@ -5,7 +5,10 @@
 """
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 
 
@@ -96,6 +99,13 @@ class Expense(models.Model):
     
     # 移除狀態管理字段，活動結算時統一處理
     
+    # 全文搜尋向量（描述、分類名稱、活動名稱），由資料庫觸發器維護
+    search_vector = SearchVectorField(
+        "搜尋向量",
+        null=True,
+        editable=False
+    )
+    
     # 時間戳
     created_at = models.DateTimeField("創建時間", auto_now_add=True)
     updated_at = models.DateTimeField("更新時間", auto_now=True)
@@ -108,6 +118,14 @@ class Expense(models.Model):
         indexes = [
             models.Index(fields=['type']),
             models.Index(fields=['date']),
+            # 用戶期間彙總與活動收支彙總可只掃描索引
+            models.Index(fields=['user', 'date'], include=['amount'], name='expenses_user_date_cov'),
+            models.Index(fields=['event', 'type'], include=['amount'], name='expenses_event_type_cov'),
+            GinIndex(fields=['search_vector'], name='expenses_search_vector_gin'),
+            GinIndex(
+                OpClass(Upper('description'), name='gin_trgm_ops'),
+                name='expenses_description_trgm'
+            ),
         ]
         
     def __str__(self) -> str:
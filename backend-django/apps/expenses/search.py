@@ -0,0 +1,59 @@
+"""
+支出全文搜尋
+
+search_vector（描述、分類名稱、活動名稱）以 tsvector 比對，另以 pg_trgm
+索引（UPPER(description)）支援中文與阿美語短詞的子字串與模糊比對。
+結果依相關度排序，使用 keyset 分頁（相關度、ID），深頁也不需要 OFFSET 掃描。
+"""
+
+import base64
+import json
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast, Upper
+
+
+SEARCH_CONFIG = 'simple'
+
+
+def search_expenses(queryset, term):
+    """過濾並以相關度排序支出查詢集"""
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    upper_term = term.upper()
+
+    return queryset.alias(
+        description_upper=Upper('description'),
+    ).filter(
+        Q(search_vector=query) |
+        Q(description_upper__contains=upper_term) |
+        Q(description_upper__trigram_word_similar=upper_term)
+    ).annotate(
+        # 轉為 double precision：real 與游標中的 Python float 比較時不會相等，
+        # 同分的資料會在換頁時遺漏
+        rank=Cast(
+            SearchRank(F('search_vector'), query) +
+            TrigramWordSimilarity(upper_term, Upper('description')),
+            FloatField()
+        )
+    ).order_by('-rank', '-id')
+
+
+def encode_cursor(rank, pk):
+    data = json.dumps([rank, pk]).encode()
+    return base64.urlsafe_b64encode(data).decode()
+
+
+def decode_cursor(cursor):
+    """解析游標，格式錯誤時回傳 None"""
+    try:
+        rank, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(rank), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def apply_cursor(queryset, cursor):
+    """只保留排序在游標之後的結果"""
+    rank, pk = cursor
+    return queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=pk))
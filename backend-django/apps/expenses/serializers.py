@@ -6,6 +6,7 @@ from rest_framework import serializers
 from .models import Expense, ExpenseSplit
 from apps.users.serializers import UserSerializer
 from apps.categories.serializers import CategorySerializer
+from apps.uploads.serializers import ImageThumbnailsMixin
 
 
 class ExpenseSplitSerializer(serializers.ModelSerializer):
@@ -32,7 +33,7 @@ class ExpenseSplitSerializer(serializers.ModelSerializer):
         return obj.can_user_adjust(request.user)
 
 
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(ImageThumbnailsMixin, serializers.ModelSerializer):
     """支出序列化器"""
     # 讀取時使用的欄位（返回完整物件）
     user = UserSerializer(read_only=True)
@@ -59,11 +60,13 @@ class ExpenseSerializer(serializers.ModelSerializer):
     split_participants_list = serializers.SerializerMethodField()
     can_user_edit = serializers.SerializerMethodField()
     split_total = serializers.SerializerMethodField()
+    # images 對應的 WebP 縮圖，列表顯示時不需下載原圖
+    image_thumbnails = serializers.SerializerMethodField()
     
     class Meta:
         model = Expense
         fields = [
-            'id', 'amount', 'type', 'date', 'description', 'images',
+            'id', 'amount', 'type', 'date', 'description', 'images', 'image_thumbnails',
             'category', 'category_id', 'category_name', 'user', 
             'event', 'event_id', 'event_name',
             'group', 'group_id', 'group_name',
@@ -92,9 +95,9 @@ class ExpenseSerializer(serializers.ModelSerializer):
         )['total'] or 0
     
     def validate_category_id(self, value):
-        """驗證分類 ID 是否存在"""
-        from apps.categories.models import Category
-        if not Category.objects.filter(id=value).exists():
+        """驗證分類 ID 是否存在（使用快取的分類目錄）"""
+        from apps.categories.catalog import get_category_ids
+        if value not in get_category_ids():
             raise serializers.ValidationError("指定的分類不存在")
         return value
     
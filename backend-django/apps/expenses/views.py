@@ -11,6 +11,7 @@ from django.utils.dateparse import parse_date
 from decimal import Decimal
 from .models import Expense, ExpenseSplit, SplitType
 from .serializers import ExpenseSerializer, ExpenseSplitSerializer
+from .search import apply_cursor, decode_cursor, encode_cursor, search_expenses
 from apps.events.models import ActivityLog, ActionType
 
 
@@ -87,6 +88,53 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        全文搜尋支出（描述、分類名稱、活動名稱）
+        
+        參數：q 搜尋字詞、cursor 上一頁回傳的游標、page_size 每頁筆數（最多 100）。
+        權限與其他篩選條件與列表相同。
+        """
+        term = request.query_params.get('q', '').strip()
+        if not term:
+            return Response(
+                {'error': '請提供搜尋字詞 q'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+        except (ValueError, TypeError):
+            page_size = 20
+        
+        queryset = search_expenses(self.get_queryset(), term)
+        
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                return Response(
+                    {'error': '無效的游標'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            queryset = apply_cursor(queryset, position)
+        
+        expenses = list(queryset[:page_size + 1])
+        has_next = len(expenses) > page_size
+        expenses = expenses[:page_size]
+        
+        next_cursor = None
+        if has_next:
+            last = expenses[-1]
+            next_cursor = encode_cursor(last.rank, last.id)
+        
+        serializer = self.get_serializer(expenses, many=True)
+        return Response({
+            'results': serializer.data,
+            'next_cursor': next_cursor
+        })
+    
     def perform_create(self, serializer):
         """創建支出時設置用戶並創建分攤記錄"""
         # 檢查創建權限
@@ -58,7 +58,10 @@ class Group(models.Model):
     
     @property
     def member_count(self) -> int:
-        """取得群組成員數量"""
+        """取得群組成員數量（優先使用查詢時的 num_members 註記）"""
+        annotated = getattr(self, 'num_members', None)
+        if annotated is not None:
+            return annotated
         return self.members.count()
     
     def is_manager(self, user) -> bool:
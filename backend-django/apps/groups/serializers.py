@@ -41,7 +41,22 @@ class GroupSerializer(serializers.ModelSerializer):
     
     def get_member_count(self, obj):
         """獲取成員數量"""
-        return obj.members.count()
+        return obj.member_count
+
+
+class GroupCompactSerializer(serializers.ModelSerializer):
+    """群組精簡序列化器（群組選擇器用，只含數量與管理者 ID）"""
+    member_count = serializers.IntegerField(read_only=True)
+    manager_ids = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Group
+        fields = ['id', 'name', 'member_count', 'manager_ids']
+        read_only_fields = fields
+    
+    def get_manager_ids(self, obj):
+        """獲取管理者 ID（使用預先載入的管理者）"""
+        return [m.id for m in obj.managers.all()]
 
 
 class GroupCreateUpdateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,84 @@
+"""
+群組相關信號處理器
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from apps.users.profile import invalidate_user_profiles
+from .models import Group, GroupMember
+
+
+def _group_user_ids(group):
+    """群組內所有相關用戶（管理者與系統用戶成員）"""
+    user_ids = set(group.managers.values_list('id', flat=True))
+    user_ids.update(
+        group.members.filter(user__isnull=False).values_list('user_id', flat=True)
+    )
+    return user_ids
+
+
+def _schedule_invalidation(user_ids):
+    """交易提交後才使快取失效，避免重新載入到未提交的資料"""
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: invalidate_user_profiles(user_ids))
+
+
+@receiver(post_save, sender=Group)
+def refresh_profiles_on_group_save(sender, instance, created, raw=False, **kwargs):
+    """群組名稱或描述變更時更新相關用戶的群組資訊"""
+    if raw or created:
+        return
+    _schedule_invalidation(_group_user_ids(instance))
+
+
+@receiver(pre_delete, sender=Group)
+def remember_group_users(sender, instance, **kwargs):
+    """刪除前記錄相關用戶，刪除後關聯已不存在"""
+    instance._profile_user_ids = _group_user_ids(instance)
+
+
+@receiver(post_delete, sender=Group)
+def refresh_profiles_on_group_delete(sender, instance, **kwargs):
+    _schedule_invalidation(getattr(instance, '_profile_user_ids', ()))
+
+
+@receiver(m2m_changed, sender=Group.managers.through)
+def refresh_profiles_on_managers_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """管理者變更時更新相關用戶的群組資訊"""
+    if action == 'pre_clear':
+        # clear 不提供 pk_set，先記錄原本的管理者
+        if reverse:
+            instance._profile_user_ids = {instance.pk}
+        else:
+            instance._profile_user_ids = set(instance.managers.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        _schedule_invalidation(getattr(instance, '_profile_user_ids', ()))
+        return
+    if action not in ('post_add', 'post_remove'):
+        return
+
+    # reverse 時 instance 為用戶，pk_set 為群組
+    _schedule_invalidation({instance.pk} if reverse else pk_set or ())
+
+
+@receiver(pre_save, sender=GroupMember)
+def remember_previous_member_user(sender, instance, raw=False, **kwargs):
+    """記錄更新前關聯的用戶，關聯改變時兩邊都需要更新"""
+    if raw or not instance.pk:
+        return
+    instance._profile_previous_user_id = GroupMember.objects.filter(
+        pk=instance.pk
+    ).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=GroupMember)
+@receiver(post_delete, sender=GroupMember)
+def refresh_profiles_on_member_change(sender, instance, raw=False, **kwargs):
+    """成員新增、變更或移除時更新用戶的群組資訊"""
+    if raw:
+        return
+    user_ids = {instance.user_id, getattr(instance, '_profile_previous_user_id', None)}
+    _schedule_invalidation(user_ids - {None})
@@ -2,21 +2,49 @@
 群組視圖
 """
 
+from django.db.models import Count, Prefetch
 from rest_framework import viewsets, permissions
-from .models import Group
-from .serializers import GroupSerializer, GroupCreateUpdateSerializer
+from apps.users.models import User
+from .models import Group, GroupMember
+from .serializers import GroupSerializer, GroupCompactSerializer, GroupCreateUpdateSerializer
 
 
 class GroupViewSet(viewsets.ModelViewSet):
     """群組管理視圖集"""
-    queryset = Group.objects.prefetch_related('managers', 'members__user').all()
+    queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # 每個動作的查詢預算（見 apps.monitoring.middleware）
+    query_budgets = {'list': 8, 'retrieve': 6}
+    
+    def is_compact(self):
+        """是否為精簡模式（?compact=1）"""
+        return self.request.query_params.get('compact') in ('1', 'true')
+    
+    def get_queryset(self):
+        # 成員數以註記取得，關聯資料以固定數量的查詢預先載入
+        queryset = super().get_queryset().annotate(
+            num_members=Count('members', distinct=True)
+        )
+        if self.action not in ['list', 'retrieve']:
+            return queryset
+        
+        if self.is_compact():
+            return queryset.prefetch_related(
+                Prefetch('managers', queryset=User.objects.only('id'))
+            )
+        
+        return queryset.prefetch_related(
+            'managers',
+            Prefetch('members', queryset=GroupMember.objects.select_related('user'))
+        )
     
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return GroupCreateUpdateSerializer
+        if self.is_compact():
+            return GroupCompactSerializer
         return GroupSerializer
     
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
\ No newline at end of file
+        serializer.save(created_by=self.request.user)
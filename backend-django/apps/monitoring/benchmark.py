@@ -0,0 +1,345 @@
+"""
+效能基準測試工具
+
+generate_family_ledger 以 bulk_create 批次產生模擬的家族帳本資料
+（用戶、群組、活動、參與者、支出與分攤），金額、分類與記帳頻率採用
+偏態分佈，接近實際使用情況。run_endpoint_benchmarks 對主要 API 量測
+延遲與查詢數，輸出格式固定的 JSON 報告，方便比較不同資料量或版本。
+
+建議流程（10k / 100k / 1M 各跑一次）：
+
+    python manage.py generate_benchmark_data --expenses 100000 --clear
+    python manage.py run_benchmarks --label 100k --output bench-100k.json
+"""
+
+import math
+import platform
+import random
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+
+User = get_user_model()
+
+# 模擬資料的用戶名稱前綴，清除時以此辨識
+BENCHMARK_USER_PREFIX = 'bench_'
+BENCHMARK_PASSWORD = 'bench-password'
+
+DEFAULT_EXPENSE_CATEGORIES = ['餐飲', '交通', '購物', '娛樂', '醫療', '教育', '居家', '祭典']
+DEFAULT_INCOME_CATEGORIES = ['薪資', '獎金', '禮金']
+
+DESCRIPTIONS = ['早餐', '午餐', '晚餐', '加油', '市場採買', '車票', '祭典用品', '聚餐', '水電費', '學費']
+
+
+def _zipf_weights(count, exponent=1.1):
+    """前幾個項目權重較高的長尾分佈"""
+    return [1 / math.pow(rank, exponent) for rank in range(1, count + 1)]
+
+
+def _ensure_categories():
+    from apps.categories.models import Category, CategoryType
+
+    if not Category.objects.filter(type=CategoryType.EXPENSE).exists():
+        Category.objects.bulk_create([
+            Category(name=name, type=CategoryType.EXPENSE, is_default=True)
+            for name in DEFAULT_EXPENSE_CATEGORIES
+        ])
+    if not Category.objects.filter(type=CategoryType.INCOME).exists():
+        Category.objects.bulk_create([
+            Category(name=name, type=CategoryType.INCOME, is_default=True)
+            for name in DEFAULT_INCOME_CATEGORIES
+        ])
+
+    return (
+        list(Category.objects.filter(type=CategoryType.EXPENSE).values_list('id', flat=True)),
+        list(Category.objects.filter(type=CategoryType.INCOME).values_list('id', flat=True)),
+    )
+
+
+def clear_benchmark_data():
+    """刪除模擬資料（群組、活動與支出會隨用戶一併刪除）"""
+    deleted, _ = User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).delete()
+    return deleted
+
+
+def generate_family_ledger(users=200, groups=20, events=100, expenses=10000,
+                           participants_per_event=4, days=365, income_ratio=0.15,
+                           event_ratio=0.6, batch_size=5000, seed=42, log=None):
+    """
+    產生模擬資料並回傳各表新增的筆數
+
+    第一位用戶為系統管理員，同時管理第一個群組與其活動，作為基準測試的登入身分。
+    """
+    from apps.dashboard.alerts import evaluate_spending_limits
+    from apps.events.models import ActivityParticipant, Event, EventStatus
+    from apps.expenses.models import Expense, ExpenseSplit, ExpenseType, SplitType
+    from apps.groups.models import Group, GroupMember
+
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    now = timezone.now()
+    expense_categories, income_categories = _ensure_categories()
+    expense_category_weights = _zipf_weights(len(expense_categories))
+
+    # 用戶
+    password = make_password(BENCHMARK_PASSWORD)
+    offset = User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).count()
+    user_objs = User.objects.bulk_create([
+        User(
+            username=f'{BENCHMARK_USER_PREFIX}{offset + i:06d}',
+            email=f'{BENCHMARK_USER_PREFIX}{offset + i:06d}@example.com',
+            name=f'測試成員{offset + i}',
+            role='ADMIN' if offset + i == 0 else 'USER',
+            is_staff=offset + i == 0,
+            password=password,
+        )
+        for i in range(users)
+    ], batch_size=batch_size)
+    log(f'👥 已建立 {len(user_objs)} 位用戶')
+
+    # 群組：用戶平均分配到各群組，第一位成員為管理者
+    group_objs = Group.objects.bulk_create([
+        Group(name=f'測試家族 {i + 1}', description='基準測試資料', created_by=user_objs[0])
+        for i in range(groups)
+    ])
+    group_users = {group.id: [] for group in group_objs}
+    members = []
+    for index, user in enumerate(user_objs):
+        group = group_objs[index % len(group_objs)]
+        group_users[group.id].append(user)
+        members.append(GroupMember(group=group, name=user.name, user=user))
+    GroupMember.objects.bulk_create(members, batch_size=batch_size)
+    Group.managers.through.objects.bulk_create([
+        Group.managers.through(group_id=group.id, user_id=group_users[group.id][0].id)
+        for group in group_objs if group_users[group.id]
+    ])
+    log(f'🏠 已建立 {len(group_objs)} 個群組、{len(members)} 位成員')
+
+    # 活動與參與者
+    event_objs = Event.objects.bulk_create([
+        Event(
+            name=f'測試活動 {i + 1}',
+            start_date=now - timedelta(days=rng.randint(0, days)),
+            status=EventStatus.ACTIVE if rng.random() < 0.7 else EventStatus.COMPLETED,
+            group=group_objs[i % len(group_objs)],
+            created_by=group_users[group_objs[i % len(group_objs)].id][0],
+        )
+        for i in range(events)
+    ], batch_size=batch_size)
+    Event.managers.through.objects.bulk_create([
+        Event.managers.through(event_id=event.id, user_id=event.created_by_id)
+        for event in event_objs
+    ])
+
+    event_participants = {}
+    participants = []
+    for event in event_objs:
+        candidates = group_users[event.group_id]
+        chosen = rng.sample(candidates, min(participants_per_event, len(candidates)))
+        if event.created_by not in chosen:
+            chosen[0] = event.created_by
+        event_participants[event.id] = [user.id for user in chosen]
+        participants.extend(ActivityParticipant(activity=event, user=user) for user in chosen)
+    ActivityParticipant.objects.bulk_create(participants, batch_size=batch_size)
+    log(f'🎉 已建立 {len(event_objs)} 個活動、{len(participants)} 位參與者')
+
+    user_events = {}
+    for event_id, user_ids in event_participants.items():
+        for user_id in user_ids:
+            user_events.setdefault(user_id, []).append(event_id)
+
+    # 支出：少數用戶記錄大部分帳目
+    user_ids = [user.id for user in user_objs]
+    user_group = {user.id: group_objs[i % len(group_objs)].id for i, user in enumerate(user_objs)}
+    user_weights = _zipf_weights(len(user_ids), exponent=0.8)
+    expense_count = 0
+    split_count = 0
+
+    while expense_count < expenses:
+        size = min(batch_size, expenses - expense_count)
+        batch = []
+        for user_id in rng.choices(user_ids, weights=user_weights, k=size):
+            is_income = rng.random() < income_ratio
+            event_id = None
+            if not is_income and user_events.get(user_id) and rng.random() < event_ratio:
+                event_id = rng.choice(user_events[user_id])
+
+            # 對數常態分佈：中位數約 NT$400，偶爾出現大額支出
+            amount = rng.lognormvariate(6.0, 1.0) * (10 if is_income else 1)
+            batch.append(Expense(
+                amount=Decimal(str(round(min(amount, 9999999), 2))),
+                type=ExpenseType.INCOME if is_income else ExpenseType.EXPENSE,
+                date=now - timedelta(seconds=rng.randint(0, days * 86400)),
+                description=rng.choice(DESCRIPTIONS),
+                category_id=(
+                    rng.choice(income_categories) if is_income
+                    else rng.choices(expense_categories, weights=expense_category_weights)[0]
+                ),
+                user_id=user_id,
+                event_id=event_id,
+                group_id=user_group[user_id],
+            ))
+
+        created = Expense.objects.bulk_create(batch)
+        # bulk_create 不觸發信號，整批交給支出限額檢查
+        evaluate_spending_limits(created)
+
+        splits = []
+        for expense in created:
+            if not expense.event_id:
+                continue
+            split_users = event_participants[expense.event_id]
+            share = (expense.amount / len(split_users)).quantize(Decimal('0.01'))
+            splits.extend(
+                ExpenseSplit(
+                    expense=expense,
+                    participant_id=participant_id,
+                    split_type=SplitType.AVERAGE,
+                    split_value=Decimal('1'),
+                    calculated_amount=share,
+                )
+                for participant_id in split_users
+            )
+        ExpenseSplit.objects.bulk_create(splits, batch_size=batch_size)
+
+        expense_count += len(created)
+        split_count += len(splits)
+        log(f'💰 已建立 {expense_count}/{expenses} 筆支出')
+
+    return {
+        'users': len(user_objs),
+        'groups': len(group_objs),
+        'group_members': len(members),
+        'events': len(event_objs),
+        'participants': len(participants),
+        'expenses': expense_count,
+        'splits': split_count,
+    }
+
+
+def default_endpoints(event_id):
+    """基準測試的 API 清單：(名稱, 方法, 路徑)"""
+    return [
+        ('expense_list', 'get', '/api/v1/expenses/'),
+        ('event_list', 'get', '/api/v1/events/'),
+        ('dashboard_stats', 'get', '/api/v1/dashboard/api/stats/'),
+        ('dashboard_chart_data', 'get', '/api/v1/dashboard/api/chart_data/?days=90'),
+        ('event_settlement', 'post', f'/api/v1/events/{event_id}/settlement/'),
+        ('report_configs', 'get', '/api/v1/reports/configs/'),
+        ('report_generations', 'get', '/api/v1/reports/generations/'),
+    ]
+
+
+def percentile(values, percent):
+    """最近排名法計算百分位數"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _dataset_summary():
+    from apps.events.models import Event
+    from apps.expenses.models import Expense, ExpenseSplit
+    from apps.groups.models import Group
+
+    return {
+        'users': User.objects.count(),
+        'groups': Group.objects.count(),
+        'events': Event.objects.count(),
+        'expenses': Expense.objects.count(),
+        'splits': ExpenseSplit.objects.count(),
+    }
+
+
+def run_endpoint_benchmarks(user, endpoints, repeat=10, warmup=2, label=''):
+    """
+    量測每個 API 的延遲與查詢數
+
+    寫入型請求（如結算）在交易中執行後回滾，不會改變資料。
+    """
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    results = []
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for name, method, path in endpoints:
+            timings = []
+            query_counts = []
+            status_code = None
+            response_size = 0
+
+            for iteration in range(warmup + repeat):
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        response = getattr(client, method)(path)
+                        elapsed = (time.perf_counter() - start) * 1000
+                    transaction.set_rollback(True)
+
+                if iteration < warmup:
+                    continue
+                timings.append(elapsed)
+                query_counts.append(len(queries))
+                status_code = response.status_code
+                response_size = len(response.content)
+
+            results.append({
+                'name': name,
+                'method': method.upper(),
+                'path': path,
+                'status_code': status_code,
+                'response_bytes': response_size,
+                'latency_ms': {
+                    'min': round(min(timings), 2),
+                    'p50': round(statistics.median(timings), 2),
+                    'p95': round(percentile(timings, 95), 2),
+                    'max': round(max(timings), 2),
+                    'mean': round(statistics.mean(timings), 2),
+                },
+                'queries': max(query_counts),
+            })
+
+    return {
+        'label': label,
+        'generated_at': timezone.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+        },
+        'dataset': _dataset_summary(),
+        'parameters': {'repeat': repeat, 'warmup': warmup, 'user': user.username},
+        'results': results,
+    }
+
+
+def compare_reports(current, baseline):
+    """比較兩份報告的 p50 延遲與查詢數，回傳 {名稱: 差異}"""
+    baseline_results = {result['name']: result for result in baseline.get('results', [])}
+    comparison = {}
+    for result in current['results']:
+        previous = baseline_results.get(result['name'])
+        if not previous:
+            continue
+        old_p50 = previous['latency_ms']['p50']
+        comparison[result['name']] = {
+            'p50_ms': result['latency_ms']['p50'],
+            'baseline_p50_ms': old_p50,
+            'p50_change_pct': round(
+                (result['latency_ms']['p50'] - old_p50) / old_p50 * 100, 1
+            ) if old_p50 else None,
+            'queries': result['queries'],
+            'baseline_queries': previous['queries'],
+        }
+    return comparison
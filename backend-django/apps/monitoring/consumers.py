@@ -3,14 +3,14 @@ Monitoring WebSocket Consumers
 """
 
 import json
-import asyncio
-import psutil
-from datetime import datetime, timedelta
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.conf import settings
+
+from apps.dashboard.utils import WebSocketManager, presence, recycle_stale_connections
+from .sampler import system_metrics_sampler, get_latest_system_metrics
+from .utils import ADMIN_ALERTS_GROUP
 
 User = get_user_model()
 
@@ -21,6 +21,12 @@ class SystemMonitorConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         """WebSocket 連線"""
         self.system_group_name = 'system_monitor'
+        self.update_interval = system_metrics_sampler.interval
+        self.last_sent_at = None
+        
+        # 已登入的用戶才追蹤在線狀態
+        user = self.scope.get('user')
+        self.presence_user_id = user.id if user and user.is_authenticated else None
         
         # 加入群組
         await self.channel_layer.group_add(
@@ -30,8 +36,13 @@ class SystemMonitorConsumer(AsyncWebsocketConsumer):
         
         await self.accept()
         
-        # 開始系統監控
-        asyncio.create_task(self.monitor_system())
+        # 加入共用取樣器，所有連線共用同一個取樣任務
+        await system_metrics_sampler.subscribe()
+        self.subscribed = True
+        await self.touch_presence()
+        
+        # 立即發送最新指標，不必等待下一次取樣
+        await self.send_system_metrics()
 
     async def disconnect(self, close_code):
         """WebSocket 斷線"""
@@ -39,6 +50,15 @@ class SystemMonitorConsumer(AsyncWebsocketConsumer):
             self.system_group_name,
             self.channel_name
         )
+        # 只有實際訂閱過的連線才減少觀看者數
+        if getattr(self, 'subscribed', False):
+            self.subscribed = False
+            await system_metrics_sampler.unsubscribe()
+        
+        if getattr(self, 'presence_user_id', None):
+            await presence(WebSocketManager.unregister_connection)(
+                self.presence_user_id, self.channel_name
+            )
 
     async def receive(self, text_data):
         """接收訊息"""
@@ -47,11 +67,14 @@ class SystemMonitorConsumer(AsyncWebsocketConsumer):
             message_type = data.get('type')
             
             if message_type == 'get_system_info':
-                # 立即發送系統資訊
+                # 立即發送最新系統資訊
                 await self.send_system_metrics()
             
+            elif message_type == 'ping':
+                await self.touch_presence()
+            
             elif message_type == 'set_update_interval':
-                # 設定更新間隔
+                # 設定此連線的更新間隔（不影響共用取樣頻率）
                 interval = data.get('interval', 30)
                 self.update_interval = max(5, min(300, interval))  # 5-300 秒之間
                 
@@ -61,111 +84,43 @@ class SystemMonitorConsumer(AsyncWebsocketConsumer):
                 'message': '無效的 JSON 格式'
             }))
 
-    async def monitor_system(self):
-        """系統監控循環"""
-        self.update_interval = 30  # 預設30秒更新一次
+    async def send_system_metrics(self):
+        """發送最新的系統指標給此連線"""
+        metrics = system_metrics_sampler.latest
+        if metrics is None:
+            # 取樣任務尚未產生樣本時改用快取中的最新樣本，不另外呼叫 psutil
+            metrics = await sync_to_async(get_latest_system_metrics)()
         
-        while True:
-            try:
-                await self.send_system_metrics()
-                await asyncio.sleep(self.update_interval)
-            except:
-                break
+        self.last_sent_at = timezone.now()
+        await self.send(text_data=json.dumps({
+            'type': 'system_metrics',
+            'data': metrics
+        }))
 
-    async def send_system_metrics(self):
-        """發送系統指標"""
-        try:
-            # 取得系統資源使用情況
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            # 網路統計
-            net_io = psutil.net_io_counters()
-            
-            # 程序資訊
-            process_count = len(psutil.pids())
-            
-            # 系統負載（Linux/Unix）
-            try:
-                load_avg = psutil.getloadavg()
-            except:
-                load_avg = [0, 0, 0]
-            
-            metrics = {
-                'cpu_usage': cpu_percent,
-                'memory': {
-                    'total': memory.total,
-                    'used': memory.used,
-                    'available': memory.available,
-                    'percent': memory.percent
-                },
-                'disk': {
-                    'total': disk.total,
-                    'used': disk.used,
-                    'free': disk.free,
-                    'percent': disk.percent
-                },
-                'network': {
-                    'bytes_sent': net_io.bytes_sent,
-                    'bytes_recv': net_io.bytes_recv,
-                    'packets_sent': net_io.packets_sent,
-                    'packets_recv': net_io.packets_recv
-                },
-                'process_count': process_count,
-                'load_average': load_avg,
-                'timestamp': timezone.now().isoformat()
-            }
-            
-            # 儲存指標到資料庫
-            await self.save_system_metrics(metrics)
-            
-            # 發送給所有連線的客戶端
-            await self.channel_layer.group_send(
-                self.system_group_name,
-                {
-                    'type': 'system_metrics_update',
-                    'data': metrics
-                }
+    async def touch_presence(self):
+        """更新在線狀態"""
+        if self.presence_user_id:
+            await presence(WebSocketManager.heartbeat)(
+                self.presence_user_id, self.channel_name
             )
-            
-        except Exception as e:
-            await self.send(text_data=json.dumps({
-                'type': 'error',
-                'message': f'系統監控錯誤: {str(e)}'
-            }))
 
     async def system_metrics_update(self, event):
-        """處理系統指標更新訊息"""
+        """處理系統指標更新訊息，依此連線的更新間隔節流"""
+        # 取樣廣播同時作為在線狀態心跳
+        await self.touch_presence()
+        
+        now = timezone.now()
+        elapsed = (now - self.last_sent_at).total_seconds() if self.last_sent_at else None
+        # 保留 1 秒容差，避免取樣時間的微小抖動造成跳過
+        if elapsed is not None and elapsed < self.update_interval - 1:
+            return
+        
+        self.last_sent_at = now
         await self.send(text_data=json.dumps({
             'type': 'system_metrics',
             'data': event['data']
         }))
 
-    @database_sync_to_async
-    def save_system_metrics(self, metrics):
-        """儲存系統指標到資料庫"""
-        from .models import SystemMetric
-        
-        # 儲存主要指標
-        SystemMetric.objects.create(
-            metric_type='cpu_usage',
-            value=metrics['cpu_usage'],
-            unit='%'
-        )
-        
-        SystemMetric.objects.create(
-            metric_type='memory_usage',
-            value=metrics['memory']['percent'],
-            unit='%'
-        )
-        
-        SystemMetric.objects.create(
-            metric_type='disk_usage',
-            value=metrics['disk']['percent'],
-            unit='%'
-        )
-
 
 class AlertConsumer(AsyncWebsocketConsumer):
     """告警監控 Consumer"""
@@ -182,6 +137,7 @@ class AlertConsumer(AsyncWebsocketConsumer):
             return
         
         self.user = user
+        self.is_admin = user.is_staff and user.is_active
         
         # 加入群組
         await self.channel_layer.group_add(
@@ -189,6 +145,13 @@ class AlertConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
+        # 管理員加入共用告警群組，告警只需發布一次
+        if self.is_admin:
+            await self.channel_layer.group_add(
+                ADMIN_ALERTS_GROUP,
+                self.channel_name
+            )
+        
         await self.accept()
         
         # 發送當前活躍告警
@@ -200,6 +163,12 @@ class AlertConsumer(AsyncWebsocketConsumer):
             self.alert_group_name,
             self.channel_name
         )
+        
+        if getattr(self, 'is_admin', False):
+            await self.channel_layer.group_discard(
+                ADMIN_ALERTS_GROUP,
+                self.channel_name
+            )
 
     async def receive(self, text_data):
         """接收訊息"""
@@ -247,25 +216,25 @@ class AlertConsumer(AsyncWebsocketConsumer):
             'timestamp': event.get('timestamp', timezone.now().isoformat())
         }))
 
-    @database_sync_to_async
-    def get_user(self, user_id):
+    async def get_user(self, user_id):
         """取得用戶"""
+        await recycle_stale_connections()
         try:
-            return User.objects.get(id=user_id)
+            return await User.objects.aget(id=user_id)
         except User.DoesNotExist:
             return None
 
-    @database_sync_to_async
-    def get_active_alerts(self):
+    async def get_active_alerts(self):
         """取得活躍告警"""
         from .models import Alert
+        await recycle_stale_connections()
         
         alerts = Alert.objects.filter(
             status__in=['active', 'acknowledged']
         ).order_by('-created_at')[:10]
         
         alert_list = []
-        for alert in alerts:
+        async for alert in alerts:
             alert_list.append({
                 'id': str(alert.id),
                 'title': alert.title,
@@ -277,17 +246,17 @@ class AlertConsumer(AsyncWebsocketConsumer):
         
         return alert_list
 
-    @database_sync_to_async
-    def acknowledge_alert(self, alert_id):
+    async def acknowledge_alert(self, alert_id):
         """確認告警"""
         from .models import Alert
+        await recycle_stale_connections()
         
         try:
-            alert = Alert.objects.get(id=alert_id)
-            alert.acknowledge(self.user)
-            return True
+            alert = await Alert.objects.aget(id=alert_id)
         except Alert.DoesNotExist:
             return False
+        await sync_to_async(alert.acknowledge)(self.user)
+        return True
 
 
 class ActivityMonitorConsumer(AsyncWebsocketConsumer):
@@ -332,15 +301,15 @@ class ActivityMonitorConsumer(AsyncWebsocketConsumer):
             'timestamp': event.get('timestamp', timezone.now().isoformat())
         }))
 
-    @database_sync_to_async
-    def get_recent_activities(self):
+    async def get_recent_activities(self):
         """取得最近活動"""
         from .models import UserActivity
+        await recycle_stale_connections()
         
         activities = UserActivity.objects.select_related('user').order_by('-timestamp')[:20]
         
         activity_list = []
-        for activity in activities:
+        async for activity in activities:
             activity_list.append({
                 'id': str(activity.id),
                 'user_name': activity.user.name,
@@ -0,0 +1,174 @@
+"""
+系統健康狀態
+
+current_health 端點所需的資料全部來自快取：
+系統資源取自背景取樣器的最新樣本，資料庫連線數、連線池狀態與活躍用戶數
+以短 TTL 快取，請求本身不會阻塞等待 CPU 取樣或執行彙總查詢。
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from pangcah_accounting.db_pool import DB_POOL_MODE
+from .sampler import ensure_background_sampler, get_latest_system_metrics
+
+
+DB_CONNECTIONS_CACHE_KEY = 'monitoring:database_connections'
+DB_CONNECTIONS_CACHE_TIMEOUT = 10
+
+DB_POOL_CACHE_KEY = 'monitoring:database_pool'
+DB_POOL_CACHE_TIMEOUT = 10
+
+ACTIVE_USERS_CACHE_KEY = 'monitoring:active_users'
+ACTIVE_USERS_CACHE_TIMEOUT = 60
+ACTIVE_USERS_WINDOW = timedelta(minutes=15)
+
+
+def get_database_connections():
+    """
+    取得 Postgres 連線數
+
+    從 pg_stat_activity 統計目前資料庫各狀態的連線數，回傳 (總數, 各狀態數量)。
+    非 Postgres 資料庫回傳 (0, {})。
+    """
+    cached = cache.get(DB_CONNECTIONS_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    by_state = {}
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) "
+                "FROM pg_stat_activity "
+                "WHERE datname = current_database() "
+                "GROUP BY 1"
+            )
+            by_state = {state: count for state, count in cursor.fetchall()}
+
+    result = (sum(by_state.values()), by_state)
+    cache.set(DB_CONNECTIONS_CACHE_KEY, result, DB_CONNECTIONS_CACHE_TIMEOUT)
+    return result
+
+
+def get_application_connections():
+    """本服務（依 application_name）在資料庫的連線數，回傳 (總數, 各狀態數量)"""
+    application_name = connection.settings_dict.get('OPTIONS', {}).get('application_name')
+    by_state = {}
+    if connection.vendor == 'postgresql' and application_name:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) "
+                "FROM pg_stat_activity "
+                "WHERE datname = current_database() AND application_name = %s "
+                "GROUP BY 1",
+                [application_name]
+            )
+            by_state = {state: count for state, count in cursor.fetchall()}
+    return sum(by_state.values()), by_state
+
+
+def check_database():
+    """以 SELECT 1 檢查資料庫，回傳 (是否正常, 延遲毫秒)"""
+    start = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception:
+        return False, None
+    return True, round((time.perf_counter() - start) * 1000, 2)
+
+
+def get_database_pool_metrics():
+    """
+    資料庫連線模式與連線池狀態（快取 10 秒）
+
+    native 模式另附 psycopg 連線池的統計（僅限目前的 worker 行程）。
+    """
+    cached = cache.get(DB_POOL_CACHE_KEY)
+    if cached is not None:
+        return cached
+
+    healthy, latency_ms = check_database()
+    metrics = {
+        'mode': DB_POOL_MODE,
+        'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+        'healthy': healthy,
+        'health_check_ms': latency_ms,
+    }
+
+    if healthy:
+        total, by_state = get_application_connections()
+        metrics['application_connections'] = total
+        metrics['application_connections_by_state'] = by_state
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW max_connections')
+                metrics['max_connections'] = int(cursor.fetchone()[0])
+
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats = pool.get_stats()
+        metrics['pool'] = {
+            'size': stats.get('pool_size'),
+            'available': stats.get('pool_available'),
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'requests_waiting': stats.get('requests_waiting', 0),
+            'requests_errors': stats.get('requests_errors', 0),
+            'connections_lost': stats.get('connections_lost', 0),
+        }
+
+    cache.set(DB_POOL_CACHE_KEY, metrics, DB_POOL_CACHE_TIMEOUT)
+    return metrics
+
+
+def get_active_user_count():
+    """取得最近 15 分鐘有活動的用戶數（快取 60 秒）"""
+    from .models import UserActivity
+
+    count = cache.get(ACTIVE_USERS_CACHE_KEY)
+    if count is None:
+        count = UserActivity.objects.filter(
+            timestamp__gte=timezone.now() - ACTIVE_USERS_WINDOW
+        ).values('user').distinct().count()
+        cache.set(ACTIVE_USERS_CACHE_KEY, count, ACTIVE_USERS_CACHE_TIMEOUT)
+    return count
+
+
+def get_health_status(cpu_percent, memory_percent, disk_percent):
+    """判斷系統狀態"""
+    if cpu_percent > 90 or memory_percent > 90 or disk_percent > 90:
+        return 'critical'
+    if cpu_percent > 70 or memory_percent > 70 or disk_percent > 80:
+        return 'warning'
+    return 'healthy'
+
+
+def get_system_health():
+    """組合當前系統健康狀態"""
+    ensure_background_sampler()
+    metrics = get_latest_system_metrics()
+
+    cpu_percent = metrics['cpu_usage']
+    memory_percent = metrics['memory']['percent']
+    disk_percent = metrics['disk']['percent']
+    db_connections, db_connections_by_state = get_database_connections()
+
+    return {
+        'cpu_usage': cpu_percent,
+        'memory_usage': memory_percent,
+        'disk_usage': disk_percent,
+        'database_connections': db_connections,
+        'database_connections_by_state': db_connections_by_state,
+        'database_pool': get_database_pool_metrics(),
+        'active_users': get_active_user_count(),
+        'status': get_health_status(cpu_percent, memory_percent, disk_percent),
+        'sampled_at': metrics['timestamp'],
+        'last_updated': timezone.now()
+    }
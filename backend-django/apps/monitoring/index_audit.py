@@ -0,0 +1,287 @@
+"""
+索引稽核
+
+從實際執行的查詢結構找出缺少的複合索引：
+
+- pg_stat_statements（已安裝擴充套件時），依總執行時間排序
+- QueryBudgetMiddleware 寫入 APIMetric.metadata 的疑似 N+1 與耗時查詢結構
+
+解析 WHERE 條件中的等值欄位、範圍欄位與布林條件，組成建議索引
+（等值欄位在前、範圍欄位在後，布林條件作為部分索引條件，SUM 的欄位
+放進 INCLUDE），再與資料表既有索引比對，只列出尚未涵蓋的建議。
+
+explain() 以 EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) 取得執行計畫摘要；
+audit_indexes --benchmark 以 benchmark_queries() 的代表性查詢比較
+新增索引前後的執行計畫。
+"""
+
+import json
+import re
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection as default_connection
+from django.utils import timezone
+
+
+_CLAUSE_END_RE = re.compile(r' (?:GROUP BY|ORDER BY|LIMIT|OFFSET|HAVING|FOR UPDATE) ')
+_PREDICATE_RE = re.compile(r'"(\w+)"\."(\w+)" (=|>=|<=|>|<|IN|IS) ')
+_BARE_BOOLEAN_RE = re.compile(r'(?:\(|AND |OR |WHERE )(NOT )?"(\w+)"\."(\w+)"(?=\s*(?:\)|AND|OR|$))')
+_SUM_RE = re.compile(r'SUM\("(\w+)"\."(\w+)"\)', re.IGNORECASE)
+
+EQUALITY_OPERATORS = {'=', 'IN', 'IS'}
+
+
+def shapes_from_pg_stat_statements(limit=50, connection=None):
+    """回傳 [(查詢, 權重毫秒)]；未安裝 pg_stat_statements 時回傳空清單"""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+        if cursor.fetchone() is None:
+            return []
+        cursor.execute("""
+            SELECT query, total_exec_time
+            FROM pg_stat_statements
+            WHERE query ILIKE 'SELECT%%' AND dbid = (
+                SELECT oid FROM pg_database WHERE datname = current_database()
+            )
+            ORDER BY total_exec_time DESC
+            LIMIT %s
+        """, [limit])
+        return [(query, float(total)) for query, total in cursor.fetchall()]
+
+
+def shapes_from_api_metrics(days=7):
+    """彙總 APIMetric.metadata 中記錄的查詢結構，回傳 [(查詢, 權重)]"""
+    from .models import APIMetric
+
+    weights = defaultdict(float)
+    metadata_rows = APIMetric.objects.filter(
+        timestamp__gte=timezone.now() - timedelta(days=days)
+    ).exclude(metadata={}).values_list('metadata', flat=True)
+
+    for metadata in metadata_rows.iterator():
+        for shape in metadata.get('slow_shapes', []):
+            weights[shape['sql']] += shape['duration_ms']
+        for shape in metadata.get('n_plus_one', []):
+            weights[shape['sql']] += shape['count']
+    return sorted(weights.items(), key=lambda item: item[1], reverse=True)
+
+
+def parse_predicates(sql):
+    """
+    解析查詢的篩選條件
+
+    回傳 {資料表: {'equality': [...], 'range': [...], 'boolean': [...], 'sum': [...]}}
+    """
+    tables = defaultdict(lambda: {'equality': [], 'range': [], 'boolean': [], 'sum': []})
+
+    for table, column in _SUM_RE.findall(sql):
+        _append(tables[table]['sum'], column)
+
+    where_start = sql.find(' WHERE ')
+    if where_start < 0:
+        return dict(tables)
+    where = sql[where_start:]
+    end = _CLAUSE_END_RE.search(where)
+    if end:
+        where = where[:end.start()]
+
+    for table, column, operator in _PREDICATE_RE.findall(where):
+        kind = 'equality' if operator in EQUALITY_OPERATORS else 'range'
+        _append(tables[table][kind], column)
+    for negated, table, column in _BARE_BOOLEAN_RE.findall(where):
+        _append(tables[table]['boolean'], f'NOT {column}' if negated else column)
+
+    return {table: parts for table, parts in tables.items() if parts['equality'] or parts['range']}
+
+
+def _append(items, value):
+    if value not in items:
+        items.append(value)
+
+
+def existing_indexes(table, connection=None):
+    """資料表既有索引的欄位清單（依索引欄位順序）"""
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        info['columns'] for info in constraints.values()
+        if (info['index'] or info['primary_key'] or info['unique']) and info['columns']
+    ]
+
+
+def _is_covered(columns, equality_count, indexes):
+    """既有索引的前綴是否已涵蓋建議欄位（等值欄位順序不拘）"""
+    for index_columns in indexes:
+        prefix = index_columns[:len(columns)]
+        if len(prefix) < len(columns):
+            continue
+        if (set(prefix[:equality_count]) == set(columns[:equality_count])
+                and prefix[equality_count:] == columns[equality_count:]):
+            return True
+    return False
+
+
+def suggest_indexes(shapes, connection=None):
+    """
+    依查詢結構建議索引
+
+    shapes 為 [(查詢, 權重)]，回傳依權重排序的建議清單。
+    """
+    connection = connection or default_connection
+    known_tables = set(connection.introspection.table_names())
+    suggestions = {}
+    index_cache = {}
+
+    for sql, weight in shapes:
+        for table, parts in parse_predicates(sql).items():
+            if table not in known_tables:
+                continue
+            columns = parts['equality'] + parts['range'][:1]
+            if not columns:
+                continue
+            if table not in index_cache:
+                index_cache[table] = existing_indexes(table, connection)
+            if _is_covered(columns, len(parts['equality']), index_cache[table]):
+                continue
+
+            condition = ' AND '.join(parts['boolean'])
+            include = [column for column in parts['sum'] if column not in columns]
+            key = (table, tuple(columns), condition)
+            suggestion = suggestions.setdefault(key, {
+                'table': table,
+                'columns': columns,
+                'include': [],
+                'condition': condition,
+                'weight': 0.0,
+                'queries': 0,
+                'example': sql,
+            })
+            for column in include:
+                _append(suggestion['include'], column)
+            suggestion['weight'] += weight
+            suggestion['queries'] += 1
+
+    results = sorted(suggestions.values(), key=lambda s: s['weight'], reverse=True)
+    for suggestion in results:
+        suggestion['sql'] = index_sql(suggestion)
+    return results
+
+
+def index_sql(suggestion):
+    """建議索引的 CREATE INDEX 語句"""
+    name = f"{suggestion['table']}_{'_'.join(suggestion['columns'])}_idx"[:63]
+    columns = ', '.join(f'"{column}"' for column in suggestion['columns'])
+    sql = f'CREATE INDEX CONCURRENTLY "{name}" ON "{suggestion["table"]}" ({columns})'
+    if suggestion['include']:
+        sql += ' INCLUDE (' + ', '.join(f'"{column}"' for column in suggestion['include']) + ')'
+    if suggestion['condition']:
+        sql += f" WHERE {suggestion['condition']}"
+    return sql
+
+
+def _plan_indexes(node, found):
+    if 'Index Name' in node:
+        _append(found, node['Index Name'])
+    for child in node.get('Plans', []):
+        _plan_indexes(child, found)
+    return found
+
+
+def explain(sql, params=None, analyze=True, connection=None):
+    """取得執行計畫摘要"""
+    connection = connection or default_connection
+    options = 'ANALYZE, BUFFERS, FORMAT JSON' if analyze else 'FORMAT JSON'
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN ({options}) {sql}', params or [])
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+    node = root['Plan']
+    return {
+        'node': node['Node Type'],
+        'indexes': _plan_indexes(node, []),
+        'total_cost': node['Total Cost'],
+        'execution_ms': root.get('Execution Time'),
+        'shared_buffers': node.get('Shared Hit Blocks', 0) + node.get('Shared Read Blocks', 0),
+    }
+
+
+def benchmark_queries(connection=None):
+    """
+    以資料量最多的用戶、活動與參與者組成代表性查詢 [(名稱, SQL, 參數)]
+
+    涵蓋 expenses 覆蓋索引與 activity_participants 部分索引所服務的查詢；
+    沒有資料的資料表略過。
+    """
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT user_id FROM expenses GROUP BY user_id ORDER BY count(*) DESC LIMIT 1'
+        )
+        user_row = cursor.fetchone()
+        cursor.execute(
+            'SELECT event_id FROM expenses WHERE event_id IS NOT NULL '
+            'GROUP BY event_id ORDER BY count(*) DESC LIMIT 1'
+        )
+        event_row = cursor.fetchone()
+        cursor.execute(
+            'SELECT activity_id, user_id FROM activity_participants WHERE is_active '
+            'ORDER BY (SELECT count(*) FROM activity_participants p '
+            'WHERE p.activity_id = activity_participants.activity_id) DESC LIMIT 1'
+        )
+        participant_row = cursor.fetchone()
+
+    queries = []
+    if user_row:
+        queries.append((
+            'expenses 用戶 30 天彙總',
+            'SELECT SUM(amount) FROM expenses WHERE user_id = %s AND date >= %s',
+            [user_row[0], timezone.now() - timedelta(days=30)],
+        ))
+    if event_row:
+        queries.append((
+            'expenses 活動收支彙總',
+            'SELECT type, SUM(amount) FROM expenses WHERE event_id = %s GROUP BY type',
+            [event_row[0]],
+        ))
+    if participant_row:
+        queries.append((
+            'activity_participants 參與檢查',
+            'SELECT 1 FROM activity_participants WHERE activity_id = %s AND user_id = %s AND is_active LIMIT 1',
+            list(participant_row),
+        ))
+        queries.append((
+            'activity_participants 活躍人數',
+            'SELECT count(*) FROM activity_participants WHERE activity_id = %s AND is_active',
+            [participant_row[0]],
+        ))
+    return queries
+
+
+def explain_benchmark(queries, connection=None):
+    """對 [(名稱, SQL, 參數)] 逐一 EXPLAIN，回傳 {名稱: 摘要}"""
+    return {name: explain(sql, params, connection=connection) for name, sql, params in queries}
+
+
+def compare_benchmarks(before, after):
+    """新增索引前後的執行計畫差異，每個查詢一行"""
+    lines = []
+    for name, result in after.items():
+        previous = before.get(name)
+        if previous is None:
+            continue
+        lines.append(
+            '%s: %s %s → %s %s，cost %.1f → %.1f，%s ms → %s ms，buffers %s → %s' % (
+                name,
+                previous['node'], ','.join(previous['indexes']) or '-',
+                result['node'], ','.join(result['indexes']) or '-',
+                previous['total_cost'], result['total_cost'],
+                previous['execution_ms'], result['execution_ms'],
+                previous['shared_buffers'], result['shared_buffers'],
+            )
+        )
+    return lines
@@ -0,0 +1,348 @@
+"""
+WebSocket 負載測試
+
+在同一個行程內以 channels.testing.WebsocketCommunicator 開啟大量模擬連線
+（DashboardConsumer 與 SystemMonitorConsumer），使用記憶體 channel layer，
+量測單一 ASGI worker 可承受的連線數：
+
+- 連線建立時間
+- ping / subscribe / request_data / get_system_info 的往返延遲
+- 伺服器端 group_send 推送到各連線的延遲與送達率
+- 每個連線的記憶體用量（RSS 差值；客戶端與伺服器端在同一行程，為上限值）
+- 資料庫連線數（依 application_name 統計，比較 DB_POOL_MODE 的差異）
+- 請求訊息吞吐量（每秒訊息數）；cold=True 時每輪前清除儀表板快照，
+  讓 subscribe / request_data 都經過資料庫查詢，用於比較 ORM 存取方式
+
+SystemMonitorConsumer 會依連線的更新間隔節流廣播，因此推送測試只針對
+儀表板群組。
+"""
+
+import asyncio
+import gc
+import statistics
+import threading
+import time
+
+import psutil
+from asgiref.sync import sync_to_async
+from channels.layers import channel_layers, get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from pangcah_accounting.db_pool import DB_POOL_MODE
+from .benchmark import percentile
+from .health import get_application_connections
+
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        'CONFIG': {'capacity': 1000},
+    },
+}
+
+# 各種請求對應的回應類型
+DASHBOARD_REQUESTS = [
+    ('ping', {'type': 'ping'}, 'pong'),
+    ('subscribe', {'type': 'subscribe', 'subscription_type': 'dashboard_metrics'}, 'dashboard_metrics'),
+    ('request_data', {'type': 'request_data', 'request_type': 'expense_summary'}, 'expense_summary'),
+]
+SYSTEM_REQUESTS = [
+    ('get_system_info', {'type': 'get_system_info'}, 'system_metrics'),
+]
+
+
+def _summarize(values):
+    """延遲統計（毫秒）"""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50': round(statistics.median(values), 2),
+        'p95': round(percentile(values, 95), 2),
+        'p99': round(percentile(values, 99), 2),
+        'max': round(max(values), 2),
+    }
+
+
+def _rss():
+    return psutil.Process().memory_info().rss
+
+
+class ConnectionSampler:
+    """背景執行緒定時統計本服務的資料庫連線數（扣除取樣本身的連線）"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def count(self):
+        total, _ = get_application_connections()
+        return max(total - 1, 0)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='db-connection-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.samples.append(self.count())
+                except Exception:
+                    pass
+                self._stop.wait(self.interval)
+        finally:
+            connection.close()
+
+
+def build_application():
+    """只含 WebSocket 路由的 ASGI 應用（不經過驗證與來源檢查）"""
+    from apps.dashboard import routing as dashboard_routing
+    from apps.monitoring import routing as monitoring_routing
+
+    return URLRouter([
+        *dashboard_routing.websocket_urlpatterns,
+        *monitoring_routing.websocket_urlpatterns,
+    ])
+
+
+class SimulatedClient:
+    """一個模擬的 WebSocket 客戶端"""
+
+    def __init__(self, application, kind, path, user_id=None):
+        self.kind = kind
+        self.user_id = user_id
+        self.communicator = WebsocketCommunicator(application, path)
+        self.connected = False
+
+    async def connect(self, timeout):
+        connected, _ = await self.communicator.connect(timeout=timeout)
+        self.connected = connected
+        if connected:
+            # 連線後伺服器會先送出歡迎訊息或最新指標
+            await self.communicator.receive_json_from(timeout=timeout)
+        return connected
+
+    async def receive_type(self, expected_type, timeout):
+        """接收直到指定類型的訊息（略過心跳等其他訊息）"""
+        deadline = time.perf_counter() + timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            message = await self.communicator.receive_json_from(timeout=remaining)
+            if message.get('type') == expected_type:
+                return message
+
+    async def request(self, payload, expected_type, timeout):
+        """送出請求並回傳往返時間（毫秒）"""
+        start = time.perf_counter()
+        await self.communicator.send_json_to(payload)
+        await self.receive_type(expected_type, timeout)
+        return (time.perf_counter() - start) * 1000
+
+    async def close(self):
+        if self.connected:
+            await self.communicator.disconnect()
+
+
+async def _gather_limited(coroutines, concurrency):
+    """限制同時執行數量的 gather，回傳結果（例外也一併回傳）"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(c) for c in coroutines), return_exceptions=True)
+
+
+def _invalidate_snapshots(user_ids):
+    from apps.dashboard.metrics import dashboard_metrics_service
+
+    for user_id in user_ids:
+        dashboard_metrics_service.invalidate(user_id)
+
+
+async def run_websocket_load(user_ids, dashboard_clients=1000, system_clients=100,
+                             rounds=3, bursts=5, concurrency=200, timeout=10.0, cold=False):
+    """執行負載測試並回傳報告"""
+    application = build_application()
+    errors = {'connect': 0, 'request': 0, 'broadcast': 0}
+
+    gc.collect()
+    rss_before = _rss()
+    db_sampler = ConnectionSampler()
+    db_sampler.start()
+
+    # 建立連線
+    clients = [
+        SimulatedClient(application, 'dashboard', f'/ws/dashboard/{user_ids[i % len(user_ids)]}/',
+                        user_ids[i % len(user_ids)])
+        for i in range(dashboard_clients)
+    ] + [
+        SimulatedClient(application, 'system', '/ws/monitoring/system/')
+        for _ in range(system_clients)
+    ]
+
+    async def timed_connect(client):
+        start = time.perf_counter()
+        if not await client.connect(timeout):
+            raise ConnectionError('連線被拒絕')
+        return (time.perf_counter() - start) * 1000
+
+    connect_started = time.perf_counter()
+    results = await _gather_limited([timed_connect(c) for c in clients], concurrency)
+    connect_seconds = time.perf_counter() - connect_started
+    connect_times = [r for r in results if isinstance(r, float)]
+    errors['connect'] = len(results) - len(connect_times)
+    active = [c for c in clients if c.connected]
+
+    gc.collect()
+    rss_connected = _rss()
+
+    # 客戶端請求
+    request_latencies = {name: [] for name, _, _ in DASHBOARD_REQUESTS + SYSTEM_REQUESTS}
+
+    async def drive(client):
+        requests = DASHBOARD_REQUESTS if client.kind == 'dashboard' else SYSTEM_REQUESTS
+        for name, payload, expected_type in requests:
+            try:
+                request_latencies[name].append(await client.request(payload, expected_type, timeout))
+            except Exception:
+                errors['request'] += 1
+
+    request_seconds = 0.0
+    for _ in range(rounds):
+        if cold:
+            await sync_to_async(_invalidate_snapshots)(user_ids)
+        round_started = time.perf_counter()
+        await _gather_limited([drive(c) for c in active], concurrency)
+        request_seconds += time.perf_counter() - round_started
+    request_messages = sum(len(values) for values in request_latencies.values())
+
+    # 伺服器端推送
+    channel_layer = get_channel_layer()
+    dashboard_active = [c for c in active if c.kind == 'dashboard']
+    groups = {f'dashboard_{c.user_id}' for c in dashboard_active}
+    broadcast_latencies = []
+
+    async def receive_broadcast(client):
+        message = await client.receive_type('dashboard_update', timeout)
+        return (time.perf_counter() - message['data']['sent_at']) * 1000
+
+    for burst in range(bursts):
+        sent_at = time.perf_counter()
+        await asyncio.gather(*(
+            channel_layer.group_send(group, {
+                'type': 'dashboard_update',
+                'data': {'burst': burst, 'sent_at': sent_at},
+                'timestamp': timezone.now().isoformat(),
+            })
+            for group in groups
+        ))
+        results = await _gather_limited([receive_broadcast(c) for c in dashboard_active], concurrency)
+        received = [r for r in results if isinstance(r, float)]
+        broadcast_latencies.extend(received)
+        errors['broadcast'] += len(results) - len(received)
+
+    # 關閉連線
+    await _gather_limited([c.close() for c in active], concurrency)
+    gc.collect()
+    rss_after = _rss()
+    db_sampler.stop()
+    db_samples = db_sampler.samples
+
+    per_connection = (rss_connected - rss_before) / len(active) if active else 0
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'parameters': {
+            'dashboard_clients': dashboard_clients,
+            'system_clients': system_clients,
+            'users': len(user_ids),
+            'rounds': rounds,
+            'bursts': bursts,
+            'concurrency': concurrency,
+            'timeout': timeout,
+            'cold': cold,
+        },
+        'connections': {
+            'opened': len(active),
+            'seconds': round(connect_seconds, 2),
+            'per_second': round(len(active) / connect_seconds, 1) if connect_seconds else None,
+            'latency_ms': _summarize(connect_times),
+        },
+        'requests': {name: _summarize(values) for name, values in request_latencies.items()},
+        'throughput': {
+            'messages': request_messages,
+            'seconds': round(request_seconds, 2),
+            'per_second': round(request_messages / request_seconds, 1) if request_seconds else None,
+        },
+        'broadcast': {
+            'groups': len(groups),
+            'expected': len(dashboard_active) * bursts,
+            'latency_ms': _summarize(broadcast_latencies),
+        },
+        'memory': {
+            'rss_before_mb': round(rss_before / 1024 ** 2, 1),
+            'rss_connected_mb': round(rss_connected / 1024 ** 2, 1),
+            'rss_after_mb': round(rss_after / 1024 ** 2, 1),
+            'per_connection_kb': round(per_connection / 1024, 1),
+        },
+        'database': {
+            'pool_mode': DB_POOL_MODE,
+            'conn_max_age': settings.DATABASES['default'].get('CONN_MAX_AGE'),
+            'connections_start': db_samples[0] if db_samples else None,
+            'connections_peak': max(db_samples) if db_samples else None,
+            'connections_end': db_samples[-1] if db_samples else None,
+            'samples': len(db_samples),
+        },
+        'errors': errors,
+    }
+
+
+def compare_loadtest_reports(current, baseline):
+    """與先前的報告比較吞吐量與各請求 p95（正值表示變慢或變少）"""
+    def change(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    return {
+        'baseline_generated_at': baseline.get('generated_at'),
+        'messages_per_second': {
+            'baseline': baseline.get('throughput', {}).get('per_second'),
+            'current': current['throughput']['per_second'],
+            'change_percent': change(
+                current['throughput']['per_second'],
+                baseline.get('throughput', {}).get('per_second')
+            ),
+        },
+        'p95_change_percent': {
+            name: change(result.get('p95'), baseline.get('requests', {}).get(name, {}).get('p95'))
+            for name, result in current['requests'].items()
+        },
+    }
+
+
+def run_websocket_load_test(user_ids, **options):
+    """以記憶體 channel layer 執行負載測試（同步進入點）"""
+    with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS):
+        # 清除已建立的 channel layer，讓設定變更生效
+        channel_layers.backends = {}
+        try:
+            return asyncio.run(run_websocket_load(user_ids, **options))
+        finally:
+            channel_layers.backends = {}
@@ -0,0 +1,84 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.monitoring.index_audit import (
+    benchmark_queries, compare_benchmarks, explain_benchmark,
+    shapes_from_api_metrics, shapes_from_pg_stat_statements, suggest_indexes
+)
+
+
+class Command(BaseCommand):
+    help = '依實際查詢結構建議缺少的複合／部分索引'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['auto', 'pg_stat_statements', 'api_metrics'],
+                            default='auto', help='查詢結構來源（auto：優先使用 pg_stat_statements）')
+        parser.add_argument('--days', type=int, default=7, help='api_metrics 來源的統計天數')
+        parser.add_argument('--limit', type=int, default=50, help='pg_stat_statements 取前幾個查詢')
+        parser.add_argument('--json', action='store_true', help='以 JSON 輸出')
+        parser.add_argument('--benchmark', action='store_true',
+                            help='以 EXPLAIN ANALYZE 執行代表性查詢，不分析查詢結構')
+        parser.add_argument('--save', metavar='FILE', help='--benchmark 結果存成 JSON（新增索引前執行）')
+        parser.add_argument('--compare', metavar='FILE', help='--benchmark 結果與先前存下的 JSON 比較')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options)
+            return
+
+        shapes = []
+        if options['source'] in ('auto', 'pg_stat_statements'):
+            shapes = shapes_from_pg_stat_statements(options['limit'])
+        if not shapes and options['source'] in ('auto', 'api_metrics'):
+            shapes = shapes_from_api_metrics(options['days'])
+
+        if not shapes:
+            self.stdout.write('沒有可分析的查詢結構（pg_stat_statements 未安裝，且 APIMetric 無記錄）')
+            return
+
+        suggestions = suggest_indexes(shapes)
+
+        if options['json']:
+            self.stdout.write(json.dumps(suggestions, ensure_ascii=False, indent=2))
+            return
+
+        if not suggestions:
+            self.stdout.write(self.style.SUCCESS(f'✅ 分析 {len(shapes)} 個查詢結構，既有索引均已涵蓋'))
+            return
+
+        self.stdout.write(f'分析 {len(shapes)} 個查詢結構，建議 {len(suggestions)} 個索引：\n')
+        for suggestion in suggestions:
+            self.stdout.write(
+                f"-- 權重 {suggestion['weight']:.1f}，{suggestion['queries']} 個查詢結構"
+            )
+            self.stdout.write(suggestion['sql'] + ';')
+            if options['verbosity'] > 1:
+                self.stdout.write(f"   範例：{suggestion['example'][:300]}")
+            self.stdout.write('')
+
+    def benchmark(self, options):
+        """比較新增索引前後的執行計畫：先 --save，migrate 後再 --compare"""
+        queries = benchmark_queries()
+        if not queries:
+            self.stdout.write('沒有可用的代表性查詢（expenses 與 activity_participants 皆無資料）')
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE expenses')
+            cursor.execute('ANALYZE activity_participants')
+        results = explain_benchmark(queries)
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ 已儲存 {len(results)} 個查詢的執行計畫至 {options['save']}"))
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as handle:
+                before = json.load(handle)
+            for line in compare_benchmarks(before, results):
+                self.stdout.write(line)
+        elif not options['save']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False, indent=2))
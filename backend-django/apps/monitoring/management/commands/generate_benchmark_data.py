@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.monitoring.benchmark import clear_benchmark_data, generate_family_ledger
+
+
+class Command(BaseCommand):
+    help = '以 bulk_create 產生模擬家族帳本資料，供效能基準測試使用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='用戶數量')
+        parser.add_argument('--groups', type=int, default=20, help='群組數量')
+        parser.add_argument('--events', type=int, default=100, help='活動數量')
+        parser.add_argument('--expenses', type=int, default=10000, help='支出筆數（例如 10000、100000、1000000）')
+        parser.add_argument('--participants-per-event', type=int, default=4, help='每個活動的參與者數量')
+        parser.add_argument('--days', type=int, default=365, help='支出日期分佈的天數')
+        parser.add_argument('--batch-size', type=int, default=5000, help='每次寫入資料庫的筆數')
+        parser.add_argument('--seed', type=int, default=42, help='亂數種子，相同種子產生相同資料')
+        parser.add_argument('--clear', action='store_true', help='產生前先刪除既有的模擬資料')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear_benchmark_data()
+            self.stdout.write(self.style.WARNING(f'🗑️  已刪除 {deleted} 筆既有模擬資料'))
+
+        self.stdout.write('🚀 開始產生模擬資料...')
+        counts = generate_family_ledger(
+            users=options['users'],
+            groups=options['groups'],
+            events=options['events'],
+            expenses=options['expenses'],
+            participants_per_event=options['participants_per_event'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+
+        summary = '、'.join(f'{name} {count}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'✅ 模擬資料產生完成：{summary}'))
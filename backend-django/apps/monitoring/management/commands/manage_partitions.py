@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.monitoring.partitions import (
+    PARTITIONED_TABLES, convert_to_partitioned, ensure_partitions, is_partitioned,
+    list_partitions, remove_old_partitions
+)
+
+
+class Command(BaseCommand):
+    help = '維護按月分區：轉換資料表、預先建立分區、移除過期分區'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tables', nargs='*', help=f"資料表（預設全部：{', '.join(PARTITIONED_TABLES)}）")
+        parser.add_argument('--convert', action='store_true', help='將尚未分區的資料表轉為分區表')
+        parser.add_argument('--allow-drop-foreign-keys', action='store_true',
+                            help='轉換時允許移除指向該表的外鍵（expenses 需要）')
+        parser.add_argument('--months-ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD,
+                            help='預先建立的月份數')
+        parser.add_argument('--retention', action='store_true', help='依保留期間 DETACH 過期分區')
+        parser.add_argument('--drop', action='store_true', help='與 --retention 併用，直接刪除過期分區')
+        parser.add_argument('--list', action='store_true', help='列出分區')
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or list(PARTITIONED_TABLES)
+        unknown = [table for table in tables if table not in PARTITIONED_TABLES]
+        if unknown:
+            raise CommandError(f"不支援的資料表：{', '.join(unknown)}")
+
+        for table in tables:
+            spec = PARTITIONED_TABLES[table]
+
+            if not is_partitioned(table):
+                if not options['convert']:
+                    self.stdout.write(f'{table}: 尚未分區（使用 --convert 轉換）')
+                    continue
+                try:
+                    result = convert_to_partitioned(
+                        table, spec.column,
+                        months_ahead=options['months_ahead'],
+                        allow_drop_foreign_keys=options['allow_drop_foreign_keys'],
+                    )
+                except ValueError as e:
+                    raise CommandError(str(e))
+                self.stdout.write(self.style.SUCCESS(
+                    f"✅ {table}: 已轉換，{result['partitions']} 個分區"
+                ))
+                if result['dropped_foreign_keys']:
+                    self.stdout.write(self.style.WARNING(
+                        f"   已移除外鍵：{', '.join(result['dropped_foreign_keys'])}"
+                    ))
+                if result['skipped_unique_indexes']:
+                    self.stdout.write(self.style.WARNING(
+                        f"   未重建唯一索引（不含分區欄位）：{', '.join(result['skipped_unique_indexes'])}"
+                    ))
+
+            created = ensure_partitions(table, months_ahead=options['months_ahead'])
+            self.stdout.write(f'{table}: 已確認 {len(created)} 個未來分區')
+
+            if options['retention']:
+                keep_months = settings.PARTITION_RETENTION_MONTHS.get(table, spec.retention_months)
+                if keep_months is None:
+                    self.stdout.write(f'{table}: 未設定保留期間，略過')
+                else:
+                    removed = remove_old_partitions(table, keep_months, drop=options['drop'])
+                    action = '刪除' if options['drop'] else 'DETACH'
+                    self.stdout.write(f"{table}: {action} {len(removed)} 個分區 {' '.join(removed)}")
+
+            if options['list']:
+                for name, month in list_partitions(table):
+                    self.stdout.write(f"  {name}  {month.strftime('%Y-%m') if month else 'DEFAULT'}")
@@ -0,0 +1,59 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.events.models import Event
+from apps.monitoring.benchmark import (
+    BENCHMARK_USER_PREFIX, compare_reports, default_endpoints, run_endpoint_benchmarks
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '量測主要 API 的延遲與查詢數，輸出 JSON 報告'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default=f'{BENCHMARK_USER_PREFIX}000000', help='以哪位用戶的身分呼叫 API')
+        parser.add_argument('--repeat', type=int, default=10, help='每個 API 量測次數')
+        parser.add_argument('--warmup', type=int, default=2, help='不計入結果的暖身次數')
+        parser.add_argument('--label', default='', help='報告標籤（例如 10k、100k、1M）')
+        parser.add_argument('--output', help='報告輸出路徑，未指定時輸出到標準輸出')
+        parser.add_argument('--compare', help='與先前的報告比較')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"找不到用戶 {options['username']}，請先執行 generate_benchmark_data")
+
+        event = Event.objects.filter(managers=user).order_by('id').first() or Event.objects.order_by('id').first()
+        if event is None:
+            raise CommandError('沒有活動資料，請先執行 generate_benchmark_data')
+
+        report = run_endpoint_benchmarks(
+            user,
+            default_endpoints(event.id),
+            repeat=options['repeat'],
+            warmup=options['warmup'],
+            label=options['label'],
+        )
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                report['comparison'] = compare_reports(report, json.load(f))
+
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(content)
+            self.stdout.write(self.style.SUCCESS(f"✅ 報告已寫入 {options['output']}"))
+        else:
+            self.stdout.write(content)
+
+        for result in report['results']:
+            self.stderr.write(
+                f"{result['name']:<24} p50 {result['latency_ms']['p50']:>9.2f}ms  "
+                f"p95 {result['latency_ms']['p95']:>9.2f}ms  queries {result['queries']:>4}  "
+                f"HTTP {result['status_code']}"
+            )
@@ -0,0 +1,74 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.monitoring.benchmark import BENCHMARK_USER_PREFIX
+from apps.monitoring.loadtest import compare_loadtest_reports, run_websocket_load_test
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '在單一行程內模擬大量 WebSocket 連線，量測延遲、每個連線的記憶體用量與資料庫連線數'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dashboard-clients', type=int, default=1000, help='DashboardConsumer 連線數')
+        parser.add_argument('--system-clients', type=int, default=100, help='SystemMonitorConsumer 連線數')
+        parser.add_argument('--users', type=int, default=200, help='儀表板連線分配到的用戶數')
+        parser.add_argument('--rounds', type=int, default=3, help='每個連線送出請求的輪數')
+        parser.add_argument('--bursts', type=int, default=5, help='伺服器端 group_send 推送次數')
+        parser.add_argument('--concurrency', type=int, default=200, help='同時進行的連線或請求數')
+        parser.add_argument('--timeout', type=float, default=10.0, help='每個操作的逾時秒數')
+        parser.add_argument('--cold', action='store_true', help='每輪前清除儀表板快照，讓請求都查詢資料庫')
+        parser.add_argument('--output', help='報告輸出路徑，未指定時輸出到標準輸出')
+        parser.add_argument('--compare', help='與先前的報告比較')
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            User.objects.filter(
+                username__startswith=BENCHMARK_USER_PREFIX, is_active=True
+            ).order_by('id').values_list('id', flat=True)[:options['users']]
+        ) or list(User.objects.filter(is_active=True).order_by('id').values_list('id', flat=True)[:options['users']])
+        if not user_ids:
+            raise CommandError('沒有可用的用戶，請先執行 generate_benchmark_data')
+
+        self.stderr.write(
+            f"🔌 開啟 {options['dashboard_clients']} 個儀表板連線與 "
+            f"{options['system_clients']} 個系統監控連線..."
+        )
+        report = run_websocket_load_test(
+            user_ids,
+            dashboard_clients=options['dashboard_clients'],
+            system_clients=options['system_clients'],
+            rounds=options['rounds'],
+            bursts=options['bursts'],
+            concurrency=options['concurrency'],
+            timeout=options['timeout'],
+            cold=options['cold'],
+        )
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                report['comparison'] = compare_loadtest_reports(report, json.load(f))
+
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(content)
+            self.stdout.write(self.style.SUCCESS(f"✅ 報告已寫入 {options['output']}"))
+        else:
+            self.stdout.write(content)
+
+        memory = report['memory']
+        self.stderr.write(
+            f"連線 {report['connections']['opened']}，每個連線約 {memory['per_connection_kb']} KB，"
+            f"推送 p95 {report['broadcast']['latency_ms'].get('p95')} ms，"
+            f"請求 {report['throughput']['per_second']} 則/秒，錯誤 {report['errors']}"
+        )
+        database = report['database']
+        self.stderr.write(
+            f"資料庫連線（{database['pool_mode']}，CONN_MAX_AGE={database['conn_max_age']}）："
+            f"開始 {database['connections_start']}，峰值 {database['connections_peak']}，"
+            f"結束 {database['connections_end']}"
+        )
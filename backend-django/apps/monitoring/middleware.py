@@ -0,0 +1,242 @@
+"""
+API 請求查詢統計中介軟體
+
+以 connection.execute_wrapper 記錄每個 API 請求執行的 SQL 數量與資料庫時間，
+同一查詢結構重複多次時視為疑似 N+1；累計耗時超過門檻的查詢結構另記為
+slow_shapes。結果寫入 APIMetric.metadata，供 audit_indexes 指令分析。
+
+ViewSet 可宣告每個動作的查詢預算：
+
+    class GroupViewSet(viewsets.ModelViewSet):
+        query_budgets = {'list': 8, 'retrieve': 6}
+
+超過預算時記錄警告；設定 QUERY_BUDGET_STRICT = True（測試環境）時
+改為拋出 QueryBudgetExceeded，讓測試直接失敗。
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# 把 IN (%s, %s, ...) 收斂成同一個結構
+_IN_CLAUSE_RE = re.compile(r'IN \((?:%s(?:, )?)+\)')
+
+# 疑似 N+1 最多記錄幾個查詢結構
+MAX_REPORTED_SHAPES = 5
+MAX_SHAPE_LENGTH = 300
+
+
+class QueryBudgetExceeded(AssertionError):
+    """查詢數超過 ViewSet 宣告的預算"""
+
+
+def query_shape(sql):
+    """取得查詢結構（參數已是佔位符，只需收斂 IN 清單）"""
+    return _IN_CLAUSE_RE.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """execute_wrapper：統計查詢數、耗時與查詢結構"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.shape_durations = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            shape = query_shape(sql)
+            self.duration += elapsed
+            self.count += 1
+            self.shapes[shape] += 1
+            self.shape_durations[shape] += elapsed
+
+    def repeated_shapes(self, threshold):
+        """重複次數達門檻的查詢結構"""
+        return [
+            {'sql': shape[:MAX_SHAPE_LENGTH], 'count': count}
+            for shape, count in self.shapes.most_common(MAX_REPORTED_SHAPES)
+            if count >= threshold
+        ]
+
+    def slow_shapes(self, threshold_ms):
+        """累計耗時達門檻（毫秒）的查詢結構"""
+        return [
+            {'sql': shape[:MAX_SHAPE_LENGTH], 'duration_ms': round(duration * 1000, 2)}
+            for shape, duration in self.shape_durations.most_common(MAX_REPORTED_SHAPES)
+            if duration * 1000 >= threshold_ms
+        ]
+
+
+class APIMetricBuffer:
+    """APIMetric 批次寫入緩衝，避免每個請求都額外寫入一次"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._items = []
+        self._lock = threading.Lock()
+
+    def add(self, metric):
+        with self._lock:
+            self._items.append(metric)
+            if len(self._items) < self.batch_size:
+                return
+            items, self._items = self._items, []
+        self.flush(items)
+
+    @staticmethod
+    def flush(items):
+        from .models import APIMetric
+
+        try:
+            APIMetric.objects.bulk_create(items)
+        except Exception:
+            logger.exception('API 指標寫入失敗')
+
+
+api_metric_buffer = APIMetricBuffer(getattr(settings, 'API_METRICS_BATCH_SIZE', 20))
+
+
+def _get_client_ip(request):
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+class QueryBudgetMiddleware:
+    """記錄 API 請求的查詢數、資料庫時間與疑似 N+1"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.path_prefix = getattr(settings, 'API_METRICS_PATH_PREFIX', '/api/')
+        self.n_plus_one_threshold = getattr(settings, 'QUERY_N_PLUS_ONE_THRESHOLD', 5)
+        self.slow_shape_ms = getattr(settings, 'QUERY_SLOW_SHAPE_MS', 50)
+        self.strict = getattr(settings, 'QUERY_BUDGET_STRICT', False)
+
+    def __call__(self, request):
+        if not request.path.startswith(self.path_prefix):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        response_time = (time.perf_counter() - start) * 1000
+
+        metadata = self._build_metadata(request, recorder)
+        response['X-Query-Count'] = str(recorder.count)
+        self._record(request, response, response_time, metadata)
+
+        if metadata.get('over_budget'):
+            message = (
+                f"{metadata['view']}.{metadata['action']} 執行了 {recorder.count} 次查詢，"
+                f"超過預算 {metadata['query_budget']}"
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """記錄 ViewSet 與動作名稱，供查詢預算比對"""
+        view_class = getattr(view_func, 'cls', None)
+        if view_class is None:
+            return None
+        actions = getattr(view_func, 'actions', None) or {}
+        request._query_budget_view = (
+            view_class,
+            actions.get(request.method.lower(), request.method.lower())
+        )
+        return None
+
+    def _build_metadata(self, request, recorder):
+        metadata = {
+            'query_count': recorder.count,
+            'db_time_ms': round(recorder.duration * 1000, 2),
+        }
+
+        repeated = recorder.repeated_shapes(self.n_plus_one_threshold)
+        if repeated:
+            metadata['n_plus_one'] = repeated
+
+        slow = recorder.slow_shapes(self.slow_shape_ms)
+        if slow:
+            metadata['slow_shapes'] = slow
+
+        view = getattr(request, '_query_budget_view', None)
+        if view:
+            view_class, action = view
+            metadata['view'] = view_class.__name__
+            metadata['action'] = action
+            budget = (getattr(view_class, 'query_budgets', None) or {}).get(action)
+            if budget is not None:
+                metadata['query_budget'] = budget
+                metadata['over_budget'] = recorder.count > budget
+
+        return metadata
+
+    def _record(self, request, response, response_time, metadata):
+        from .models import APIMetric
+
+        user = getattr(request, 'user', None)
+        api_metric_buffer.add(APIMetric(
+            method=request.method,
+            path=request.path[:255],
+            user=user if user is not None and user.is_authenticated else None,
+            status_code=response.status_code,
+            response_time=response_time,
+            request_size=int(request.META.get('CONTENT_LENGTH') or 0),
+            response_size=len(response.content) if not response.streaming else 0,
+            ip_address=_get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            metadata=metadata,
+            timestamp=timezone.now(),
+        ))
+
+
+class ProfilingMiddleware:
+    """依管理員設定抽樣分析請求（見 apps.monitoring.profiling）"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .profiling import StackSampler, get_profiling_config, save_profile, should_profile
+
+        config = get_profiling_config()
+        if config is None or not should_profile(config, request.path):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), config['sample_interval_ms'])
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            save_profile(request, response, sampler, duration_ms)
+        except Exception:
+            logger.exception('效能分析結果儲存失敗')
+        return response
@@ -42,7 +42,8 @@ class SystemMetric(models.Model):
         help_text='額外的監控資訊 JSON'
     )
     
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name='記錄時間')
+    # 使用 default 而非 auto_now_add，批次寫入時可保留實際取樣時間
+    timestamp = models.DateTimeField(default=timezone.now, verbose_name='記錄時間')
     
     class Meta:
         verbose_name = '系統指標'
@@ -189,7 +190,7 @@ class APIMetric(models.Model):
         verbose_name='額外資訊'
     )
     
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name='請求時間')
+    timestamp = models.DateTimeField(default=timezone.now, verbose_name='請求時間')
     
     class Meta:
         verbose_name = 'API 指標'
@@ -370,4 +371,43 @@ class PerformanceBaseline(models.Model):
         ordering = ['-updated_at']
 
     def __str__(self):
-        return f"{self.metric_name} 基準線 ({self.period_start.date()} - {self.period_end.date()})"
\ No newline at end of file
+        return f"{self.metric_name} 基準線 ({self.period_start.date()} - {self.period_end.date()})"
+
+
+class ProfileArtifact(models.Model):
+    """請求效能分析結果（collapsed stack 格式，可產生火焰圖）"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    method = models.CharField(max_length=10, verbose_name='HTTP 方法')
+    path = models.CharField(max_length=255, verbose_name='請求路徑')
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='profile_artifacts',
+        verbose_name='用戶'
+    )
+    
+    status_code = models.IntegerField(verbose_name='狀態碼')
+    duration_ms = models.FloatField(verbose_name='執行時間(毫秒)')
+    
+    # 取樣資訊
+    sample_interval_ms = models.IntegerField(verbose_name='取樣間隔(毫秒)')
+    sample_count = models.IntegerField(verbose_name='樣本數量')
+    stacks = models.TextField(verbose_name='堆疊彙總')
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
+    
+    class Meta:
+        verbose_name = '效能分析結果'
+        verbose_name_plural = '效能分析結果'
+        db_table = 'profile_artifacts'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['path', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
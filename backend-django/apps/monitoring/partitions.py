@@ -0,0 +1,310 @@
+"""
+按月分區（PostgreSQL declarative range partitioning）
+
+expenses、api_metrics、user_activities 與 system_metrics 的查詢大多依
+date / timestamp 範圍篩選。轉為按月分區後，範圍查詢只會掃描相關月份，
+過期資料則以 DETACH / DROP 整個分區移除，不需要大量 DELETE。
+
+分區表的主鍵必須包含分區欄位，因此轉換後主鍵改為 (id, 分區欄位)；
+id 仍由序列或 UUID 產生，Django 端照常以 id 作為主鍵使用。
+每張表另有 DEFAULT 分區，接收超出已建立範圍的資料；之後建立涵蓋這些
+資料的月份分區時，會先把資料從 DEFAULT 分區移入新分區。
+
+分區邊界為 TIME_ZONE 的每月 1 日 00:00，與應用程式以本地月份計算的
+彙總一致。早期以 UTC 午夜為邊界建立的分區維持不變，新分區會自動
+避開與其重疊的時段。
+
+轉換與日常維護由 manage_partitions 指令執行。
+"""
+
+import re
+from collections import namedtuple
+from datetime import date, datetime, time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+PartitionedTable = namedtuple(
+    'PartitionedTable', ['table', 'column', 'retention_months']
+)
+
+# retention_months 為 None 表示不自動移除（財務資料）
+PARTITIONED_TABLES = {
+    spec.table: spec for spec in [
+        PartitionedTable('expenses', 'date', None),
+        PartitionedTable('api_metrics', 'timestamp', 6),
+        PartitionedTable('user_activities', 'timestamp', 12),
+        PartitionedTable('system_metrics', 'timestamp', 3),
+    ]
+}
+
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def _month_start(value):
+    """月份第一天；aware datetime 先轉為本地時間"""
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def _local_midnight(month):
+    """本地時區的月初 00:00"""
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)", [table]
+        )
+        row = cursor.fetchone()
+    return bool(row and row[0] == 'p')
+
+
+def list_partitions(table):
+    """回傳 [(分區名稱, 月份或 None)]，DEFAULT 分區的月份為 None"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+        """, [table])
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    prefix = f'{table}_p'
+    for name in names:
+        month = None
+        suffix = name[len(prefix):] if name.startswith(prefix) else ''
+        if len(suffix) == 6 and suffix.isdigit():
+            month = date(int(suffix[:4]), int(suffix[4:]), 1)
+        partitions.append((name, month))
+    return partitions
+
+
+def _partition_bounds(cursor, table):
+    """既有月份分區的範圍 [(名稱, 起, 迄)]，不含 DEFAULT 分區"""
+    cursor.execute("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+    """, [table])
+    bounds = []
+    for name, expression in cursor.fetchall():
+        match = _BOUND_RE.search(expression or '')
+        if match:
+            # 交由資料庫解析邊界字串，與欄位型別一致
+            cursor.execute('SELECT %s::timestamptz, %s::timestamptz', list(match.groups()))
+            bounds.append((name, *cursor.fetchone()))
+    return bounds
+
+
+def create_partition(table, month):
+    """
+    建立某個月份的分區（已存在時略過），回傳分區名稱
+
+    範圍與既有分區重疊時（例如早期以 UTC 為邊界的分區）縮小範圍避開；
+    DEFAULT 分區已有落在此範圍的資料時，先將資料移入新分區再掛上，
+    否則 PostgreSQL 會拒絕建立分區。
+    """
+    name = partition_name(table, month)
+    default = f'{table}_default'
+    start = _local_midnight(month)
+    end = _local_midnight(_add_months(month, 1))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        if cursor.fetchone()[0] is not None:
+            return name
+
+        for _, lower, upper in _partition_bounds(cursor, table):
+            if lower < end and upper > start:
+                if lower <= start:
+                    start = max(start, upper)
+                else:
+                    end = min(end, lower)
+        if start >= end:
+            return None
+
+        column = PARTITIONED_TABLES[table].column
+        cursor.execute('SELECT to_regclass(%s)', [default])
+        has_default = cursor.fetchone()[0] is not None
+        pending = False
+        if has_default:
+            cursor.execute(
+                f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s)',
+                [start, end]
+            )
+            pending = cursor.fetchone()[0]
+
+        if not pending:
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                [start, end]
+            )
+            return name
+
+        # 鎖定 DEFAULT 分區，搬移期間不會再寫入此範圍的資料
+        cursor.execute(f'LOCK TABLE "{default}" IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+            f'INCLUDING STORAGE INCLUDING COMMENTS)'
+        )
+        cursor.execute(
+            f'INSERT INTO "{name}" SELECT * FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s',
+            [start, end]
+        )
+        cursor.execute(
+            f'DELETE FROM "{default}" WHERE "{column}" >= %s AND "{column}" < %s',
+            [start, end]
+        )
+        # ATTACH 會建立父表的索引、外鍵與觸發器
+        cursor.execute(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+    return name
+
+
+def ensure_partitions(table, months_ahead=3, today=None):
+    """建立本月起往後 months_ahead 個月的分區"""
+    current = _month_start(today or timezone.localdate())
+    created = [create_partition(table, _add_months(current, offset))
+               for offset in range(months_ahead + 1)]
+    return [name for name in created if name]
+
+
+def remove_old_partitions(table, keep_months, drop=False, today=None):
+    """
+    移除早於保留期間的分區
+
+    預設只 DETACH（資料仍保留在獨立的資料表，可另行封存）；drop=True 時直接刪除。
+    """
+    cutoff = _add_months(_month_start(today or timezone.localdate()), -keep_months)
+    removed = []
+    with connection.cursor() as cursor:
+        for name, month in list_partitions(table):
+            if month is None or month >= cutoff:
+                continue
+            cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+            removed.append(name)
+    return removed
+
+
+def _fetch_all(cursor, sql, params=None):
+    cursor.execute(sql, params or [])
+    return cursor.fetchall()
+
+
+def convert_to_partitioned(table, column, months_ahead=3, allow_drop_foreign_keys=False):
+    """
+    將一般資料表轉為按月分區表
+
+    步驟：改名舊表、建立同結構的分區表、依資料範圍建立分區、複製資料、
+    移交序列後刪除舊表，再重建主鍵 (id, 分區欄位)、索引、外鍵與觸發器。
+    全程在單一交易中執行，期間資料表會被鎖定。
+
+    其他資料表指向此表的外鍵無法保留（分區表的唯一鍵必須包含分區欄位），
+    需明確指定 allow_drop_foreign_keys；Django 的 on_delete 仍在應用層處理。
+    """
+    legacy = f'{table}_legacy'
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE "{table}" IN ACCESS EXCLUSIVE MODE')
+
+        inbound = _fetch_all(cursor, """
+            SELECT conrelid::regclass::text, conname
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = to_regclass(%s)
+        """, [table])
+        if inbound and not allow_drop_foreign_keys:
+            referencing = ', '.join(f'{rel}.{name}' for rel, name in inbound)
+            raise ValueError(f'{table} 被外鍵參照（{referencing}），需指定 allow_drop_foreign_keys')
+
+        # 記錄要重建的索引、外鍵與觸發器（定義中的資料表名稱仍是原名）
+        indexes = _fetch_all(cursor, """
+            SELECT i.relname, pg_get_indexdef(ix.indexrelid), ix.indisunique
+            FROM pg_index ix
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            WHERE ix.indrelid = to_regclass(%s) AND NOT ix.indisprimary
+        """, [table])
+        foreign_keys = _fetch_all(cursor, """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE contype = 'f' AND conrelid = to_regclass(%s)
+        """, [table])
+        triggers = _fetch_all(cursor, """
+            SELECT tgname, pg_get_triggerdef(oid)
+            FROM pg_trigger
+            WHERE tgrelid = to_regclass(%s) AND NOT tgisinternal
+        """, [table])
+        sequence = _fetch_all(cursor, "SELECT pg_get_serial_sequence(%s, 'id')", [table])[0][0]
+        bounds = _fetch_all(cursor, f'SELECT min("{column}"), max("{column}") FROM "{table}"')[0]
+
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING IDENTITY '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+        cursor.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        # 涵蓋既有資料與未來月份的分區
+        current = _month_start(timezone.localdate())
+        month = _month_start(bounds[0]) if bounds[0] else current
+        last = max(_add_months(current, months_ahead), _month_start(bounds[1]) if bounds[1] else current)
+        while month <= last:
+            create_partition(table, month)
+            month = _add_months(month, 1)
+
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+
+        # 序列：identity 欄位需對齊目前最大值；serial 欄位改由新表擁有，避免隨舊表刪除
+        new_sequence = _fetch_all(cursor, "SELECT pg_get_serial_sequence(%s, 'id')", [table])[0][0]
+        if new_sequence and new_sequence != sequence:
+            cursor.execute(
+                f'SELECT setval(%s, COALESCE((SELECT max(id) FROM "{table}"), 0) + 1, false)',
+                [new_sequence]
+            )
+        elif sequence:
+            cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+
+        cursor.execute(f'DROP TABLE "{legacy}" CASCADE')
+
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, "{column}")')
+
+        skipped = []
+        for name, definition, unique in indexes:
+            if unique and column not in definition:
+                skipped.append(name)
+                continue
+            cursor.execute(definition)
+
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+
+        for name, definition in triggers:
+            cursor.execute(definition)
+
+    return {
+        'dropped_foreign_keys': [name for _, name in inbound],
+        'skipped_unique_indexes': skipped,
+        'partitions': len(list_partitions(table)),
+    }
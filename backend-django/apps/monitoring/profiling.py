@@ -0,0 +1,143 @@
+"""
+取樣式效能分析
+
+管理員可透過 /api/v1/monitoring/profiles/settings/ 暫時啟用分析：
+依比例抽樣請求，或只分析指定路徑。被選中的請求執行期間，背景執行緒
+定時讀取處理該請求的執行緒堆疊，彙總成 collapsed stack 格式
+（「frame;frame;frame 次數」，可直接餵給 flamegraph.pl / speedscope），
+存成 ProfileArtifact 供下載。
+
+設定存放在共用快取，所有 worker 不需重新部署即可生效；設定附有到期時間，
+避免忘記關閉。
+"""
+
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.utils import timezone
+
+
+PROFILING_CONFIG_CACHE_KEY = 'monitoring:profiling_config'
+
+# 行程內快取設定的秒數，避免每個請求都讀取共用快取
+CONFIG_LOCAL_TTL = 5
+
+DEFAULT_SAMPLE_INTERVAL_MS = 5
+MAX_STACK_DEPTH = 64
+MAX_DURATION_MINUTES = 24 * 60
+
+_local_config = {'expires_at': 0.0, 'value': None}
+
+
+def get_profiling_config():
+    """取得目前的分析設定，未啟用或已到期時回傳 None"""
+    now = time.monotonic()
+    if _local_config['expires_at'] > now:
+        config = _local_config['value']
+    else:
+        config = cache.get(PROFILING_CONFIG_CACHE_KEY)
+        _local_config.update(expires_at=now + CONFIG_LOCAL_TTL, value=config)
+
+    if config and config['expires_at'] <= time.time():
+        return None
+    return config
+
+
+def enable_profiling(sample_rate=0.01, path=None, duration_minutes=15,
+                     sample_interval_ms=DEFAULT_SAMPLE_INTERVAL_MS):
+    """啟用分析，到期後自動停止"""
+    duration_minutes = min(duration_minutes, MAX_DURATION_MINUTES)
+    config = {
+        'sample_rate': sample_rate,
+        'path': path or None,
+        'sample_interval_ms': sample_interval_ms,
+        'enabled_at': timezone.now().isoformat(),
+        'expires_at': time.time() + duration_minutes * 60,
+    }
+    cache.set(PROFILING_CONFIG_CACHE_KEY, config, duration_minutes * 60)
+    _local_config.update(expires_at=0.0, value=None)
+    return config
+
+
+def disable_profiling():
+    """停用分析"""
+    cache.delete(PROFILING_CONFIG_CACHE_KEY)
+    _local_config.update(expires_at=0.0, value=None)
+
+
+def should_profile(config, path):
+    """判斷此請求是否要分析"""
+    if config['path']:
+        return path.startswith(config['path'])
+    return random.random() < config['sample_rate']
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', code.co_filename)
+    return f'{module}:{code.co_name}:{code.co_firstlineno}'
+
+
+class StackSampler:
+    """定時讀取指定執行緒的堆疊並彙總"""
+
+    def __init__(self, thread_id, interval_ms=DEFAULT_SAMPLE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels = []
+            while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(labels))] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        """collapsed stack 格式的文字"""
+        return '\n'.join(
+            f'{stack} {count}' for stack, count in self.stacks.most_common()
+        )
+
+
+def save_profile(request, response, sampler, duration_ms):
+    """將分析結果存成 ProfileArtifact"""
+    from .models import ProfileArtifact
+
+    if not sampler.sample_count:
+        return None
+
+    user = getattr(request, 'user', None)
+    return ProfileArtifact.objects.create(
+        method=request.method,
+        path=request.path[:255],
+        user=user if user is not None and user.is_authenticated else None,
+        status_code=response.status_code,
+        duration_ms=duration_ms,
+        sample_interval_ms=int(sampler.interval * 1000),
+        sample_count=sampler.sample_count,
+        stacks=sampler.collapsed(),
+    )
@@ -0,0 +1,223 @@
+"""
+系統指標取樣器
+
+整個行程只保留一個取樣任務，不論有多少監控連線，
+每個間隔只收集一次系統指標，批次寫入資料庫並廣播給 system_monitor 群組。
+psutil 呼叫在執行緒中進行，不會阻塞事件迴圈。
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import psutil
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .utils import monitoring_service
+
+
+logger = logging.getLogger(__name__)
+
+# 最新樣本的快取鍵，供其他行程（如 HTTP worker）讀取
+LATEST_METRICS_CACHE_KEY = 'monitoring:latest_system_metrics'
+
+
+def collect_system_metrics():
+    """
+    收集一次系統指標
+
+    cpu_percent 使用 interval=None，回傳自上次呼叫以來的平均使用率，
+    因此不會阻塞等待。
+    """
+    cpu_percent = psutil.cpu_percent(interval=None)
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+
+    # 網路統計
+    net_io = psutil.net_io_counters()
+
+    # 程序資訊
+    process_count = len(psutil.pids())
+
+    # 系統負載（Linux/Unix）
+    try:
+        load_avg = list(psutil.getloadavg())
+    except (AttributeError, OSError):
+        load_avg = [0, 0, 0]
+
+    return {
+        'cpu_usage': cpu_percent,
+        'memory': {
+            'total': memory.total,
+            'used': memory.used,
+            'available': memory.available,
+            'percent': memory.percent
+        },
+        'disk': {
+            'total': disk.total,
+            'used': disk.used,
+            'free': disk.free,
+            'percent': disk.percent
+        },
+        'network': {
+            'bytes_sent': net_io.bytes_sent,
+            'bytes_recv': net_io.bytes_recv,
+            'packets_sent': net_io.packets_sent,
+            'packets_recv': net_io.packets_recv
+        },
+        'process_count': process_count,
+        'load_average': load_avg,
+        'timestamp': timezone.now().isoformat()
+    }
+
+
+class SystemMetricsSampler:
+    """行程共用的系統指標取樣器"""
+
+    def __init__(self, interval=None, batch_size=None):
+        self.interval = interval or getattr(settings, 'SYSTEM_METRICS_SAMPLE_INTERVAL', 30)
+        self.batch_size = batch_size or getattr(settings, 'SYSTEM_METRICS_BATCH_SIZE', 5)
+        self.latest = None
+        self._viewers = 0
+        self._task = None
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    async def subscribe(self):
+        """新增一個觀看者，必要時啟動取樣任務"""
+        self._viewers += 1
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run())
+
+    async def unsubscribe(self):
+        """移除一個觀看者，沒有觀看者時停止取樣並寫入剩餘樣本"""
+        self._viewers = max(0, self._viewers - 1)
+        if self._viewers == 0 and self.is_running:
+            self._task.cancel()
+            self._task = None
+            # 停止後不再更新，改由背景執行緒維護的快取提供最新樣本
+            self.latest = None
+            await database_sync_to_async(self.flush)()
+
+    async def _run(self):
+        """取樣循環"""
+        # 第一次 cpu_percent(interval=None) 只建立基準值
+        await database_sync_to_async(psutil.cpu_percent)(None)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await database_sync_to_async(self.sample)()
+            except Exception:
+                logger.exception('系統指標取樣失敗')
+
+    def sample(self):
+        """收集、暫存並廣播一次樣本（於執行緒中執行）"""
+        metrics = collect_system_metrics()
+        self.latest = metrics
+        cache.set(LATEST_METRICS_CACHE_KEY, metrics, self.interval * 3)
+
+        self._buffer_metrics(metrics)
+        monitoring_service.send_system_metrics(metrics)
+        return metrics
+
+    def _buffer_metrics(self, metrics):
+        """暫存樣本，累積到批次大小時寫入資料庫"""
+        from .models import SystemMetric
+
+        sampled_at = timezone.now()
+        rows = [
+            SystemMetric(metric_type='cpu_usage', value=metrics['cpu_usage'],
+                         unit='%', timestamp=sampled_at),
+            SystemMetric(metric_type='memory_usage', value=metrics['memory']['percent'],
+                         unit='%', timestamp=sampled_at),
+            SystemMetric(metric_type='disk_usage', value=metrics['disk']['percent'],
+                         unit='%', timestamp=sampled_at),
+        ]
+
+        with self._buffer_lock:
+            self._buffer.append(rows)
+            should_flush = len(self._buffer) >= self.batch_size
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """將暫存的樣本批次寫入資料庫"""
+        from .models import SystemMetric
+
+        with self._buffer_lock:
+            batches, self._buffer = self._buffer, []
+
+        rows = [row for batch in batches for row in batch]
+        if rows:
+            SystemMetric.objects.bulk_create(rows)
+
+
+def get_latest_system_metrics():
+    """
+    取得最新的系統指標樣本
+
+    依序使用本行程取樣器、共用快取；都沒有時立即以非阻塞方式收集一次。
+    """
+    candidates = [m for m in (system_metrics_sampler.latest, cache.get(LATEST_METRICS_CACHE_KEY)) if m]
+    # 取較新的樣本（ISO 時間字串可直接比較）
+    metrics = max(candidates, key=lambda m: m['timestamp']) if candidates else None
+    if metrics is None:
+        metrics = collect_system_metrics()
+        cache.set(LATEST_METRICS_CACHE_KEY, metrics, system_metrics_sampler.interval * 3)
+    return metrics
+
+
+_background_thread = None
+_background_lock = threading.Lock()
+
+
+def _background_loop(interval):
+    """
+    背景執行緒：定期更新快取中的最新樣本（不寫入資料庫、不廣播）
+
+    本行程的取樣任務執行中時由它更新快取，此執行緒不呼叫 psutil，
+    避免兩者交錯呼叫 cpu_percent(interval=None) 互相縮短計算區間。
+    """
+    while True:
+        time.sleep(interval)
+        if system_metrics_sampler.is_running:
+            continue
+        try:
+            cache.set(LATEST_METRICS_CACHE_KEY, collect_system_metrics(), interval * 3)
+        except Exception:
+            logger.exception('背景系統指標取樣失敗')
+
+
+def ensure_background_sampler():
+    """
+    確保 HTTP worker 行程內有背景取樣執行緒
+
+    WSGI 部署時沒有 WebSocket 取樣任務，由此執行緒維持快取樣本的新鮮度。
+    """
+    global _background_thread
+
+    if _background_thread is not None and _background_thread.is_alive():
+        return
+    with _background_lock:
+        if _background_thread is not None and _background_thread.is_alive():
+            return
+        _background_thread = threading.Thread(
+            target=_background_loop,
+            args=(system_metrics_sampler.interval,),
+            name='system-metrics-sampler',
+            daemon=True,
+        )
+        _background_thread.start()
+
+
+# 全域取樣器實例
+system_metrics_sampler = SystemMetricsSampler()
@@ -6,7 +6,7 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from datetime import timedelta
-from .models import SystemMetric, UserActivity, APIMetric, Alert, PerformanceBaseline
+from .models import SystemMetric, UserActivity, APIMetric, Alert, PerformanceBaseline, ProfileArtifact
 
 User = get_user_model()
 
@@ -53,6 +53,27 @@ class APIMetricSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'timestamp']
 
 
+class ProfileArtifactSerializer(serializers.ModelSerializer):
+    """效能分析結果序列化器（不含堆疊內容，需另外下載）"""
+    user_name = serializers.CharField(source='user.name', read_only=True)
+
+    class Meta:
+        model = ProfileArtifact
+        fields = [
+            'id', 'method', 'path', 'user', 'user_name', 'status_code',
+            'duration_ms', 'sample_interval_ms', 'sample_count', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class ProfilingConfigSerializer(serializers.Serializer):
+    """效能分析設定序列化器"""
+    sample_rate = serializers.FloatField(min_value=0, max_value=1, default=0.01)
+    path = serializers.CharField(required=False, allow_blank=True, allow_null=True, default=None)
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=24 * 60, default=15)
+    sample_interval_ms = serializers.IntegerField(min_value=1, max_value=1000, default=5)
+
+
 class AlertSerializer(serializers.ModelSerializer):
     """系統告警序列化器"""
     severity_display = serializers.CharField(source='get_severity_display', read_only=True)
@@ -131,8 +152,13 @@ class SystemHealthSerializer(serializers.Serializer):
     memory_usage = serializers.FloatField()
     disk_usage = serializers.FloatField()
     database_connections = serializers.IntegerField()
+    database_connections_by_state = serializers.DictField(
+        child=serializers.IntegerField(), required=False
+    )
+    database_pool = serializers.DictField(required=False)
     active_users = serializers.IntegerField()
     status = serializers.CharField()
+    sampled_at = serializers.DateTimeField(required=False)
     last_updated = serializers.DateTimeField()
 
 
@@ -0,0 +1,20 @@
+"""
+監控相關信號處理器
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .utils import invalidate_admin_ids
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def refresh_admin_ids(sender, update_fields=None, **kwargs):
+    """用戶變更時清除管理員 ID 快取"""
+    # 登入只更新 last_login，不影響管理員名單
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_admin_ids()
@@ -6,7 +6,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     SystemMetricViewSet, UserActivityViewSet, APIMetricViewSet,
-    AlertViewSet, PerformanceBaselineViewSet
+    AlertViewSet, PerformanceBaselineViewSet, ProfileArtifactViewSet
 )
 
 router = DefaultRouter()
@@ -15,6 +15,7 @@ router.register(r'user-activities', UserActivityViewSet, basename='user-activiti
 router.register(r'api-metrics', APIMetricViewSet, basename='api-metrics')
 router.register(r'alerts', AlertViewSet, basename='alerts')
 router.register(r'baselines', PerformanceBaselineViewSet, basename='performance-baselines')
+router.register(r'profiles', ProfileArtifactViewSet, basename='profiles')
 
 urlpatterns = [
     path('', include(router.urls)),
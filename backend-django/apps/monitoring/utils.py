@@ -5,10 +5,37 @@ Monitoring 工具函數
 import json
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
 
 
+# 管理員告警廣播群組
+ADMIN_ALERTS_GROUP = 'alerts_admins'
+
+ADMIN_IDS_CACHE_KEY = 'monitoring:admin_ids'
+ADMIN_IDS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_admin_ids():
+    """取得管理員 ID 集合（快取，用戶變更時失效）"""
+    admin_ids = cache.get(ADMIN_IDS_CACHE_KEY)
+    if admin_ids is None:
+        from django.contrib.auth import get_user_model
+        
+        User = get_user_model()
+        admin_ids = set(
+            User.objects.filter(is_staff=True, is_active=True).values_list('id', flat=True)
+        )
+        cache.set(ADMIN_IDS_CACHE_KEY, admin_ids, ADMIN_IDS_CACHE_TIMEOUT)
+    return admin_ids
+
+
+def invalidate_admin_ids():
+    """清除管理員 ID 快取"""
+    cache.delete(ADMIN_IDS_CACHE_KEY)
+
+
 class MonitoringService:
     """監控服務"""
     
@@ -47,6 +74,28 @@ class MonitoringService:
             }
         )
     
+    def broadcast_admin_alert(self, alert_data):
+        """廣播新告警給所有管理員（單次發布）"""
+        async_to_sync(self.channel_layer.group_send)(
+            ADMIN_ALERTS_GROUP,
+            {
+                'type': 'new_alert',
+                'data': alert_data,
+                'timestamp': timezone.now().isoformat()
+            }
+        )
+    
+    def broadcast_admin_alert_resolved(self, alert_data):
+        """廣播告警解決通知給所有管理員（單次發布）"""
+        async_to_sync(self.channel_layer.group_send)(
+            ADMIN_ALERTS_GROUP,
+            {
+                'type': 'alert_resolved',
+                'data': alert_data,
+                'timestamp': timezone.now().isoformat()
+            }
+        )
+    
     def send_activity_update(self, activity_data):
         """發送活動更新"""
         if not settings.REALTIME_NOTIFICATIONS.get('USER_ACTIVITIES', True):
@@ -126,12 +175,9 @@ class AlertManager:
     
     def notify_administrators(self, alert):
         """通知管理員新告警"""
-        from django.contrib.auth import get_user_model
-        
-        User = get_user_model()
-        
-        # 取得所有管理員
-        administrators = User.objects.filter(is_staff=True, is_active=True)
+        # 沒有管理員時不需要發布
+        if not get_admin_ids():
+            return
         
         alert_data = {
             'id': str(alert.id),
@@ -142,19 +188,15 @@ class AlertManager:
             'created_at': alert.created_at.isoformat()
         }
         
-        # 發送給每個管理員
-        for admin in administrators:
-            self.monitoring_service.send_new_alert(str(admin.id), alert_data)
+        # 管理員連線皆加入 alerts_admins 群組，一次發布即可送達所有管理員
+        self.monitoring_service.broadcast_admin_alert(alert_data)
     
     def notify_administrators_resolved(self, alert_data):
         """通知管理員告警已解決"""
-        from django.contrib.auth import get_user_model
-        
-        User = get_user_model()
-        administrators = User.objects.filter(is_staff=True, is_active=True)
+        if not get_admin_ids():
+            return
         
-        for admin in administrators:
-            self.monitoring_service.send_alert_resolved(str(admin.id), alert_data)
+        self.monitoring_service.broadcast_admin_alert_resolved(alert_data)
 
 
 class PerformanceMonitor:
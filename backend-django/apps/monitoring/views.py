@@ -5,27 +5,40 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, BasePermission
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.db.models import Q, Count, Avg, Max, Min
 from datetime import datetime, timedelta
-import psutil
 import json
 
-from .models import SystemMetric, UserActivity, APIMetric, Alert, PerformanceBaseline
+from .models import SystemMetric, UserActivity, APIMetric, Alert, PerformanceBaseline, ProfileArtifact
 from .serializers import (
     SystemMetricSerializer, UserActivitySerializer, APIMetricSerializer,
     AlertSerializer, PerformanceBaselineSerializer, SystemHealthSerializer,
     ActivitySummarySerializer, APIUsageSerializer, AlertSummarySerializer,
-    PerformanceTrendSerializer, UserBehaviorSerializer, SimpleAlertSerializer
+    PerformanceTrendSerializer, UserBehaviorSerializer, SimpleAlertSerializer,
+    ProfileArtifactSerializer, ProfilingConfigSerializer
 )
+from .health import get_system_health
+from .profiling import enable_profiling, disable_profiling, get_profiling_config
+from pangcah_accounting.db_router import ReplicaReadMixin
 
 
-class SystemMetricViewSet(viewsets.ReadOnlyModelViewSet):
+class IsSystemAdmin(BasePermission):
+    """只允許系統管理員"""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.role == 'ADMIN')
+
+
+class SystemMetricViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """系統指標監控"""
     serializer_class = SystemMetricSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = {'metrics_trend'}
 
     def get_queryset(self):
         queryset = SystemMetric.objects.all()
@@ -50,37 +63,8 @@ class SystemMetricViewSet(viewsets.ReadOnlyModelViewSet):
     def current_health(self, request):
         """取得當前系統健康狀態"""
         try:
-            # 取得系統資源使用情況
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            # 模擬資料庫連線數（實際環境中應從資料庫取得）
-            db_connections = 10
-            
-            # 計算活躍用戶數（最近15分鐘有活動的用戶）
-            fifteen_minutes_ago = timezone.now() - timedelta(minutes=15)
-            active_users = UserActivity.objects.filter(
-                timestamp__gte=fifteen_minutes_ago
-            ).values('user').distinct().count()
-            
-            # 判斷系統狀態
-            if cpu_percent > 90 or memory.percent > 90 or disk.percent > 90:
-                status_value = 'critical'
-            elif cpu_percent > 70 or memory.percent > 70 or disk.percent > 80:
-                status_value = 'warning'
-            else:
-                status_value = 'healthy'
-            
-            health_data = {
-                'cpu_usage': cpu_percent,
-                'memory_usage': memory.percent,
-                'disk_usage': disk.percent,
-                'database_connections': db_connections,
-                'active_users': active_users,
-                'status': status_value,
-                'last_updated': timezone.now()
-            }
+            # 從背景取樣器的最新樣本與快取統計組合，不在請求中阻塞取樣
+            health_data = get_system_health()
             
             serializer = SystemHealthSerializer(health_data)
             return Response(serializer.data)
@@ -132,10 +116,11 @@ class SystemMetricViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
+class UserActivityViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """用戶活動監控"""
     serializer_class = UserActivitySerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = {'daily_summary', 'user_behavior'}
 
     def get_queryset(self):
         queryset = UserActivity.objects.all()
@@ -174,8 +159,10 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
             next_date = current_date + timedelta(days=1)
             
             # 統計當日活動
+            day_start = timezone.make_aware(datetime.combine(current_date, datetime.min.time()))
             daily_activities = UserActivity.objects.filter(
-                timestamp__date=current_date
+                timestamp__gte=day_start,
+                timestamp__lt=day_start + timedelta(days=1)
             )
             
             total_users = daily_activities.values('user').distinct().count()
@@ -244,10 +231,11 @@ class UserActivityViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class APIMetricViewSet(viewsets.ReadOnlyModelViewSet):
+class APIMetricViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """API 指標監控"""
     serializer_class = APIMetricSerializer
     permission_classes = [IsAuthenticated]
+    replica_actions = {'usage_stats'}
 
     def get_queryset(self):
         queryset = APIMetric.objects.all()
@@ -460,4 +448,45 @@ class PerformanceBaselineViewSet(viewsets.ModelViewSet):
         )
         
         serializer = self.get_serializer(baseline)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class ProfileArtifactViewSet(viewsets.ReadOnlyModelViewSet):
+    """效能分析結果管理（僅限系統管理員）"""
+    serializer_class = ProfileArtifactSerializer
+    permission_classes = [IsSystemAdmin]
+
+    def get_queryset(self):
+        queryset = ProfileArtifact.objects.select_related('user').defer('stacks')
+        
+        path = self.request.query_params.get('path')
+        if path:
+            queryset = queryset.filter(path__startswith=path)
+        
+        return queryset.order_by('-created_at')
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """下載 collapsed stack 檔案（可用 flamegraph.pl 或 speedscope 開啟）"""
+        artifact = get_object_or_404(ProfileArtifact, pk=pk)
+        response = HttpResponse(artifact.stacks, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{artifact.id}.folded"'
+        return response
+
+    @action(detail=False, methods=['get', 'post', 'delete'], url_path='settings')
+    def profiling_settings(self, request):
+        """查看、啟用或停用效能分析"""
+        if request.method == 'POST':
+            serializer = ProfilingConfigSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            config = enable_profiling(**serializer.validated_data)
+            return Response({'enabled': True, **config}, status=status.HTTP_201_CREATED)
+        
+        if request.method == 'DELETE':
+            disable_profiling()
+            return Response({'enabled': False})
+        
+        config = get_profiling_config()
+        if config is None:
+            return Response({'enabled': False})
+        return Response({'enabled': True, **config})
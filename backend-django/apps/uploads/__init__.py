@@ -0,0 +1 @@
+# Uploads 圖片上傳應用程式
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.uploads.models import ImageStatus
+from apps.uploads.thumbnails import claim_image, claimable_images, generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = '產生尚未完成的圖片縮圖（補做行程重啟時遺失的工作，或作為獨立 worker）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='一併重試失敗的圖片（最多 RECEIPT_THUMBNAIL_MAX_ATTEMPTS 次）')
+        parser.add_argument('--limit', type=int, default=500, help='每輪最多處理張數')
+        parser.add_argument('--loop', action='store_true', help='持續輪詢待處理圖片')
+        parser.add_argument('--interval', type=float, default=5.0, help='--loop 時的輪詢間隔（秒）')
+
+    def handle(self, *args, **options):
+        retry_failed = options['retry_failed']
+
+        while True:
+            close_old_connections()
+            image_ids = list(
+                claimable_images(retry_failed).order_by('created_at')
+                .values_list('pk', flat=True)[:options['limit']]
+            )
+            processed = 0
+            for image_id in image_ids:
+                # 背景執行緒或其他 worker 已領取時略過
+                image = claim_image(image_id, retry_failed)
+                if image is None:
+                    continue
+                processed += 1
+                image = generate_thumbnails(image)
+                if image.status == ImageStatus.READY:
+                    self.stdout.write(f'✅ {image.sha256[:12]}: {len(image.thumbnails)} 個縮圖')
+                else:
+                    self.stdout.write(self.style.WARNING(f'⚠️  {image.sha256[:12]}: {image.error}'))
+
+            if not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'完成，共處理 {processed} 張圖片'))
+                return
+            # 每輪都等待，避免持續失敗的圖片讓迴圈空轉
+            time.sleep(options['interval'])
@@ -0,0 +1,98 @@
+# Generated by Django 5.0.1 on 2026-10-18 00:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoredImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "sha256",
+                    models.CharField(max_length=64, unique=True, verbose_name="SHA-256"),
+                ),
+                ("path", models.CharField(max_length=255, verbose_name="原圖路徑")),
+                (
+                    "content_type",
+                    models.CharField(max_length=50, verbose_name="MIME 類型"),
+                ),
+                (
+                    "size",
+                    models.PositiveIntegerField(help_text="位元組", verbose_name="檔案大小"),
+                ),
+                (
+                    "width",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="寬度"),
+                ),
+                (
+                    "height",
+                    models.PositiveIntegerField(blank=True, null=True, verbose_name="高度"),
+                ),
+                (
+                    "thumbnails",
+                    models.JSONField(
+                        blank=True, default=dict, help_text="{尺寸: 路徑}", verbose_name="縮圖"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PENDING", "處理中"),
+                            ("READY", "完成"),
+                            ("FAILED", "失敗"),
+                        ],
+                        default="PENDING",
+                        max_length=10,
+                        verbose_name="狀態",
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="錯誤訊息")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="創建時間"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+                ),
+                (
+                    "uploaded_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="uploaded_images",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="上傳者",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "上傳圖片",
+                "verbose_name_plural": "上傳圖片",
+                "db_table": "stored_images",
+                "indexes": [
+                    models.Index(fields=["status"], name="stored_images_status_idx"),
+                ],
+            },
+        ),
+    ]
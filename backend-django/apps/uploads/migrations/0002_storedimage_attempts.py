@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-19 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("uploads", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="storedimage",
+            name="attempts",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="處理次數"),
+        ),
+        migrations.AlterField(
+            model_name="storedimage",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "處理中"),
+                    ("PROCESSING", "產生縮圖中"),
+                    ("READY", "完成"),
+                    ("FAILED", "失敗"),
+                ],
+                default="PENDING",
+                max_length=10,
+                verbose_name="狀態",
+            ),
+        ),
+    ]
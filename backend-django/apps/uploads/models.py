@@ -0,0 +1,71 @@
+"""
+上傳圖片模型
+
+圖片以內容雜湊（SHA-256）定址，相同內容只儲存一次。
+"""
+
+from django.conf import settings
+from django.db import models
+
+
+class ImageStatus(models.TextChoices):
+    """縮圖處理狀態"""
+    PENDING = 'PENDING', '處理中'
+    PROCESSING = 'PROCESSING', '產生縮圖中'
+    READY = 'READY', '完成'
+    FAILED = 'FAILED', '失敗'
+
+
+class StoredImage(models.Model):
+    """
+    內容定址的上傳圖片
+
+    原圖存放於 <RECEIPT_STORAGE_PREFIX>/<sha[:2]>/<sha[2:4]>/<sha>.<副檔名>，
+    縮圖為同目錄的 <sha>_<尺寸>.webp，由背景工作產生；
+    處理前先將狀態改為 PROCESSING 領取，避免多個 worker 重複產生。
+    """
+
+    sha256 = models.CharField("SHA-256", max_length=64, unique=True)
+    path = models.CharField("原圖路徑", max_length=255)
+    content_type = models.CharField("MIME 類型", max_length=50)
+    size = models.PositiveIntegerField("檔案大小", help_text="位元組")
+    width = models.PositiveIntegerField("寬度", null=True, blank=True)
+    height = models.PositiveIntegerField("高度", null=True, blank=True)
+
+    thumbnails = models.JSONField(
+        "縮圖",
+        default=dict,
+        blank=True,
+        help_text="{尺寸: 路徑}"
+    )
+    status = models.CharField(
+        "狀態",
+        max_length=10,
+        choices=ImageStatus.choices,
+        default=ImageStatus.PENDING
+    )
+    error = models.TextField("錯誤訊息", blank=True)
+    attempts = models.PositiveSmallIntegerField("處理次數", default=0)
+
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='uploaded_images',
+        verbose_name="上傳者"
+    )
+
+    created_at = models.DateTimeField("創建時間", auto_now_add=True)
+    updated_at = models.DateTimeField("更新時間", auto_now=True)
+
+    class Meta:
+        verbose_name = "上傳圖片"
+        verbose_name_plural = "上傳圖片"
+        db_table = "stored_images"
+        indexes = [
+            models.Index(fields=['status'], name='stored_images_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.get_status_display()})"
@@ -0,0 +1,100 @@
+"""
+上傳圖片序列化器
+"""
+
+from PIL import Image, UnidentifiedImageError
+from django.conf import settings
+from rest_framework import serializers
+
+from .models import StoredImage
+from .storage import ready_thumbnails, sha256_from_url, storage_url, thumbnail_urls
+
+
+# Pillow 格式 → (副檔名, MIME 類型)
+ALLOWED_FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'WEBP': ('webp', 'image/webp'),
+    'GIF': ('gif', 'image/gif'),
+}
+
+
+class ImageUploadSerializer(serializers.Serializer):
+    """圖片上傳：以內容判斷格式，不信任副檔名"""
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        max_bytes = getattr(settings, 'RECEIPT_MAX_UPLOAD_BYTES', 10 * 1024 * 1024)
+        if value.size > max_bytes:
+            raise serializers.ValidationError(f"檔案不可超過 {max_bytes // (1024 * 1024)} MB")
+
+        try:
+            image = Image.open(value)
+            image_format = image.format
+            image.verify()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+            raise serializers.ValidationError("無法辨識的圖片檔案")
+        finally:
+            value.seek(0)
+
+        if image_format not in ALLOWED_FORMATS:
+            raise serializers.ValidationError("僅支援 JPEG、PNG、WebP、GIF 圖片")
+        value.image_format = image_format
+        return value
+
+
+class StoredImageSerializer(serializers.ModelSerializer):
+    """上傳圖片序列化器"""
+    url = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StoredImage
+        fields = ['id', 'sha256', 'url', 'thumbnails', 'status', 'content_type', 'size', 'width', 'height', 'created_at']
+        read_only_fields = fields
+
+    def get_url(self, obj):
+        return storage_url(obj.path, self.context.get('request'))
+
+    def get_thumbnails(self, obj):
+        return thumbnail_urls(obj, self.context.get('request'))
+
+
+class ImageThumbnailsMixin:
+    """
+    為含 images 網址陣列的序列化器提供 get_image_thumbnails
+
+    回傳 [{'original': 網址, 'thumbnails': {尺寸: 網址}}]，縮圖未完成或非本系統
+    上傳的圖片 thumbnails 為空。列表序列化時整頁的圖片只查詢一次。
+    """
+    images_field = 'images'
+
+    def _thumbnail_index(self, obj):
+        state = self.context.setdefault('_image_thumbnails', {'checked': set(), 'found': {}})
+
+        hashes = {sha256_from_url(url) for url in getattr(obj, self.images_field)} - {None}
+        if hashes - state['checked']:
+            # 同一頁的其他物件一併查詢
+            siblings = getattr(self.parent, 'instance', None)
+            objects = siblings if isinstance(siblings, (list, tuple)) else [obj]
+            for sibling in objects:
+                hashes.update(sha256_from_url(url) for url in getattr(sibling, self.images_field))
+            hashes.discard(None)
+            missing = hashes - state['checked']
+            state['found'].update(ready_thumbnails(missing))
+            state['checked'].update(missing)
+        return state['found']
+
+    def get_image_thumbnails(self, obj):
+        index = self._thumbnail_index(obj)
+        request = self.context.get('request')
+        return [
+            {
+                'original': url,
+                'thumbnails': {
+                    size: storage_url(path, request)
+                    for size, path in index.get(sha256_from_url(url), {}).items()
+                },
+            }
+            for url in getattr(obj, self.images_field)
+        ]
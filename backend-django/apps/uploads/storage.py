@@ -0,0 +1,139 @@
+"""
+內容定址圖片儲存
+
+以 SHA-256 決定檔案路徑，相同內容的圖片只存一份。儲存後端由
+RECEIPT_STORAGE 設定（{'BACKEND': ..., 'OPTIONS': {...}}），未設定時
+使用 default_storage；可搭配 django-storages 的 S3 等後端。
+
+原圖與縮圖路徑都由雜湊推導，已完成的縮圖內容不會再變，網址可長期快取。
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils.module_loading import import_string
+
+from .models import ImageStatus, StoredImage
+
+
+READY_CACHE_PREFIX = 'uploads:ready'
+
+_SHA_IN_URL_RE = re.compile(r'/([0-9a-f]{64})\.\w+(?:\?.*)?$')
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    """圖片使用的儲存後端"""
+    storage_settings = getattr(settings, 'RECEIPT_STORAGE', None)
+    if not storage_settings:
+        return default_storage
+    return import_string(storage_settings['BACKEND'])(**storage_settings.get('OPTIONS', {}))
+
+
+def _directory(sha256):
+    prefix = getattr(settings, 'RECEIPT_STORAGE_PREFIX', 'receipts')
+    return f'{prefix}/{sha256[:2]}/{sha256[2:4]}'
+
+
+def original_path(sha256, extension):
+    return f'{_directory(sha256)}/{sha256}.{extension}'
+
+
+def thumbnail_path(sha256, size):
+    return f'{_directory(sha256)}/{sha256}_{size}.webp'
+
+
+def hash_file(file):
+    """分塊計算上傳檔案的 SHA-256"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def store_image(file, extension, content_type, user=None):
+    """
+    儲存上傳圖片，回傳 (StoredImage, 是否為新圖片)
+
+    內容已存在時直接回傳既有紀錄，不重複寫入儲存後端。
+    新圖片於交易提交後排入縮圖佇列。
+    """
+    sha256 = hash_file(file)
+    existing = StoredImage.objects.filter(sha256=sha256).first()
+    if existing is not None:
+        return existing, False
+
+    storage = get_storage()
+    path = original_path(sha256, extension)
+    if not storage.exists(path):
+        # 儲存後端可能在檔名衝突時改名，以實際回傳的路徑為準
+        path = storage.save(path, file)
+
+    try:
+        with transaction.atomic():
+            image = StoredImage.objects.create(
+                sha256=sha256,
+                path=path,
+                content_type=content_type,
+                size=file.size,
+                uploaded_by=user,
+            )
+    except IntegrityError:
+        # 同時上傳相同內容，由另一個請求建立
+        return StoredImage.objects.get(sha256=sha256), False
+
+    from .thumbnails import enqueue_thumbnails
+    transaction.on_commit(lambda: enqueue_thumbnails(image.pk))
+    return image, True
+
+
+def storage_url(path, request=None):
+    """儲存路徑的網址；相對網址在有 request 時轉為絕對網址"""
+    url = get_storage().url(path)
+    if request is not None and url.startswith('/'):
+        url = request.build_absolute_uri(url)
+    return url
+
+
+def thumbnail_urls(image, request=None):
+    """{尺寸: 網址}，縮圖尚未完成時為空"""
+    if image.status != ImageStatus.READY:
+        return {}
+    return {size: storage_url(path, request) for size, path in image.thumbnails.items()}
+
+
+def sha256_from_url(url):
+    """從內容定址網址取出雜湊，非本系統上傳的網址回傳 None"""
+    match = _SHA_IN_URL_RE.search(url or '')
+    return match.group(1) if match else None
+
+
+def ready_thumbnails(hashes):
+    """
+    批次查詢已完成縮圖的圖片，回傳 {雜湊: {尺寸: 路徑}}
+
+    完成的縮圖不會再變動，結果長期快取；處理中的圖片每次重新查詢。
+    """
+    hashes = set(hashes)
+    if not hashes:
+        return {}
+
+    keys = {f'{READY_CACHE_PREFIX}:{sha256}': sha256 for sha256 in hashes}
+    found = {keys[key]: value for key, value in cache.get_many(keys).items()}
+
+    missing = hashes - found.keys()
+    if missing:
+        rows = StoredImage.objects.filter(
+            sha256__in=missing, status=ImageStatus.READY
+        ).values_list('sha256', 'thumbnails')
+        fetched = dict(rows)
+        if fetched:
+            cache.set_many({f'{READY_CACHE_PREFIX}:{sha256}': value for sha256, value in fetched.items()}, None)
+        found.update(fetched)
+    return found
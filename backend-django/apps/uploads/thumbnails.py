@@ -0,0 +1,153 @@
+"""
+WebP 縮圖產生
+
+上傳後由本行程的背景執行緒依序處理（與 monitoring.sampler 相同的
+daemon thread 模式），不佔用請求時間。行程重啟時佇列中的工作會遺失，
+狀態仍為 PENDING 的圖片可由 generate_thumbnails 指令補做，
+該指令也可搭配 --loop 作為獨立的 worker 執行。
+
+背景執行緒與 worker 處理前都以條件式 UPDATE 將圖片改為 PROCESSING 領取，
+同一張圖片只會由一方產生縮圖。
+"""
+
+import io
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageStatus, StoredImage
+from .storage import READY_CACHE_PREFIX, get_storage, thumbnail_path
+
+
+logger = logging.getLogger(__name__)
+
+_queue = queue.Queue()
+_worker_thread = None
+_worker_lock = threading.Lock()
+
+
+def thumbnail_sizes():
+    return getattr(settings, 'RECEIPT_THUMBNAIL_SIZES', (160, 480, 960))
+
+
+def _render_webp(source, size, quality):
+    """等比縮小至 size×size 以內並輸出 WebP，不放大小圖"""
+    thumbnail = source.copy()
+    thumbnail.thumbnail((size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, 'WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(image):
+    """產生並儲存所有尺寸的縮圖，更新圖片紀錄"""
+    storage = get_storage()
+    quality = getattr(settings, 'RECEIPT_THUMBNAIL_QUALITY', 80)
+
+    try:
+        with storage.open(image.path, 'rb') as handle:
+            source = Image.open(handle)
+            source.load()
+        # 依 EXIF 方向轉正手機拍攝的收據
+        source = ImageOps.exif_transpose(source)
+        if source.mode not in ('RGB', 'RGBA'):
+            has_alpha = source.mode in ('LA', 'PA') or 'transparency' in source.info
+            source = source.convert('RGBA' if has_alpha else 'RGB')
+
+        thumbnails = {}
+        for size in thumbnail_sizes():
+            path = thumbnail_path(image.sha256, size)
+            if not storage.exists(path):
+                path = storage.save(path, ContentFile(_render_webp(source, size, quality)))
+            thumbnails[str(size)] = path
+    except Exception as exc:
+        logger.exception('產生縮圖失敗：%s', image.sha256)
+        image.status = ImageStatus.FAILED
+        image.error = str(exc)[:1000]
+        image.save(update_fields=['status', 'error', 'updated_at'])
+        return image
+
+    image.width, image.height = source.size
+    image.thumbnails = thumbnails
+    image.status = ImageStatus.READY
+    image.error = ''
+    image.save(update_fields=['width', 'height', 'thumbnails', 'status', 'error', 'updated_at'])
+    cache.set(f'{READY_CACHE_PREFIX}:{image.sha256}', thumbnails, None)
+    return image
+
+
+def claimable_images(retry_failed=False):
+    """
+    可領取的圖片：待處理、領取逾時（worker 中斷）的處理中，
+    以及 retry_failed 時尚未達重試上限的失敗圖片
+    """
+    timeout = getattr(settings, 'RECEIPT_THUMBNAIL_CLAIM_TIMEOUT', 600)
+    condition = Q(status=ImageStatus.PENDING) | Q(
+        status=ImageStatus.PROCESSING,
+        updated_at__lt=timezone.now() - timedelta(seconds=timeout)
+    )
+    if retry_failed:
+        condition |= Q(
+            status=ImageStatus.FAILED,
+            attempts__lt=getattr(settings, 'RECEIPT_THUMBNAIL_MAX_ATTEMPTS', 3)
+        )
+    return StoredImage.objects.filter(condition)
+
+
+def claim_image(image_id, retry_failed=False):
+    """以條件式 UPDATE 領取圖片，已被其他 worker 領取或不需處理時回傳 None"""
+    claimed = claimable_images(retry_failed).filter(pk=image_id).update(
+        status=ImageStatus.PROCESSING,
+        attempts=F('attempts') + 1,
+        updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    return StoredImage.objects.get(pk=image_id)
+
+
+def process_image(image_id):
+    """處理單張圖片，已完成、處理中或不存在時略過"""
+    image = claim_image(image_id)
+    if image is not None:
+        generate_thumbnails(image)
+
+
+def _worker_loop():
+    while True:
+        image_id = _queue.get()
+        close_old_connections()
+        try:
+            process_image(image_id)
+        except Exception:
+            logger.exception('縮圖工作失敗：%s', image_id)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def enqueue_thumbnails(image_id):
+    """排入縮圖佇列，必要時啟動背景執行緒"""
+    global _worker_thread
+
+    if getattr(settings, 'RECEIPT_THUMBNAILS_SYNC', False):
+        process_image(image_id)
+        return
+
+    _queue.put(image_id)
+    if _worker_thread is not None and _worker_thread.is_alive():
+        return
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            return
+        _worker_thread = threading.Thread(target=_worker_loop, name='thumbnail-worker', daemon=True)
+        _worker_thread.start()
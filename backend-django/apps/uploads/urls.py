@@ -0,0 +1,14 @@
+"""
+圖片上傳應用路由
+"""
+
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import StoredImageViewSet
+
+router = DefaultRouter()
+router.register(r'images', StoredImageViewSet)
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,34 @@
+"""
+圖片上傳視圖
+"""
+
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
+
+from .models import StoredImage
+from .serializers import ALLOWED_FORMATS, ImageUploadSerializer, StoredImageSerializer
+from .storage import store_image
+
+
+class StoredImageViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    圖片上傳視圖集
+
+    POST 上傳圖片（multipart 欄位 file），回傳原圖網址與縮圖狀態；
+    將 url 存入支出的 images。縮圖於背景產生，可 GET 查詢狀態。
+    """
+    queryset = StoredImage.objects.all()
+    serializer_class = StoredImageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def create(self, request):
+        upload = ImageUploadSerializer(data=request.data)
+        upload.is_valid(raise_exception=True)
+        file = upload.validated_data['file']
+        extension, content_type = ALLOWED_FORMATS[file.image_format]
+
+        image, created = store_image(file, extension, content_type, user=request.user)
+        serializer = self.get_serializer(image)
+        return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.users'
-    verbose_name = '用戶管理'
\ No newline at end of file
+    verbose_name = '用戶管理'
+
+    def ready(self):
+        from . import authentication  # noqa: F401
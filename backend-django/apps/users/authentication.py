@@ -0,0 +1,194 @@
+"""
+JWT 認證用戶快取
+
+simplejwt 的 JWTAuthentication 每個 API 請求都會查詢一次 users 表。
+CachedJWTAuthentication 先查行程內的 LRU（短 TTL），再查共用快取（Redis），
+都未命中才查資料庫。快取內容為用戶欄位值（不含密碼雜湊），每次取出時
+重建新的 User 實例，請求之間不會共用同一個物件。
+
+用戶儲存或刪除時會清除共用快取與本行程的 LRU；其他行程的 LRU 最多
+保留 AUTH_USER_CACHE_LOCAL_TTL 秒，停用帳號在此時間內失效。
+
+共用快取的內容附帶查詢資料庫前取得的版本號，清除時遞增版本號；
+清除前已開始查詢的請求即使之後才寫回舊資料，也會因版本號不符而被忽略。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+USER_CACHE_PREFIX = 'auth_user'
+
+# 不放入快取的欄位
+EXCLUDED_FIELDS = {'password'}
+
+
+class LocalUserCache:
+    """行程內的 LRU 快取（執行緒安全，帶 TTL）"""
+
+    def __init__(self, max_size=1024, ttl=10):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_user_cache = LocalUserCache(
+    max_size=getattr(settings, 'AUTH_USER_CACHE_LOCAL_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_LOCAL_TTL', 10),
+)
+
+
+def _cache_key(user_id):
+    return f'{USER_CACHE_PREFIX}:{user_id}'
+
+
+def _version_key(user_id):
+    return f'{USER_CACHE_PREFIX}:{user_id}:version'
+
+
+def _initial_version():
+    # 以時間戳記初始化，版本號被逐出後也不會與舊快取內容的版本號重複
+    return int(time.time() * 1000)
+
+
+def get_user_version(user_id):
+    """目前的快取版本號"""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def _cached_field_names():
+    return [
+        field.attname for field in User._meta.concrete_fields
+        if field.attname not in EXCLUDED_FIELDS
+    ]
+
+
+def dump_user(user):
+    """將用戶轉為可快取的欄位值"""
+    return tuple(getattr(user, name) for name in _cached_field_names())
+
+
+def load_user(values):
+    """由快取的欄位值重建用戶實例（密碼欄位為延遲載入）"""
+    return User.from_db('default', _cached_field_names(), values)
+
+
+def get_cached_user(user_id):
+    """依序查詢行程內快取與共用快取，未命中或版本號不符時回傳 None"""
+    key = _cache_key(user_id)
+    values = local_user_cache.get(key)
+    if values is None:
+        entries = cache.get_many([key, _version_key(user_id)])
+        entry = entries.get(key)
+        if entry is None or entry[0] != entries.get(_version_key(user_id)):
+            return None
+        values = entry[1]
+        local_user_cache.set(key, values)
+    return load_user(values)
+
+
+def cache_user(user, version):
+    """
+    寫入共用快取，version 為查詢資料庫前取得的版本號
+
+    行程內快取由下一次通過版本號檢查的讀取填入。
+    """
+    cache.set(
+        _cache_key(user.pk),
+        (version, dump_user(user)),
+        getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+    )
+
+
+def invalidate_cached_user(user_id):
+    """遞增版本號並清除用戶快取"""
+    get_user_version(user_id)
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), _initial_version(), None)
+    key = _cache_key(user_id)
+    cache.delete(key)
+    local_user_cache.delete(key)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """以快取取得用戶的 JWT 認證"""
+
+    def get_user(self, validated_token):
+        # 快取以主鍵為索引，其他 USER_ID_FIELD 設定直接查資料庫
+        if api_settings.USER_ID_FIELD != 'id':
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            # 先取得版本號再查詢，查詢期間若被清除，寫回的舊資料不會被採用
+            version = get_user_version(user_id)
+            user = super().get_user(validated_token)
+            cache_user(user, version)
+        elif not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, raw=False, **kwargs):
+    """用戶資料變更、停用或刪除時清除快取"""
+    if raw:
+        return
+    user_id = instance.pk
+    # 提交後再清除，避免其他請求在提交前重新快取舊資料
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -0,0 +1,114 @@
+"""
+用戶群組資訊快取
+
+/me 每次頁面載入都會呼叫，管理群組與參與群組原本各需一次查詢。
+這裡以版本號快取每位用戶的群組資訊：群組成員或管理者變更時遞增版本號，
+舊版本的快取自然失效。版本號以時間戳記初始化，被逐出後也不會讓舊快取復活。用戶本身的欄位仍直接由 request.user 序列化，
+不會讀到過期的資料。
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+PROFILE_CACHE_PREFIX = 'user_profile'
+PROFILE_VERSION_PREFIX = 'user_profile_version'
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+
+def _version_key(user_id):
+    return f'{PROFILE_VERSION_PREFIX}:{user_id}'
+
+
+def _profile_key(user_id, version):
+    return f'{PROFILE_CACHE_PREFIX}:{user_id}:v{version}'
+
+
+def _group_data(group):
+    return {'id': group.id, 'name': group.name, 'description': group.description}
+
+
+def _initial_version():
+    # 以時間戳記初始化，版本號被逐出後也不會回到舊快取使用過的版本號
+    return int(time.time() * 1000)
+
+
+def get_profile_versions(user_ids):
+    """取得用戶群組資訊的版本號，不存在時以時間戳記初始化"""
+    keys = {_version_key(user_id): user_id for user_id in user_ids}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, _initial_version(), None)
+        found.update(cache.get_many(missing))
+    # 快取無法寫入時使用新的時間戳記，只會造成快取未命中
+    return {user_id: found.get(key) or _initial_version() for key, user_id in keys.items()}
+
+
+def invalidate_user_profiles(user_ids):
+    """遞增版本號，使用戶的群組資訊快取失效"""
+    for user_id in {user_id for user_id in user_ids if user_id}:
+        key = _version_key(user_id)
+        # 版本號不設過期時間，避免過期後回到舊版本號
+        cache.add(key, _initial_version(), None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def load_group_memberships(user_ids):
+    """
+    批次查詢多位用戶的群組資訊（固定兩次查詢）
+
+    回傳 {user_id: {'managed_groups': [...], 'groups': [...]}}
+    """
+    from apps.groups.models import Group, GroupMember
+
+    memberships = {
+        user_id: {'managed_groups': [], 'groups': []} for user_id in user_ids
+    }
+    if not memberships:
+        return memberships
+
+    managed = Group.managers.through.objects.filter(
+        user_id__in=memberships
+    ).select_related('group').order_by('group_id')
+    for row in managed:
+        memberships[row.user_id]['managed_groups'].append(_group_data(row.group))
+
+    members = GroupMember.objects.filter(
+        user_id__in=memberships
+    ).select_related('group').order_by('id')
+    for member in members:
+        memberships[member.user_id]['groups'].append(_group_data(member.group))
+
+    return memberships
+
+
+def get_group_memberships(user_ids):
+    """取得多位用戶的群組資訊，優先使用快取"""
+    user_ids = list(user_ids)
+    versions = get_profile_versions(user_ids)
+    keys = {_profile_key(user_id, versions[user_id]): user_id for user_id in user_ids}
+
+    cached = cache.get_many(list(keys))
+    memberships = {keys[key]: value for key, value in cached.items()}
+
+    missing = [user_id for user_id in user_ids if user_id not in memberships]
+    if missing:
+        loaded = load_group_memberships(missing)
+        cache.set_many(
+            {_profile_key(user_id, versions[user_id]): data for user_id, data in loaded.items()},
+            PROFILE_CACHE_TIMEOUT
+        )
+        memberships.update(loaded)
+
+    return memberships
+
+
+def get_user_group_memberships(user_id):
+    """取得單一用戶的群組資訊（便捷函數）"""
+    return get_group_memberships([user_id])[user_id]
@@ -4,7 +4,9 @@
 
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.db import models
 from .models import User, UserPreferences
+from .profile import get_group_memberships, get_user_group_memberships
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -19,6 +21,15 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'date_joined', 'last_login', 'created_at', 'updated_at']
 
 
+class UserDetailListSerializer(serializers.ListSerializer):
+    """用戶詳情列表序列化器：一次載入所有用戶的群組資訊"""
+    
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['group_memberships'] = get_group_memberships(u.id for u in users)
+        return super().to_representation(users)
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     """用戶詳情序列化器（包含群組信息）"""
     managed_groups = serializers.SerializerMethodField()
@@ -32,19 +43,22 @@ class UserDetailSerializer(serializers.ModelSerializer):
             'managed_groups', 'groups'
         ]
         read_only_fields = ['id', 'date_joined', 'last_login', 'created_at', 'updated_at']
+        list_serializer_class = UserDetailListSerializer
+    
+    def _get_memberships(self, obj):
+        """取得群組資訊（列表時使用批次載入結果，否則使用快取）"""
+        memberships = self.context.get('group_memberships')
+        if memberships is not None and obj.id in memberships:
+            return memberships[obj.id]
+        return get_user_group_memberships(obj.id)
     
     def get_managed_groups(self, obj):
         """獲取用戶管理的群組"""
-        from apps.groups.models import Group
-        managed_groups = Group.objects.filter(managers=obj)
-        return [{'id': g.id, 'name': g.name, 'description': g.description} for g in managed_groups]
+        return self._get_memberships(obj)['managed_groups']
     
     def get_groups(self, obj):
         """獲取用戶參與的群組"""
-        from apps.groups.models import GroupMember
-        group_members = GroupMember.objects.filter(user=obj).select_related('group')
-        return [{'id': gm.group.id, 'name': gm.group.name, 'description': gm.group.description} 
-                for gm in group_members]
+        return self._get_memberships(obj)['groups']
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -0,0 +1,69 @@
+"""
+資料庫連線管理
+
+依 DB_POOL_MODE 調整 DATABASES 設定：
+
+- direct（預設）：直接連線 Postgres。CONN_MAX_AGE 預設 0；在 ASGI 下
+  database_sync_to_async 的每個執行緒各自持有連線，長連線會隨執行緒數
+  增加而耗盡 max_connections，因此只建議在 WSGI 下調高 DB_CONN_MAX_AGE。
+- pgbouncer：透過 PgBouncer（transaction pooling）連線。停用伺服器端游標
+  （QuerySet.iterator() 的具名游標無法跨交易使用），客戶端連線可保持。
+- native：Django 5.1+ 搭配 psycopg 3 的連線池（OPTIONS['pool']），
+  同一行程的所有執行緒共用固定數量的連線。
+
+所有模式都啟用 CONN_HEALTH_CHECKS，並設定 application_name，
+讓 pg_stat_activity 可區分本服務的連線（見 apps.monitoring.health）。
+"""
+
+import django
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+
+POOL_MODES = ('direct', 'pgbouncer', 'native')
+
+DB_POOL_MODE = config('DB_POOL_MODE', default='direct')
+DB_APPLICATION_NAME = config('DB_APPLICATION_NAME', default='pangcah_accounting')
+
+
+def _native_pool_options():
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured('DB_POOL_MODE=native 需要 Django 5.1 以上')
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        raise ImproperlyConfigured('DB_POOL_MODE=native 需要安裝 psycopg[pool]')
+
+    options = {
+        'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    }
+    # 取出連線時先確認仍可用（psycopg_pool 3.2+）
+    if hasattr(ConnectionPool, 'check_connection'):
+        options['check'] = ConnectionPool.check_connection
+    return options
+
+
+def configure_database(database, mode=None):
+    """回傳套用連線模式後的資料庫設定"""
+    mode = mode or DB_POOL_MODE
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE 必須是 {', '.join(POOL_MODES)} 之一")
+
+    database = {**database, 'OPTIONS': dict(database.get('OPTIONS') or {})}
+    database['OPTIONS'].setdefault('application_name', DB_APPLICATION_NAME)
+    database['CONN_HEALTH_CHECKS'] = True
+
+    if mode == 'native':
+        # 連線池管理連線生命週期，Django 要求 CONN_MAX_AGE 為 0
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = _native_pool_options()
+    else:
+        database['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=0, cast=int)
+
+    if mode == 'pgbouncer':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+    return database
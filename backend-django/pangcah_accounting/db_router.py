@@ -0,0 +1,157 @@
+"""
+唯讀副本路由
+
+儀表板、監控與報表的彙總查詢可改由唯讀副本（settings.REPLICA_DATABASE_ALIAS）
+執行，避免與支出寫入競爭主資料庫。只有明確宣告的 ViewSet 動作會使用副本：
+
+    class DashboardAPIView(ReplicaReadMixin, viewsets.ViewSet):
+        replica_actions = {'stats', 'chart_data'}
+
+以下情況仍讀取主資料庫：
+
+- 未設定副本資料庫，或非 GET / HEAD / OPTIONS 請求
+- 副本複寫延遲超過 REPLICA_MAX_LAG_SECONDS，或無法連線
+- 用戶在 REPLICA_PIN_SECONDS 內曾寫入資料（read-your-writes），
+  由 ReplicaPinningMiddleware 於寫入請求成功後標記
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_CACHE_PREFIX = 'db:replica_pin'
+
+# 目前請求的讀取資料庫，None 表示使用預設（主資料庫）
+_read_alias = ContextVar('replica_read_alias', default=None)
+
+_lag_state = {'checked_at': 0.0, 'lag': None}
+
+
+def replica_alias():
+    """已設定的副本別名，未設定時回傳 None"""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_lag_seconds():
+    """
+    副本複寫延遲（秒），無法取得時回傳 None
+
+    結果在行程內快取 REPLICA_LAG_CHECK_INTERVAL 秒。
+    """
+    now = time.monotonic()
+    if now - _lag_state['checked_at'] < getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5):
+        return _lag_state['lag']
+
+    lag = None
+    try:
+        with connections[replica_alias()].cursor() as cursor:
+            cursor.execute("""
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+            """)
+            lag = float(cursor.fetchone()[0])
+    except Exception:
+        logger.warning('無法取得副本複寫延遲，改用主資料庫', exc_info=True)
+
+    _lag_state.update(checked_at=now, lag=lag)
+    return lag
+
+
+def _pin_key(user_id):
+    return f'{PIN_CACHE_PREFIX}:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """用戶寫入後的一段時間內改讀主資料庫"""
+    cache.set(_pin_key(user_id), 1, getattr(settings, 'REPLICA_PIN_SECONDS', 10))
+
+
+def is_pinned(user_id):
+    return cache.get(_pin_key(user_id)) is not None
+
+
+def choose_read_alias(request):
+    """決定此請求的讀取資料庫，回傳副本別名或 None（主資料庫）"""
+    alias = replica_alias()
+    if alias is None or request.method not in SAFE_METHODS:
+        return None
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and is_pinned(user.pk):
+        return None
+
+    lag = replica_lag_seconds()
+    if lag is None or lag > getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 5):
+        return None
+    return alias
+
+
+class ReplicaRouter:
+    """讀取依目前請求的設定路由；寫入與 migration 一律使用主資料庫"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本與主資料庫內容相同
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin：replica_actions 中的動作改由副本讀取
+
+    在驗證之後才決定，用戶查詢仍走主資料庫。
+    """
+
+    replica_actions = set()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if getattr(self, 'action', None) in self.replica_actions:
+            alias = choose_read_alias(request)
+            if alias:
+                self._replica_token = _read_alias.set(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_alias.reset(token)
+            self._replica_token = None
+            response['X-Read-Database'] = 'replica'
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaPinningMiddleware:
+    """寫入請求成功後，將該用戶固定讀取主資料庫一段時間"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (request.method not in SAFE_METHODS and response.status_code < 400
+                and replica_alias() is not None):
+            # DRF 驗證後會把用戶寫回 HttpRequest.user
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user.pk)
+        return response
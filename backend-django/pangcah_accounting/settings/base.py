@@ -20,6 +20,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 THIRD_PARTY_APPS = [
@@ -39,6 +40,7 @@ LOCAL_APPS = [
     'apps.dashboard',
     'apps.reports',
     'apps.monitoring',
+    'apps.uploads',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -52,6 +54,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.monitoring.middleware.ProfilingMiddleware',
+    'apps.monitoring.middleware.QueryBudgetMiddleware',
+    'pangcah_accounting.db_router.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'pangcah_accounting.urls'
@@ -87,6 +92,27 @@ DATABASES = {
     }
 }
 
+# 唯讀副本（設定 DB_REPLICA_HOST 時啟用，見 pangcah_accounting.db_router）
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+if DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# 連線模式（direct / pgbouncer / native，見 pangcah_accounting.db_pool）
+from pangcah_accounting.db_pool import configure_database
+DATABASES = {alias: configure_database(database) for alias, database in DATABASES.items()}
+
+DATABASE_ROUTERS = ['pangcah_accounting.db_router.ReplicaRouter']
+REPLICA_DATABASE_ALIAS = 'replica'
+# 延遲超過此秒數時改讀主資料庫；寫入後固定讀主資料庫的秒數應大於此值
+REPLICA_MAX_LAG_SECONDS = config('REPLICA_MAX_LAG_SECONDS', default=5, cast=int)
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=5, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -121,13 +147,40 @@ STATICFILES_DIRS = []
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 上傳圖片（內容定址儲存，見 apps.uploads.storage）
+# 設定 RECEIPT_S3_BUCKET 時改存 S3（django-storages，憑證取自 AWS_* 環境變數），
+# 否則使用 default_storage（MEDIA_ROOT）。內容不會變動，可長期快取。
+RECEIPT_STORAGE = None
+if config('RECEIPT_S3_BUCKET', default=''):
+    RECEIPT_STORAGE = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': config('RECEIPT_S3_BUCKET'),
+            'region_name': config('RECEIPT_S3_REGION', default=None),
+            'custom_domain': config('RECEIPT_S3_CUSTOM_DOMAIN', default=None),
+            'file_overwrite': False,
+            'querystring_auth': False,
+            'object_parameters': {'CacheControl': 'public, max-age=31536000, immutable'},
+        },
+    }
+RECEIPT_STORAGE_PREFIX = config('RECEIPT_STORAGE_PREFIX', default='receipts')
+RECEIPT_MAX_UPLOAD_BYTES = config('RECEIPT_MAX_UPLOAD_BYTES', default=10 * 1024 * 1024, cast=int)
+RECEIPT_THUMBNAIL_SIZES = config('RECEIPT_THUMBNAIL_SIZES', default='160,480,960',
+                                 cast=lambda value: tuple(int(size) for size in value.split(',')))
+RECEIPT_THUMBNAIL_QUALITY = config('RECEIPT_THUMBNAIL_QUALITY', default=80, cast=int)
+# 失敗圖片最多重試次數；處理中超過此秒數視為 worker 已中斷，可重新領取
+RECEIPT_THUMBNAIL_MAX_ATTEMPTS = config('RECEIPT_THUMBNAIL_MAX_ATTEMPTS', default=3, cast=int)
+RECEIPT_THUMBNAIL_CLAIM_TIMEOUT = config('RECEIPT_THUMBNAIL_CLAIM_TIMEOUT', default=600, cast=int)
+# 於請求中同步產生縮圖（開發與測試用）
+RECEIPT_THUMBNAILS_SYNC = config('RECEIPT_THUMBNAILS_SYNC', default=False, cast=bool)
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -149,6 +202,11 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
 }
 
+# JWT 認證用戶快取（行程內 LRU + 共用快取）
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+AUTH_USER_CACHE_LOCAL_TTL = config('AUTH_USER_CACHE_LOCAL_TTL', default=10, cast=int)
+AUTH_USER_CACHE_LOCAL_SIZE = config('AUTH_USER_CACHE_LOCAL_SIZE', default=1024, cast=int)
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Pangcah Accounting API',
@@ -184,12 +242,15 @@ LOGGING = {
     },
 }
 
+# Redis（channel layer 與 WebSocket 在線狀態共用同一個位址）
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+
 # Channels 設定
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [config('REDIS_URL', default='redis://localhost:6379/0')],
+            "hosts": [REDIS_URL],
         },
     },
 }
@@ -198,6 +259,24 @@ CHANNEL_LAYERS = {
 WEBSOCKET_ENABLED = config('WEBSOCKET_ENABLED', default=True, cast=bool)
 WEBSOCKET_HEARTBEAT_INTERVAL = config('WEBSOCKET_HEARTBEAT_INTERVAL', default=30, cast=int)
 
+# 系統指標取樣設定
+SYSTEM_METRICS_SAMPLE_INTERVAL = config('SYSTEM_METRICS_SAMPLE_INTERVAL', default=30, cast=int)
+SYSTEM_METRICS_BATCH_SIZE = config('SYSTEM_METRICS_BATCH_SIZE', default=5, cast=int)
+
+# API 查詢統計設定
+API_METRICS_BATCH_SIZE = config('API_METRICS_BATCH_SIZE', default=20, cast=int)
+QUERY_N_PLUS_ONE_THRESHOLD = config('QUERY_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+QUERY_BUDGET_STRICT = config('QUERY_BUDGET_STRICT', default=False, cast=bool)
+QUERY_SLOW_SHAPE_MS = config('QUERY_SLOW_SHAPE_MS', default=50, cast=int)
+
+# 按月分區設定（manage_partitions 指令）
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+PARTITION_RETENTION_MONTHS = {
+    'api_metrics': config('API_METRICS_RETENTION_MONTHS', default=6, cast=int),
+    'user_activities': config('USER_ACTIVITIES_RETENTION_MONTHS', default=12, cast=int),
+    'system_metrics': config('SYSTEM_METRICS_RETENTION_MONTHS', default=3, cast=int),
+}
+
 # 即時推送設定
 REALTIME_NOTIFICATIONS = {
     'EXPENSE_UPDATES': True,
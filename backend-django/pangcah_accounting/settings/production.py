@@ -25,7 +25,7 @@ import os
 database_url = os.environ.get('DATABASE_URL')
 if database_url:
     DATABASES = {
-        'default': dj_database_url.parse(database_url, conn_max_age=600)
+        'default': dj_database_url.parse(database_url)
     }
 else:
     # Try individual PG variables
@@ -44,6 +44,15 @@ else:
         # Fallback - should never reach here in production
         raise Exception("No database configuration found! Please set DATABASE_URL or PG* environment variables.")
 
+# 唯讀副本（見 pangcah_accounting.db_router）
+database_replica_url = os.environ.get('DATABASE_REPLICA_URL')
+if database_replica_url:
+    DATABASES['replica'] = dj_database_url.parse(database_replica_url)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# 連線模式與 CONN_MAX_AGE 由 DB_POOL_MODE / DB_CONN_MAX_AGE 決定
+DATABASES = {alias: configure_database(database) for alias, database in DATABASES.items()}
+
 # CORS settings for production
 CORS_ALLOWED_ORIGINS = [
     "https://pangcah-accounting.vercel.app",  # Your Vercel domain
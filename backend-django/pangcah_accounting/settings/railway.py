@@ -31,6 +31,15 @@ if DATABASE_URL:
 else:
     raise Exception("DATABASE_URL environment variable not found!")
 
+# 唯讀副本（見 pangcah_accounting.db_router）
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(DATABASE_REPLICA_URL)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# 連線模式（見 pangcah_accounting.db_pool）
+DATABASES = {alias: configure_database(database) for alias, database in DATABASES.items()}
+
 # Static files
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
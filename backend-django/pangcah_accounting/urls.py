@@ -25,6 +25,7 @@ def api_root(request):
             'dashboard': '/api/v1/dashboard/',
             'reports': '/api/v1/reports/',
             'monitoring': '/api/v1/monitoring/',
+            'uploads': '/api/v1/uploads/',
         }
     })
 
@@ -49,6 +50,7 @@ urlpatterns = [
     path('api/v1/dashboard/', include('apps.dashboard.urls')),
     path('api/v1/reports/', include('apps.reports.urls')),
     path('api/v1/monitoring/', include('apps.monitoring.urls')),
+    path('api/v1/uploads/', include('apps.uploads.urls')),
 ]
 
 # Serve media files in development
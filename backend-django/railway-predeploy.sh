@@ -5,6 +5,12 @@ echo "🚀 執行Railway預部署命令..."
 echo "Running database migrations..."
 python manage.py migrate --settings=pangcah_accounting.settings.railway
 
+echo "Backfilling goal milestones..."
+python manage.py backfill_goal_milestones --settings=pangcah_accounting.settings.railway
+
+echo "Ensuring monthly partitions..."
+python manage.py manage_partitions --settings=pangcah_accounting.settings.railway
+
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --settings=pangcah_accounting.settings.railway
 
@@ -0,0 +1,192 @@
+"""初始資料表結構
+
+對應原本啟動時 Base.metadata.create_all 建立的資料表。
+已由 create_all 建立資料表的資料庫請執行 `alembic stamp 0001_initial_schema`
+後再 `alembic upgrade head`。
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ENUMS = {
+    "userrole": ("ADMIN", "FINANCE_MANAGER", "USER"),
+    "categorytype": ("EXPENSE", "INCOME"),
+    "eventstatus": ("ACTIVE", "COMPLETED", "CANCELLED"),
+    "expensetype": ("EXPENSE", "INCOME"),
+    "expensestatus": ("PENDING", "APPROVED", "REJECTED"),
+    "paymentstatus": ("UNPAID", "PAID", "PARTIAL"),
+    "splittype": ("EQUAL", "PERCENTAGE", "FIXED"),
+}
+
+
+def _enum(name):
+    return postgresql.ENUM(*ENUMS[name], name=name, create_type=False)
+
+
+def _uuid(**kwargs):
+    return sa.Column(postgresql.UUID(as_uuid=True), **kwargs)
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment="創建時間"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment="更新時間"),
+    ]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for name, values in ENUMS.items():
+        postgresql.ENUM(*values, name=name).create(bind, checkfirst=True)
+
+    op.create_table(
+        "users",
+        _uuid(name="id", primary_key=True, comment="用戶唯一識別符"),
+        sa.Column("name", sa.String(100), nullable=False, comment="用戶姓名"),
+        sa.Column("email", sa.String(255), nullable=False, unique=True, comment="用戶電子郵件"),
+        sa.Column("password", sa.String(255), nullable=False, comment="加密後的密碼"),
+        sa.Column("role", _enum("userrole"), nullable=False, comment="用戶角色"),
+        sa.Column("image", sa.String(500), nullable=True, comment="用戶頭像 URL"),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "categories",
+        _uuid(name="id", primary_key=True, comment="分類唯一識別符"),
+        sa.Column("name", sa.String(100), nullable=False, comment="分類名稱"),
+        sa.Column("type", _enum("categorytype"), nullable=False, comment="分類類型：收入或支出"),
+        sa.Column("is_default", sa.Boolean(), nullable=False, comment="是否為預設分類"),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "events",
+        _uuid(name="id", primary_key=True, comment="活動唯一識別符"),
+        sa.Column("name", sa.String(200), nullable=False, comment="活動名稱"),
+        sa.Column("description", sa.Text(), nullable=True, comment="活動描述"),
+        sa.Column("start_date", sa.DateTime(timezone=True), nullable=False, comment="活動開始時間"),
+        sa.Column("end_date", sa.DateTime(timezone=True), nullable=False, comment="活動結束時間"),
+        sa.Column("status", _enum("eventstatus"), nullable=False, comment="活動狀態"),
+        sa.Column("enabled", sa.Boolean(), nullable=False, comment="是否啟用"),
+        *_timestamps(),
+    )
+
+    op.create_table(
+        "edms",
+        _uuid(name="id", primary_key=True, comment="EDM 唯一識別符"),
+        _uuid(name="event_id", nullable=False, unique=True, comment="關聯的活動 ID"),
+        sa.Column("title", sa.String(200), nullable=False, comment="EDM 標題"),
+        sa.Column("content", sa.Text(), nullable=False, comment="EDM 內容"),
+        sa.Column("images", postgresql.ARRAY(sa.String()), nullable=True, comment="EDM 圖片 URL 列表"),
+        sa.Column("contact_info", sa.String(500), nullable=True, comment="聯絡資訊"),
+        sa.Column("registration_link", sa.String(500), nullable=True, comment="報名連結"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"], ondelete="CASCADE"),
+    )
+
+    op.create_table(
+        "groups",
+        _uuid(name="id", primary_key=True, comment="群組唯一識別符"),
+        sa.Column("name", sa.String(100), nullable=False, comment="群組名稱"),
+        sa.Column("description", sa.Text(), nullable=True, comment="群組描述"),
+        _uuid(name="created_by_id", nullable=False, comment="創建者用戶 ID"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+    )
+
+    op.create_table(
+        "group_members",
+        _uuid(name="id", primary_key=True, comment="群組成員唯一識別符"),
+        _uuid(name="group_id", nullable=False, comment="群組 ID"),
+        sa.Column("name", sa.String(100), nullable=False, comment="成員姓名"),
+        _uuid(name="user_id", nullable=True, comment="關聯的系統用戶 ID（可選）"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+    )
+
+    op.create_table(
+        "expenses",
+        _uuid(name="id", primary_key=True, comment="支出記錄唯一識別符"),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False, comment="金額"),
+        sa.Column("type", _enum("expensetype"), nullable=False, comment="類型：支出或收入"),
+        sa.Column("date", sa.DateTime(timezone=True), nullable=False, comment="發生日期"),
+        sa.Column("description", sa.Text(), nullable=True, comment="描述"),
+        sa.Column("images", postgresql.ARRAY(sa.String()), nullable=True, comment="相關圖片 URL 列表"),
+        _uuid(name="category_id", nullable=False, comment="分類 ID"),
+        _uuid(name="user_id", nullable=False, comment="記錄者用戶 ID"),
+        _uuid(name="event_id", nullable=True, comment="關聯活動 ID"),
+        _uuid(name="group_id", nullable=True, comment="關聯群組 ID"),
+        sa.Column("status", _enum("expensestatus"), nullable=False, comment="審批狀態"),
+        sa.Column("payment_status", _enum("paymentstatus"), nullable=False, comment="付款狀態"),
+        sa.Column("paid_at", sa.DateTime(timezone=True), nullable=True, comment="付款時間"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"]),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+    )
+
+    op.create_table(
+        "expense_payments",
+        _uuid(name="id", primary_key=True, comment="付款記錄唯一識別符"),
+        _uuid(name="expense_id", nullable=False, comment="支出記錄 ID"),
+        _uuid(name="payer_id", nullable=False, comment="付款人 ID"),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=False, comment="付款金額"),
+        sa.Column("payment_date", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False, comment="付款日期"),
+        sa.Column("payment_method", sa.String(50), nullable=True, comment="付款方式"),
+        sa.Column("note", sa.Text(), nullable=True, comment="備註"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["expense_id"], ["expenses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["payer_id"], ["users.id"]),
+    )
+
+    op.create_table(
+        "expense_member_splits",
+        _uuid(name="id", primary_key=True, comment="分帳記錄唯一識別符"),
+        _uuid(name="expense_id", nullable=False, comment="支出記錄 ID"),
+        _uuid(name="group_id", nullable=False, comment="群組 ID"),
+        _uuid(name="member_id", nullable=False, comment="群組成員 ID"),
+        sa.Column("is_included", sa.Boolean(), nullable=False, comment="是否納入分帳計算"),
+        sa.Column("split_type", _enum("splittype"), nullable=False, comment="分帳類型"),
+        sa.Column("split_value", sa.Numeric(10, 2), nullable=True, comment="分帳值（比例時為百分比，固定金額時為金額）"),
+        sa.Column("calculated_amount", sa.Numeric(10, 2), nullable=True, comment="計算後的分攤金額"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["expense_id"], ["expenses.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+        sa.ForeignKeyConstraint(["member_id"], ["group_members.id"]),
+    )
+
+    op.create_table(
+        "event_groups",
+        _uuid(name="id", primary_key=True, comment="活動群組參與記錄唯一識別符"),
+        _uuid(name="event_id", nullable=False, comment="活動 ID"),
+        _uuid(name="group_id", nullable=False, comment="群組 ID"),
+        sa.Column("member_count", sa.Integer(), nullable=False, comment="實際參與人數"),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(["event_id"], ["events.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["group_id"], ["groups.id"]),
+    )
+
+
+def downgrade() -> None:
+    for table in (
+        "event_groups", "expense_member_splits", "expense_payments", "expenses",
+        "group_members", "groups", "edms", "events", "categories", "users",
+    ):
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    for name in ENUMS:
+        postgresql.ENUM(name=name).drop(bind, checkfirst=True)
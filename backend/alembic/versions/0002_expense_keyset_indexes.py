@@ -0,0 +1,33 @@
+"""支出列表 keyset 分頁索引
+
+Revision ID: 0002_expense_keyset_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002_expense_keyset_indexes"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY 不能在交易中執行，避免建立索引期間鎖住 expenses 寫入
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_expenses_date_id", "expenses", ["date", "id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            "ix_expenses_user_id_date_id", "expenses", ["user_id", "date", "id"],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_expenses_user_id_date_id", "expenses", postgresql_concurrently=True, if_exists=True)
+        op.drop_index("ix_expenses_date_id", "expenses", postgresql_concurrently=True, if_exists=True)
@@ -8,6 +8,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import cache
 from app.core.database import get_db
 from app.models.category import Category, CategoryType
 
@@ -27,19 +28,10 @@ async def get_categories(
         db: 資料庫會話
         
     Returns:
-        List[dict]: 分類列表
+        List[dict]: 依名稱排序的分類列表
     """
-    # TODO: 實作分類列表獲取邏輯
-    # 1. 從資料庫獲取所有分類
-    # 2. 按名稱排序
-    # 3. 返回分類列表
-    
-    return [
-        {
-            "message": "Get categories endpoint - TODO: implement",
-            "status": "placeholder"
-        }
-    ]
+    # 分類很少變動，由啟動時預熱的快取提供
+    return await cache.get_categories(db)
 
 
 @router.post("/", response_model=dict)
@@ -5,61 +5,185 @@
 在新架構中重命名為 expenses 以更清楚表達業務含義
 """
 
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
 from typing import List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.core.database import get_db
-from app.models.expense import Expense, ExpenseStatus, PaymentStatus
+from app.core.security import get_current_user, is_privileged
+from app.models.category import Category
+from app.models.event import Event, EventStatus
+from app.models.expense import Expense, ExpenseStatus, ExpenseType, PaymentStatus
+from app.models.user import User
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 100
+
+
+class ExpenseCreate(BaseModel):
+    """
+    創建支出記錄的請求資料
+    """
+    amount: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2, description="金額")
+    type: ExpenseType = Field(ExpenseType.EXPENSE, description="類型：支出或收入")
+    date: datetime = Field(..., description="發生日期")
+    description: Optional[str] = Field(None, description="描述")
+    images: List[str] = Field(default_factory=list, description="相關圖片 URL 列表")
+    category_id: uuid.UUID = Field(..., description="分類 ID")
+    event_id: Optional[uuid.UUID] = Field(None, description="關聯活動 ID，未指定時關聯到進行中的活動")
+    group_id: Optional[uuid.UUID] = Field(None, description="關聯群組 ID")
+
+
+def _with_related(statement):
+    """
+    預先載入 category/user/event
+    
+    非同步 session 無法延遲載入關聯，以 selectinload 各用一次 IN 查詢取得
+    """
+    return statement.options(
+        selectinload(Expense.category),
+        selectinload(Expense.user),
+        selectinload(Expense.event),
+    )
+
+
+def _serialize(expense: Expense) -> dict:
+    """
+    支出記錄與關聯資料
+    """
+    data = expense.to_dict()
+    data["category"] = {
+        "id": str(expense.category.id),
+        "name": expense.category.name,
+        "type": expense.category.type.value,
+    }
+    data["user"] = {"id": str(expense.user.id), "name": expense.user.name}
+    data["event"] = (
+        {"id": str(expense.event.id), "name": expense.event.name}
+        if expense.event else None
+    )
+    return data
+
+
+def encode_cursor(expense: Expense) -> str:
+    """
+    以最後一筆的 (date, id) 作為下一頁的游標
+    """
+    raw = json.dumps([expense.date.isoformat(), str(expense.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    """
+    解析游標
+    
+    Raises:
+        HTTPException: 游標格式錯誤時拋出 400 錯誤
+    """
+    try:
+        date_value, id_value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(date_value), uuid.UUID(id_value)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="無效的分頁游標"
+        )
+
 
-@router.get("/", response_model=List[dict])
+@router.get("/", response_model=dict)
 async def get_expenses(
-    user_id: Optional[str] = Query(None, description="篩選特定用戶的支出記錄"),
-    sort_by: Optional[str] = Query("created_at", description="排序欄位"),
-    order: Optional[str] = Query("desc", description="排序順序"),
-    db: AsyncSession = Depends(get_db)
+    user_id: Optional[uuid.UUID] = Query(None, description="篩選特定用戶的支出記錄（ADMIN/FINANCE_MANAGER）"),
+    event_id: Optional[uuid.UUID] = Query(None, description="篩選活動"),
+    category_id: Optional[uuid.UUID] = Query(None, description="篩選分類"),
+    type: Optional[ExpenseType] = Query(None, description="篩選類型"),
+    start_date: Optional[datetime] = Query(None, description="起始日期（含）"),
+    end_date: Optional[datetime] = Query(None, description="結束日期（不含）"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="依日期排序順序"),
+    cursor: Optional[str] = Query(None, description="上一頁回傳的 next_cursor"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE, description="每頁筆數"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
     """
     獲取支出記錄列表
     
     對應 legacy-project/src/app/api/transactions/route.ts 的 GET 方法
     
+    以 (date, id) 做 keyset 分頁：每頁只需依索引往後讀 limit 筆，
+    不論翻到第幾頁成本都相同，適合行動端無限捲動。
+    
     Args:
         user_id: 可選的用戶 ID 篩選
-        sort_by: 排序欄位
+        event_id: 可選的活動 ID 篩選
+        category_id: 可選的分類 ID 篩選
+        type: 可選的類型篩選
+        start_date: 起始日期
+        end_date: 結束日期
         order: 排序順序
+        cursor: 分頁游標
+        limit: 每頁筆數
         db: 資料庫會話
+        current_user: 目前用戶
         
     Returns:
-        List[dict]: 支出記錄列表
+        dict: {"results": 支出記錄列表, "next_cursor": 下一頁游標或 None}
     """
-    # TODO: 實作支出記錄列表獲取邏輯
-    # 1. 檢查當前用戶權限
-    #    - ADMIN/FINANCE 可查看所有記錄
-    #    - 普通用戶僅查看自己的記錄
-    # 2. 應用查詢參數篩選
-    # 3. 包含關聯數據 (category, user, event)
-    # 4. 返回支出記錄列表
+    statement = _with_related(select(Expense))
     
-    return [
-        {
-            "message": "Get expenses endpoint - TODO: implement",
-            "status": "placeholder",
-            "filters": {
-                "user_id": user_id,
-                "sort_by": sort_by,
-                "order": order
-            }
-        }
-    ]
+    # ADMIN/FINANCE_MANAGER 可查看所有記錄，普通用戶僅查看自己的記錄
+    if not is_privileged(current_user):
+        statement = statement.where(Expense.user_id == current_user.id)
+    elif user_id:
+        statement = statement.where(Expense.user_id == user_id)
+    
+    if event_id:
+        statement = statement.where(Expense.event_id == event_id)
+    if category_id:
+        statement = statement.where(Expense.category_id == category_id)
+    if type:
+        statement = statement.where(Expense.type == type)
+    if start_date:
+        statement = statement.where(Expense.date >= start_date)
+    if end_date:
+        statement = statement.where(Expense.date < end_date)
+    
+    key = tuple_(Expense.date, Expense.id)
+    if cursor:
+        position = tuple_(*decode_cursor(cursor))
+        statement = statement.where(key < position if order == "desc" else key > position)
+    
+    if order == "desc":
+        statement = statement.order_by(Expense.date.desc(), Expense.id.desc())
+    else:
+        statement = statement.order_by(Expense.date.asc(), Expense.id.asc())
+    
+    # 多取一筆判斷是否還有下一頁
+    expenses = (await db.scalars(statement.limit(limit + 1))).all()
+    has_more = len(expenses) > limit
+    expenses = expenses[:limit]
+    
+    return {
+        "results": [_serialize(expense) for expense in expenses],
+        "next_cursor": encode_cursor(expenses[-1]) if has_more else None,
+    }
 
 
-@router.post("/", response_model=dict)
+@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 async def create_expense(
-    db: AsyncSession = Depends(get_db)
+    payload: ExpenseCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
     """
     創建新支出記錄
@@ -67,32 +191,63 @@ async def create_expense(
     對應 legacy-project/src/app/api/transactions/route.ts 的 POST 方法
     
     Args:
+        payload: 支出記錄資料
         db: 資料庫會話
+        current_user: 目前用戶
         
     Returns:
         dict: 創建的支出記錄資訊
         
     Raises:
-        HTTPException: 創建失敗時拋出錯誤
+        HTTPException: 分類或活動不存在時拋出 400 錯誤
     """
-    # TODO: 實作支出記錄創建邏輯
-    # 1. 驗證輸入資料（amount, category_id, date 必填）
-    # 2. 自動關聯到第一個活躍活動（如果有）
-    # 3. 設定初始狀態為 PENDING
-    # 4. 支援圖片上傳
-    # 5. 創建支出記錄
-    # 6. 返回創建的記錄資訊
+    if await db.get(Category, payload.category_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="分類不存在"
+        )
     
-    return {
-        "message": "Create expense endpoint - TODO: implement",
-        "status": "placeholder"
-    }
+    event_id = payload.event_id
+    if event_id is not None:
+        if await db.get(Event, event_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="活動不存在"
+            )
+    else:
+        # 自動關聯到第一個進行中的活動（如果有）
+        event_id = await db.scalar(
+            select(Event.id)
+            .where(Event.status == EventStatus.ACTIVE, Event.enabled.is_(True))
+            .order_by(Event.start_date.desc())
+            .limit(1)
+        )
+    
+    expense = Expense(
+        amount=payload.amount,
+        type=payload.type,
+        date=payload.date,
+        description=payload.description,
+        images=payload.images,
+        category_id=payload.category_id,
+        user_id=current_user.id,
+        event_id=event_id,
+        group_id=payload.group_id,
+        status=ExpenseStatus.PENDING,
+        payment_status=PaymentStatus.UNPAID,
+    )
+    db.add(expense)
+    await db.commit()
+    
+    expense = await db.scalar(_with_related(select(Expense)).where(Expense.id == expense.id))
+    return _serialize(expense)
 
 
 @router.get("/{expense_id}", response_model=dict)
 async def get_expense(
-    expense_id: str,
-    db: AsyncSession = Depends(get_db)
+    expense_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
     """
     獲取特定支出記錄資訊
@@ -100,6 +255,7 @@ async def get_expense(
     Args:
         expense_id: 支出記錄 ID
         db: 資料庫會話
+        current_user: 目前用戶
         
     Returns:
         dict: 支出記錄資訊
@@ -107,16 +263,21 @@ async def get_expense(
     Raises:
         HTTPException: 支出記錄不存在或權限不足時拋出錯誤
     """
-    # TODO: 實作單支出記錄獲取邏輯
-    # 1. 檢查支出記錄是否存在
-    # 2. 檢查用戶權限（記錄創建者或 ADMIN 可查看）
-    # 3. 包含關聯數據
-    # 4. 返回支出記錄資訊
+    expense = await db.scalar(_with_related(select(Expense)).where(Expense.id == expense_id))
+    if expense is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="支出記錄不存在"
+        )
     
-    return {
-        "message": f"Get expense {expense_id} endpoint - TODO: implement",
-        "status": "placeholder"
-    }
+    # 記錄創建者或 ADMIN/FINANCE_MANAGER 可查看
+    if expense.user_id != current_user.id and not is_privileged(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="權限不足"
+        )
+    
+    return _serialize(expense)
 
 
 @router.put("/{expense_id}", response_model=dict)
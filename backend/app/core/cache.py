@@ -0,0 +1,68 @@
+"""
+靜態資料快取
+
+分類等很少變動的資料在行程內快取，應用程序啟動時預先載入，
+避免每個請求都查詢資料庫；資料異動後呼叫 invalidate_categories()。
+"""
+
+import asyncio
+import time
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.category import Category
+
+settings = get_settings()
+
+_categories: Optional[List[dict]] = None
+_categories_loaded_at = 0.0
+_categories_lock = asyncio.Lock()
+
+
+async def load_categories(db: AsyncSession) -> List[dict]:
+    """
+    從資料庫載入分類並更新快取
+
+    Args:
+        db: 資料庫會話
+
+    Returns:
+        List[dict]: 依名稱排序的分類列表
+    """
+    global _categories, _categories_loaded_at
+
+    result = await db.scalars(select(Category).order_by(Category.name))
+    _categories = [category.to_dict() for category in result]
+    _categories_loaded_at = time.monotonic()
+    return _categories
+
+
+async def get_categories(db: AsyncSession) -> List[dict]:
+    """
+    取得分類列表，快取過期（CACHE_TTL_SECONDS）或尚未載入時重新查詢
+
+    Args:
+        db: 資料庫會話
+
+    Returns:
+        List[dict]: 分類列表
+    """
+    if _categories is not None and time.monotonic() - _categories_loaded_at < settings.CACHE_TTL_SECONDS:
+        return _categories
+
+    async with _categories_lock:
+        # 等待鎖期間可能已由其他請求載入
+        if _categories is not None and time.monotonic() - _categories_loaded_at < settings.CACHE_TTL_SECONDS:
+            return _categories
+        return await load_categories(db)
+
+
+def invalidate_categories() -> None:
+    """
+    清除分類快取
+    """
+    global _categories
+    _categories = None
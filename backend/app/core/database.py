@@ -5,7 +5,9 @@
 使用 PostgreSQL 替代 MongoDB
 """
 
-from sqlalchemy import create_engine
+import asyncio
+
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -14,11 +16,16 @@ from app.core.config import get_settings
 
 settings = get_settings()
 
-# 創建異步資料庫引擎
+# 創建異步資料庫引擎（連線池大小依設定，取用前先檢查連線是否仍可用）
 engine = create_async_engine(
     settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True
 )
 
 # 創建異步會話工廠
@@ -48,18 +55,22 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-async def create_tables():
+async def warm_up_pool() -> int:
     """
-    創建所有資料庫表格
-    
-    在應用程序啟動時調用
+    預先建立連線池的常駐連線
+
+    應用程序啟動時調用，讓第一批請求不需等待建立連線
+
+    Returns:
+        int: 成功建立的連線數
     """
-    async with engine.begin() as conn:
-        # 導入所有模型以確保它們被註冊
-        from app.models import (
-            User, Category, Event, EDM, Expense, ExpensePayment,
-            Group, GroupMember, ExpenseMemberSplit, EventGroup
-        )
-        
-        # 創建所有表格
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    async def open_connection():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # 同時持有連線，才會建立 DB_POOL_SIZE 條而非重複使用同一條
+    results = await asyncio.gather(
+        *(open_connection() for _ in range(settings.DB_POOL_SIZE)),
+        return_exceptions=True
+    )
+    return sum(1 for result in results if not isinstance(result, Exception))
@@ -0,0 +1,58 @@
+"""
+身份驗證依賴
+
+解析 Authorization: Bearer <JWT>，以 sub 取得目前用戶
+"""
+
+import uuid
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import get_db
+from app.models.user import User, UserRole
+
+settings = get_settings()
+bearer_scheme = HTTPBearer()
+
+# 可查看所有記錄的角色
+PRIVILEGED_ROLES = {UserRole.ADMIN, UserRole.FINANCE_MANAGER}
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    取得目前登入的用戶
+    
+    Raises:
+        HTTPException: token 無效或用戶不存在時拋出 401 錯誤
+    """
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="無效的身份驗證憑證",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+        user_id = uuid.UUID(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        raise unauthorized
+
+    user = await db.get(User, user_id)
+    if user is None:
+        raise unauthorized
+    return user
+
+
+def is_privileged(user: User) -> bool:
+    """ADMIN 與 FINANCE_MANAGER 可查看所有用戶的記錄"""
+    return user.role in PRIVILEGED_ROLES
@@ -5,13 +5,19 @@
 使用分層架構：Controller → Service → Repository
 """
 
+import logging
+import time
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.v1 import api_router
 from app.core.config import get_settings
-from app.core.database import create_tables
+from app.core.cache import load_categories
+from app.core.database import AsyncSessionLocal, warm_up_pool
+
+logger = logging.getLogger(__name__)
 
 # 獲取設定
 settings = get_settings()
@@ -39,9 +45,23 @@ app.add_middleware(
 async def startup_event():
     """
     應用程序啟動時執行的初始化操作
+
+    資料表結構由 Alembic 遷移管理（部署時執行 `alembic upgrade head`），
+    這裡只預熱連線池與靜態資料快取；資料庫暫時無法連線時不阻擋啟動。
     """
-    # 創建資料庫表格
-    await create_tables()
+    started = time.perf_counter()
+    try:
+        connections = await warm_up_pool()
+        async with AsyncSessionLocal() as session:
+            categories = await load_categories(session)
+    except Exception:
+        logger.warning("啟動預熱失敗，將於首次請求時再連線", exc_info=True)
+        return
+
+    logger.info(
+        "啟動預熱完成：%d 條連線、%d 個分類，耗時 %.0f ms",
+        connections, len(categories), (time.perf_counter() - started) * 1000
+    )
 
 
 @app.get("/")
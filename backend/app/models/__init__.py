@@ -1,54 +1,54 @@
 """
-x!!D
+資料模型模組
 
-@	!ceo
+匯出所有 SQLAlchemy 模型，確保建立資料表時所有模型都已註冊
 """
 
-# e^
+# 資料庫基類
 from app.core.database import Base
 
-# e@	! - ́M
+# 匯入所有模型 - 依關聯相依順序
 from app.models.user import User, UserRole
 from app.models.category import Category, CategoryType
 from app.models.event import Event, EventStatus, EDM
 from app.models.expense import Expense, ExpenseType, ExpenseStatus, PaymentStatus, ExpensePayment
 from app.models.group import (
-    Group, 
-    GroupMember, 
-    ExpenseMemberSplit, 
-    EventGroup, 
+    Group,
+    GroupMember,
+    ExpenseMemberSplit,
+    EventGroup,
     SplitType
 )
 
-# @	!
+# 匯出所有模型
 __all__ = [
-    # ^
+    # 基類
     "Base",
-    
-    # (6
+
+    # 用戶相關
     "User",
     "UserRole",
-    
-    # ^
-    "Category", 
+
+    # 分類相關
+    "Category",
     "CategoryType",
-    
-    # ;
+
+    # 活動相關
     "Event",
-    "EventStatus", 
+    "EventStatus",
     "EDM",
-    
-    # /
+
+    # 支出相關
     "Expense",
     "ExpenseType",
-    "ExpenseStatus", 
+    "ExpenseStatus",
     "PaymentStatus",
     "ExpensePayment",
-    
-    # D
+
+    # 群組相關
     "Group",
     "GroupMember",
     "ExpenseMemberSplit",
     "EventGroup",
     "SplitType",
-]
\ No newline at end of file
+]
@@ -10,7 +10,7 @@ from decimal import Decimal
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import Column, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Boolean, Text, Numeric, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -53,6 +53,11 @@ class Expense(Base):
     重命名為 Expense 以更符合家族記帳的業務語意
     """
     __tablename__ = "expenses"
+    __table_args__ = (
+        # 列表 API 的 keyset 分頁：依 (date, id) 排序，普通用戶另加 user_id 篩選
+        Index("ix_expenses_date_id", "date", "id"),
+        Index("ix_expenses_user_id_date_id", "user_id", "date", "id"),
+    )
     
     # 主鍵
     id = Column(
@@ -0,0 +1,160 @@
+"""
+支出列表吞吐量基準測試
+
+比較 FastAPI（async SQLAlchemy、keyset 分頁）與 Django ExpenseViewSet
+（頁碼分頁）在相同資料規模下的表現。兩個後端使用各自的資料庫，
+請先以相同參數執行：
+
+    # FastAPI
+    python -m benchmarks.seed_expenses --expenses 100000
+    # Django
+    python manage.py generate_benchmark_data --expenses 100000
+
+再以各自的 ADMIN token 執行：
+
+    python -m benchmarks.expense_throughput \\
+        --fastapi-url http://localhost:8000 --fastapi-token <token> \\
+        --django-url http://localhost:8001 --django-token <token> \\
+        --concurrency 20 --requests 500 --pages 10
+
+情境：
+- first_page：反覆取得第一頁
+- walk：每個請求序列從第一頁依序翻 --pages 頁（FastAPI 依 next_cursor、
+  Django 依 next），觀察深分頁時 OFFSET 與 keyset 的差異
+
+Django 使用 PageNumberPagination 的固定 PAGE_SIZE（20），比較時請保持
+--page-size 為 20。
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+BACKENDS = {
+    "fastapi": {"path": "/api/v1/expenses/", "next": lambda body: body.get("next_cursor")},
+    "django": {"path": "/api/v1/expenses/", "next": lambda body: body.get("next")},
+}
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def _next_request(backend, base_url, body, page_size):
+    """回傳下一頁的 (url, params)，沒有下一頁時回傳 None"""
+    next_value = BACKENDS[backend]["next"](body)
+    if not next_value:
+        return None
+    if backend == "fastapi":
+        return base_url + BACKENDS[backend]["path"], {"limit": page_size, "cursor": next_value}
+    # DRF 回傳完整的下一頁網址
+    return next_value, None
+
+
+async def _run_sequence(client, backend, base_url, page_size, pages, latencies, errors):
+    url = base_url + BACKENDS[backend]["path"]
+    params = {"limit": page_size} if backend == "fastapi" else None
+    for _ in range(pages):
+        started = time.perf_counter()
+        try:
+            response = await client.get(url, params=params)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            return
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+            return
+        following = _next_request(backend, base_url, response.json(), page_size)
+        if following is None:
+            return
+        url, params = following
+
+
+async def run_scenario(backend, base_url, token, scenario, concurrency, requests, pages, page_size):
+    """執行單一情境並回傳統計結果"""
+    latencies, errors = [], []
+    sequence_pages = pages if scenario == "walk" else 1
+    sequences = max(1, requests // sequence_pages)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=30
+    ) as client:
+        async def worker():
+            async with semaphore:
+                await _run_sequence(client, backend, base_url, page_size, sequence_pages, latencies, errors)
+
+        # 暖機，避免把建立連線的成本算進結果
+        await _run_sequence(client, backend, base_url, page_size, 1, [], [])
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(sequences)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "backend": backend,
+        "scenario": scenario,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "elapsed_seconds": round(elapsed, 2),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else None,
+    }
+
+
+async def main(options):
+    targets = []
+    if options.fastapi_url:
+        targets.append(("fastapi", options.fastapi_url.rstrip("/"), options.fastapi_token))
+    if options.django_url:
+        targets.append(("django", options.django_url.rstrip("/"), options.django_token))
+    if not targets:
+        raise SystemExit("請至少指定 --fastapi-url 或 --django-url")
+
+    results = []
+    for scenario in options.scenarios:
+        for backend, base_url, token in targets:
+            result = await run_scenario(
+                backend, base_url, token, scenario,
+                options.concurrency, options.requests, options.pages, options.page_size
+            )
+            results.append(result)
+            print(
+                f"{backend:8s} {scenario:10s} {result['requests_per_second']} req/s  "
+                f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+                f"p99 {result['p99_ms']} ms  errors {result['errors']}"
+            )
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, ensure_ascii=False, indent=2)
+        print(f"📄 結果已寫入 {options.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="支出列表吞吐量基準測試")
+    parser.add_argument("--fastapi-url")
+    parser.add_argument("--fastapi-token")
+    parser.add_argument("--django-url")
+    parser.add_argument("--django-token")
+    parser.add_argument("--scenarios", nargs="+", choices=["first_page", "walk"], default=["first_page", "walk"])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500, help="每個情境的總請求數")
+    parser.add_argument("--pages", type=int, default=10, help="walk 情境每個序列翻頁數")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--output", help="將結果寫入 JSON 檔")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,181 @@
+"""
+產生支出列表基準測試資料
+
+與 backend-django 的 generate_benchmark_data 使用相同的分佈與亂數種子
+（用戶記帳頻率、分類權重、金額、日期、活動關聯比例），讓兩個後端在
+相同規模的資料上比較。第一位用戶為 ADMIN，並輸出其 JWT 供壓測使用。
+
+    alembic upgrade head
+    python -m benchmarks.seed_expenses --users 200 --events 100 --expenses 100000
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from jose import jwt
+from sqlalchemy import delete, insert, select
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal
+from app.models import Category, CategoryType, Event, EventStatus, Expense, ExpenseType, User, UserRole
+
+settings = get_settings()
+
+BENCHMARK_EMAIL_DOMAIN = "bench.example.com"
+
+EXPENSE_CATEGORIES = ["餐飲", "交通", "購物", "娛樂", "醫療", "教育", "居家", "祭典"]
+INCOME_CATEGORIES = ["薪資", "獎金", "禮金"]
+DESCRIPTIONS = ["早餐", "午餐", "晚餐", "加油", "市場採買", "車票", "祭典用品", "聚餐", "水電費", "學費"]
+
+
+def zipf_weights(count, exponent=1.1):
+    """
+    前幾個項目權重較高的長尾分佈
+    """
+    return [1 / math.pow(rank, exponent) for rank in range(1, count + 1)]
+
+
+def issue_token(user_id, days=7):
+    """
+    簽發壓測用的 access token
+    """
+    payload = {"sub": str(user_id), "exp": datetime.now(timezone.utc) + timedelta(days=days)}
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+async def clear(session):
+    """
+    刪除先前產生的測試資料
+    """
+    user_ids = select(User.id).where(User.email.like(f"%@{BENCHMARK_EMAIL_DOMAIN}"))
+    await session.execute(delete(Expense).where(Expense.user_id.in_(user_ids)))
+    await session.execute(delete(Event).where(Event.name.like("測試活動 %")))
+    await session.execute(delete(User).where(User.email.like(f"%@{BENCHMARK_EMAIL_DOMAIN}")))
+    await session.commit()
+
+
+async def ensure_categories(session):
+    """
+    取得（必要時建立）支出與收入分類
+    """
+    ids = {}
+    for category_type, names in ((CategoryType.EXPENSE, EXPENSE_CATEGORIES), (CategoryType.INCOME, INCOME_CATEGORIES)):
+        existing = (await session.scalars(select(Category.id).where(Category.type == category_type))).all()
+        if not existing:
+            existing = [uuid.uuid4() for _ in names]
+            await session.execute(insert(Category), [
+                {"id": category_id, "name": name, "type": category_type, "is_default": True}
+                for category_id, name in zip(existing, names)
+            ])
+        ids[category_type] = list(existing)
+    return ids[CategoryType.EXPENSE], ids[CategoryType.INCOME]
+
+
+async def seed(users, events, expenses, participants_per_event, days, income_ratio,
+               event_ratio, batch_size, seed_value):
+    """
+    產生測試資料並回傳 ADMIN 用戶 ID
+    """
+    rng = random.Random(seed_value)
+    now = datetime.now(timezone.utc)
+
+    async with AsyncSessionLocal() as session:
+        expense_categories, income_categories = await ensure_categories(session)
+        expense_category_weights = zipf_weights(len(expense_categories))
+
+        user_ids = [uuid.uuid4() for _ in range(users)]
+        await session.execute(insert(User), [
+            {
+                "id": user_id,
+                "name": f"測試成員{index}",
+                "email": f"bench_{index:06d}@{BENCHMARK_EMAIL_DOMAIN}",
+                "password": "!",
+                "role": UserRole.ADMIN if index == 0 else UserRole.USER,
+            }
+            for index, user_id in enumerate(user_ids)
+        ])
+        print(f"👥 已建立 {users} 位用戶")
+
+        event_ids = [uuid.uuid4() for _ in range(events)]
+        event_rows = []
+        for index, event_id in enumerate(event_ids):
+            start_date = now - timedelta(days=rng.randint(0, days))
+            event_rows.append({
+                "id": event_id,
+                "name": f"測試活動 {index + 1}",
+                "start_date": start_date,
+                "end_date": start_date + timedelta(days=rng.randint(1, 3)),
+                "status": EventStatus.ACTIVE if rng.random() < 0.7 else EventStatus.COMPLETED,
+                "enabled": True,
+            })
+        await session.execute(insert(Event), event_rows)
+
+        user_events = {}
+        for event_id in event_ids:
+            for user_id in rng.sample(user_ids, min(participants_per_event, len(user_ids))):
+                user_events.setdefault(user_id, []).append(event_id)
+        print(f"🎉 已建立 {events} 個活動")
+
+        # 支出：少數用戶記錄大部分帳目
+        user_weights = zipf_weights(len(user_ids), exponent=0.8)
+        created = 0
+        while created < expenses:
+            size = min(batch_size, expenses - created)
+            rows = []
+            for user_id in rng.choices(user_ids, weights=user_weights, k=size):
+                is_income = rng.random() < income_ratio
+                event_id = None
+                if not is_income and user_events.get(user_id) and rng.random() < event_ratio:
+                    event_id = rng.choice(user_events[user_id])
+                amount = rng.lognormvariate(6.0, 1.0) * (10 if is_income else 1)
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "amount": Decimal(str(round(min(amount, 9999999), 2))),
+                    "type": ExpenseType.INCOME if is_income else ExpenseType.EXPENSE,
+                    "date": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                    "description": rng.choice(DESCRIPTIONS),
+                    "images": [],
+                    "category_id": (
+                        rng.choice(income_categories) if is_income
+                        else rng.choices(expense_categories, weights=expense_category_weights)[0]
+                    ),
+                    "user_id": user_id,
+                    "event_id": event_id,
+                })
+            await session.execute(insert(Expense), rows)
+            created += size
+            print(f"💰 已建立 {created}/{expenses} 筆支出")
+
+        await session.commit()
+    return user_ids[0]
+
+
+async def main(options):
+    if options.clear:
+        async with AsyncSessionLocal() as session:
+            await clear(session)
+    admin_id = await seed(
+        options.users, options.events, options.expenses, options.participants_per_event,
+        options.days, options.income_ratio, options.event_ratio, options.batch_size, options.seed
+    )
+    print(f"🔑 ADMIN token：{issue_token(admin_id)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="產生支出列表基準測試資料")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--expenses", type=int, default=10000)
+    parser.add_argument("--participants-per-event", type=int, default=4)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--income-ratio", type=float, default=0.15)
+    parser.add_argument("--event-ratio", type=float, default=0.6)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--clear", action="store_true", help="先刪除先前產生的測試資料")
+    asyncio.run(main(parser.parse_args()))